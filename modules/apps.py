@@ -13,9 +13,10 @@ SUPPORTED_APPS = {
             ".config/Code"     # Cache & Config
         ],
         "post_install": [
-            "{link} --install-extension ms-python.python",
-            "{link} --install-extension teabyii.ayu",
-            "bash $HOME/Tools/scripts/vscode.sh"
+            # One CLI start for both extensions
+            {"id": "extensions", "timeout": 600,
+             "run": "{link} --install-extension ms-python.python --install-extension teabyii.ayu"},
+            {"id": "setup", "run": "bash $HOME/Tools/scripts/vscode.sh", "follows": ["extensions"]}
         ]
     },
     "vscodium": {
@@ -60,9 +61,11 @@ SUPPORTED_APPS = {
     # --- JetBrains ---
     "pycharm-community": {
         "name": "PyCharm Community",
-        "url": "https://download.jetbrains.com/python/pycharm-community-2023.3.3.tar.gz",
+        "version": "2023.3.3",
+        "versions": ["2024.1", "2023.3.3"],
+        "url": "https://download.jetbrains.com/python/pycharm-community-{version}.tar.gz",
         "type": "tar.gz",
-        "bin_path": "pycharm-community-2023.3.3/bin/pycharm.sh",
+        "bin_path": "pycharm-community-{version}/bin/pycharm.sh",
         "link_name": "pycharm"
     },
     "intellij-community": {
@@ -81,32 +84,36 @@ SUPPORTED_APPS = {
     },
     "clion": {
         "name": "CLion",
-        "url": "https://download.jetbrains.com/cpp/CLion-2023.3.3.tar.gz",
+        "version": "2023.3.3",
+        "url": "https://download.jetbrains.com/cpp/CLion-{version}.tar.gz",
         "type": "tar.gz",
-        "bin_path": "clion-2023.3.3/bin/clion.sh",
+        "bin_path": "clion-{version}/bin/clion.sh",
         "link_name": "clion"
     },
     "goland": {
         "name": "GoLand",
-        "url": "https://download.jetbrains.com/go/goland-2023.3.3.tar.gz",
+        "version": "2023.3.3",
+        "url": "https://download.jetbrains.com/go/goland-{version}.tar.gz",
         "type": "tar.gz",
         # NOTE: Folder names update with versions. Fixed paths are brittle.
         # Ideally installer finds the bin automatically.
-        "bin_path": "GoLand-2023.3.3/bin/goland.sh",
+        "bin_path": "GoLand-{version}/bin/goland.sh",
         "link_name": "goland"
     },
     "rider": {
         "name": "Rider",
-        "url": "https://download.jetbrains.com/rider/JetBrains.Rider-2023.3.3.tar.gz",
+        "version": "2023.3.3",
+        "url": "https://download.jetbrains.com/rider/JetBrains.Rider-{version}.tar.gz",
         "type": "tar.gz",
-        "bin_path": "JetBrains Rider-2023.3.3/bin/rider.sh",
+        "bin_path": "JetBrains Rider-{version}/bin/rider.sh",
         "link_name": "rider"
     },
     "datagrip": {
         "name": "DataGrip",
-        "url": "https://download.jetbrains.com/datagrip/datagrip-2023.3.4.tar.gz",
+        "version": "2023.3.4",
+        "url": "https://download.jetbrains.com/datagrip/datagrip-{version}.tar.gz",
         "type": "tar.gz",
-        "bin_path": "DataGrip-2023.3.4/bin/datagrip.sh",
+        "bin_path": "DataGrip-{version}/bin/datagrip.sh",
         "link_name": "datagrip"
     },
     "android-studio": {
@@ -412,14 +419,18 @@ SUPPORTED_APPS = {
     },
     "nodejs": {
         "name": "Node.js (LTS)",
-        "url": "https://nodejs.org/dist/v20.11.0/node-v20.11.0-linux-x64.tar.xz",
+        "version": "20.11.0",
+        "versions": ["22.4.0", "20.11.0", "18.19.0"],
+        "url": "https://nodejs.org/dist/v{version}/node-v{version}-linux-x64.tar.xz",
         "type": "tar.xz",
-        "bin_path": "node-v20.11.0-linux-x64/bin/node",
+        "bin_path": "node-v{version}-linux-x64/bin/node",
         "link_name": "node"
     },
     "go": {
         "name": "Go (Language)",
-        "url": "https://go.dev/dl/go1.21.6.linux-amd64.tar.gz",
+        "version": "1.21.6",
+        "versions": ["1.22.5", "1.21.6", "1.20.14"],
+        "url": "https://go.dev/dl/go{version}.linux-amd64.tar.gz",
         "type": "tar.gz",
         "bin_path": "go/bin/go",
         "link_name": "go"
@@ -429,13 +440,15 @@ SUPPORTED_APPS = {
         # "url": "https://github.com/rust-lang/rust/archive/refs/tags/1.92.0.tar.gz", # User's was source code
         # Using a valid standalone linux-gnu binary of Rust 1.75 (newer versions widely available but 1.75 is reliable)
         # Actually Search for "rust tar.gz binary" -> found static.rust-lang.org
-        "url": "https://static.rust-lang.org/dist/rust-1.75.0-x86_64-unknown-linux-gnu.tar.gz",
+        "version": "1.75.0",
+        "versions": ["1.79.0", "1.75.0"],
+        "url": "https://static.rust-lang.org/dist/rust-{version}-x86_64-unknown-linux-gnu.tar.gz",
         "type": "tar.gz",
         # Binaries are deep: rust-1.75.0.../rustc/bin/rustc
         # Installer might need deeper path or user meant 'rustup'. 
         # But 'rustup' is a script.
         # Let's set bin_path to the main rustc binary.
-        "bin_path": "rust-1.75.0-x86_64-unknown-linux-gnu/rustc/bin/rustc",
+        "bin_path": "rust-{version}-x86_64-unknown-linux-gnu/rustc/bin/rustc",
         "link_name": "rustc"
         # Note: Cargo is separate in 'cargo/bin/cargo' in this tarball. 
         # Installer only links ONE bin. This is a limitation for Rust which needs cargo too.
@@ -468,15 +481,14 @@ SUPPORTED_APPS = {
     "tealdeer": {
         "name": "Tldr (Tealdeer)",
         "url": "https://github.com/tealdeer-rs/tealdeer/releases/download/v1.7.0/tealdeer-linux-x86_64-musl",
-        # Treating raw binary as appimage to chmod+x
-        "type": "appimage",
+        "type": "binary",
         "bin_path": "tealdeer-linux-x86_64-musl",
         "link_name": "tldr"
     },
     "httpie": {
         "name": "HTTPie",
         "url": "https://packages.httpie.io/binaries/linux/http-latest",
-        "type": "appimage",
+        "type": "binary",
         "bin_path": "http-latest",
         "link_name": "http"
     },
@@ -498,9 +510,7 @@ SUPPORTED_APPS = {
     "kubectl": {
         "name": "Kubectl",
         "url": "https://dl.k8s.io/release/v1.29.1/bin/linux/amd64/kubectl",
-        "type": "appimage", # Treating single binary as appimage hack?
-        # Installer 'appimage' logic is: move file, chmod +x. 
-        # This works for raw binaries too!
+        "type": "binary",
         "bin_path": "kubectl",
         "link_name": "kubectl"
     },
@@ -516,14 +526,14 @@ SUPPORTED_APPS = {
     "jq": {
         "name": "JQ (JSON Processor)",
         "url": "https://github.com/jqlang/jq/releases/download/jq-1.7.1/jq-linux-amd64",
-        "type": "appimage", # Raw binary hack
+        "type": "binary",
         "bin_path": "jq-linux-amd64",
         "link_name": "jq"
     },
     "yq": {
         "name": "YQ (YAML Processor)",
         "url": "https://github.com/mikefarah/yq/releases/download/v4.40.5/yq_linux_amd64",
-        "type": "appimage", # Raw binary hack
+        "type": "binary",
         "bin_path": "yq_linux_amd64",
         "link_name": "yq"
     },
@@ -582,3 +592,45 @@ SUPPORTED_APPS = {
         "link_name": "librewolf"
     },
 }
+
+
+# Entries with a "version" may use {version} in these fields; see pin_version.
+VERSIONED_FIELDS = ("url", "bin_path")
+
+
+def is_versioned(app_info):
+    """True if any version of the app can be installed (templated download)."""
+    return bool(app_info.get("templates"))
+
+
+def pin_version(app_info, version):
+    """
+    Copy of a catalog entry for one version, with {version} filled in.
+    The templates are kept under "templates" so the copy can be re-pinned.
+    """
+    templates = dict(app_info.get("templates") or {})
+    for field in VERSIONED_FIELDS:
+        # A field still holding a placeholder is a (new) template
+        if "{version}" in str(app_info.get(field, "")):
+            templates[field] = app_info[field]
+    pinned = dict(app_info, version=version, templates=templates)
+    for field, template in templates.items():
+        pinned[field] = template.replace("{version}", version)
+    return pinned
+
+
+def expand_versions(catalog=None):
+    """Fill in the pinned version of every versioned entry (after custom apps are loaded too)."""
+    catalog = SUPPORTED_APPS if catalog is None else catalog
+    for app_name, app_info in catalog.items():
+        if app_info.get("version"):
+            catalog[app_name] = pin_version(app_info, str(app_info["version"]))
+
+
+def parse_app_spec(spec):
+    """'go@1.22.5' -> ('go', '1.22.5'); 'go' -> ('go', None)."""
+    app_name, _, version = spec.partition("@")
+    return app_name, version or None
+
+
+expand_versions()
@@ -0,0 +1,741 @@
+"""
+Archive helpers shared by the installer and the inspector.
+Opens tarballs of every supported compression (including zstd), extracts
+tar/zip/.deb payloads through a threaded writer stage, and extracts .deb
+payloads without depending on the host's dpkg.
+"""
+
+import os
+import queue
+import shutil
+import stat
+import subprocess
+import tarfile
+import threading
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    # Python 3.14+ ships zstd in the standard library (and tarfile "r:zst")
+    from compression import zstd as _zstd
+except ImportError:
+    _zstd = None
+
+
+# tarfile modes for the compressions tarfile handles natively
+TAR_MODES = {
+    "tar.gz": "r:gz",
+    "tar.xz": "r:xz",
+    "tar.bz2": "r:bz2",
+    "tar": "r:",
+}
+
+TAR_TYPES = ("tar", "tar.gz", "tar.xz", "tar.bz2", "tar.zst")
+
+# Filename suffixes -> archive type (checked in order, longest first)
+_TAR_SUFFIXES = [
+    (".tar.zst", "tar.zst"),
+    (".tzst", "tar.zst"),
+    (".tar.xz", "tar.xz"),
+    (".txz", "tar.xz"),
+    (".tar.bz2", "tar.bz2"),
+    (".tbz2", "tar.bz2"),
+    (".tbz", "tar.bz2"),
+    (".tar.gz", "tar.gz"),
+    (".tgz", "tar.gz"),
+]
+
+
+# Enough leading bytes to see every signature below (ustar lives at 257)
+SNIFF_SIZE = 512
+
+
+def sniff_format(head):
+    """
+    Identify a download from its first bytes.
+    Returns an archive type ("tar.gz", "zip", "deb", "appimage", "binary", ...)
+    or None when the content is not recognized.
+    """
+    if head[:4] == b"\x28\xb5\x2f\xfd":
+        return "tar.zst"
+    if head[:2] == b"\x1f\x8b":
+        return "tar.gz"
+    if head[:6] == b"\xfd7zXZ\x00":
+        return "tar.xz"
+    if head[:3] == b"BZh":
+        return "tar.bz2"
+    if head[:4] in (b"PK\x03\x04", b"PK\x05\x06"):
+        return "zip"
+    if head[:8] == b"!<arch>\n":
+        return "deb"
+    if head[:4] == b"\x7fELF":
+        # AppImages are ELF files carrying "AI" + type byte in e_ident padding
+        if head[8:10] == b"AI":
+            return "appimage"
+        return "binary"
+    if head[:2] == b"#!":
+        return "binary"
+    if head[257:262] == b"ustar":
+        return "tar"
+    return None
+
+
+def sniff_file(path):
+    """sniff_format() on the first bytes of a file on disk."""
+    try:
+        with open(path, "rb") as f:
+            return sniff_format(f.read(SNIFF_SIZE))
+    except OSError:
+        return None
+
+
+def resolve_type(declared, detected):
+    """
+    Pick the type to install with, given the catalog type and the sniffed one.
+    The content wins when they disagree, except that a file declared as a
+    plain binary is never extracted even if it happens to be an AppImage.
+    """
+    if not detected or detected == declared:
+        return declared
+    if declared == "binary" and detected == "appimage":
+        return declared
+    return detected
+
+
+def tar_type_from_name(name) -> str:
+    """Guess the tarball compression from a filename. Defaults to tar.gz."""
+    name = str(name).lower()
+    for suffix, archive_type in _TAR_SUFFIXES:
+        if name.endswith(suffix):
+            return archive_type
+    return "tar.gz"
+
+
+def zstd_available() -> bool:
+    """True if zstd data can be decoded (stdlib module or zstd binary)."""
+    return _zstd is not None or shutil.which("zstd") is not None
+
+
+@contextmanager
+def open_tar(archive_path, archive_type=None):
+    """
+    Open a tarball for reading and yield the TarFile.
+
+    zstd tarballs use the stdlib decoder when available, otherwise they are
+    streamed through `zstd -dc` (the TarFile is then in stream mode, which is
+    fine for sequential extraction).
+    """
+    if archive_type is None:
+        archive_type = tar_type_from_name(archive_path)
+
+    if archive_type != "tar.zst":
+        with tarfile.open(archive_path, TAR_MODES.get(archive_type, "r:*")) as tar:
+            yield tar
+        return
+
+    if _zstd is not None:
+        with tarfile.open(archive_path, "r:zst") as tar:
+            yield tar
+        return
+
+    if shutil.which("zstd") is None:
+        raise Exception(
+            "Cannot extract .tar.zst: Python has no zstd support and the 'zstd' binary was not found.")
+
+    proc = subprocess.Popen(
+        ["zstd", "-dc", "--no-progress", str(archive_path)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+            yield tar
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read().decode(errors="replace").strip()
+        proc.stderr.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise Exception(f"zstd failed (exit code {returncode}): {stderr}")
+
+
+# Buffer size for file writes during extraction
+WRITE_BUFFER = 1024 * 1024
+
+# Threads writing extracted files (disk writes overlap with decompression)
+WRITER_THREADS = min(8, os.cpu_count() or 2)
+
+
+class UnsafeMemberError(tarfile.TarError):
+    """A tar member that would escape the destination (fallback filter)."""
+
+
+class UnsafeLinkError(UnsafeMemberError):
+    """A tar link pointing outside the destination (fallback filter)."""
+
+
+def _fallback_filter(member, dest_path):
+    """
+    Minimal stand-in for tarfile.data_filter on Pythons that lack it:
+    reject absolute paths, '..' escapes and links leaving the destination.
+    """
+    name = member.name
+    if os.path.isabs(name):
+        raise UnsafeMemberError(f"{name!r} is an absolute path")
+    target = os.path.realpath(os.path.join(dest_path, name))
+    if os.path.commonpath([target, dest_path]) != dest_path:
+        raise UnsafeMemberError(f"{name!r} would be extracted outside the destination")
+    if member.issym() or member.islnk():
+        if os.path.isabs(member.linkname):
+            raise UnsafeLinkError(f"{name!r} links to an absolute path")
+        if member.issym():
+            link_target = os.path.join(os.path.dirname(target), member.linkname)
+        else:
+            link_target = os.path.join(dest_path, member.linkname)
+        link_target = os.path.realpath(link_target)
+        if os.path.commonpath([link_target, dest_path]) != dest_path:
+            raise UnsafeLinkError(f"{name!r} links outside the destination")
+    if not (member.isreg() or member.isdir() or member.issym() or member.islnk()):
+        raise UnsafeMemberError(f"{name!r} is a special file")
+    return member
+
+
+_safety_filter = getattr(tarfile, "data_filter", _fallback_filter)
+_LinkFilterErrors = (UnsafeLinkError,) + tuple(
+    getattr(tarfile, name) for name in ("AbsoluteLinkError", "LinkOutsideDestinationError")
+    if hasattr(tarfile, name))
+
+
+def _lexical_path(name):
+    """
+    Normalized relative path for a member name, or None if it is absolute or
+    climbs out with '..'. No filesystem access.
+    """
+    if not name or os.path.isabs(name):
+        return None
+    norm = os.path.normpath(name)
+    if norm == ".." or norm.startswith(".." + os.sep):
+        return None
+    return norm
+
+
+def _under_link(rel_path, links):
+    """True if any parent of rel_path is a symlink extracted earlier."""
+    parent = os.path.dirname(rel_path)
+    while parent:
+        if parent in links:
+            return True
+        parent = os.path.dirname(parent)
+    return False
+
+
+def _make_dirs(path, made_dirs):
+    """mkdir -p that remembers what it already created (no repeated stat calls)."""
+    if path in made_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    while path not in made_dirs:
+        made_dirs.add(path)
+        path = os.path.dirname(path)
+
+
+def _clear_path(path, made_dirs=None):
+    """Remove whatever sits at path so a member can be created there."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+        if made_dirs:
+            # Forget cached directories that no longer exist
+            prefix = path + os.sep
+            made_dirs.difference_update(
+                [d for d in made_dirs if d == path or d.startswith(prefix)])
+    else:
+        os.unlink(path)
+
+
+def _create_file(path, mode, made_dirs=None):
+    """Open path for writing with only the permission bits we care about."""
+    # Executable bit is the only mode information apps need; umask does the rest
+    perms = 0o755 if mode & 0o111 else 0o644
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_CLOEXEC | os.O_NOFOLLOW
+    try:
+        fd = os.open(path, flags, perms)
+    except FileExistsError:
+        _clear_path(path, made_dirs)
+        fd = os.open(path, flags, perms)
+    return os.fdopen(fd, "wb", buffering=WRITE_BUFFER)
+
+
+def new_diff_stats():
+    """Counters filled by a diff extraction (see extract_members' reuse_from)."""
+    return {"written_files": 0, "written_bytes": 0, "reused_files": 0, "reused_bytes": 0}
+
+
+# Files apps do not rewrite in place (packed resources, libraries); with
+# executables, the only ones safe to share by hardlink between two trees
+IMMUTABLE_SUFFIXES = (".so", ".jar", ".pak", ".asar", ".node", ".dll", ".dat", ".bin",
+                      ".zip", ".ttf", ".otf", ".woff", ".woff2", ".png", ".svg", ".ico")
+
+
+def is_immutable(name, mode):
+    """True for files that may be shared by hardlink (executables, libraries, resources)."""
+    base = os.path.basename(name).lower()
+    return bool(mode & 0o111) or base.endswith(IMMUTABLE_SUFFIXES) or ".so." in base
+
+
+def _reusable(reuse_from, rel_path, size, mode):
+    """
+    The installed counterpart of a member, if it could be identical to it
+    and may be shared (see is_immutable): anything else an app or a
+    post-install step could write in place, which would change both trees.
+    """
+    if reuse_from is None or not is_immutable(rel_path, mode):
+        return None
+    path = os.path.join(reuse_from, rel_path)
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode) or st.st_size != size:
+        return None
+    if bool(st.st_mode & 0o111) != bool(mode & 0o111):
+        return None
+    return path
+
+
+def _write_if_changed(src, old_path, target, mode, made_dirs, stats):
+    """
+    Stream a member and compare it with the installed file of the same size,
+    block by block. If they are identical, hardlink the installed file (no
+    data written; its mode is left alone, the installed tree is live). At
+    the first difference, write the member out: the part that matched is
+    copied from the installed file, the rest streamed.
+    """
+    matched = 0
+    with open(old_path, "rb") as old:
+        while True:
+            chunk = src.read(WRITE_BUFFER)
+            if not chunk:
+                break
+            if old.read(len(chunk)) != chunk:
+                with _create_file(target, mode, made_dirs) as out:
+                    old.seek(0)
+                    remaining = matched
+                    while remaining > 0:
+                        block = old.read(min(remaining, WRITE_BUFFER))
+                        out.write(block)
+                        remaining -= len(block)
+                    out.write(chunk)
+                    shutil.copyfileobj(src, out, WRITE_BUFFER)
+                    stats["written_bytes"] += out.tell()
+                stats["written_files"] += 1
+                return
+            matched += len(chunk)
+
+    if os.path.lexists(target):
+        _clear_path(target, made_dirs)
+    try:
+        os.link(old_path, target)
+    except OSError:
+        # Too many links, or another filesystem: still one write less than decompressing
+        shutil.copy2(old_path, target)
+    stats["reused_files"] += 1
+    stats["reused_bytes"] += matched
+
+
+class WriterPool:
+    """
+    Writer stage for extraction: the decoding thread hands file payloads to a
+    pool of threads that write them out, so disk writes overlap with
+    decompression. Payloads go through a bounded queue, which caps memory at
+    about max_pending * INLINE_LIMIT bytes; bigger files are streamed by the
+    caller directly (see write_stream).
+    """
+
+    # Files up to this size are read into memory and queued
+    INLINE_LIMIT = 4 * 1024 * 1024
+
+    def __init__(self, workers=None, max_pending=64):
+        if workers is None:
+            workers = WRITER_THREADS
+        self._queue = queue.Queue(maxsize=max_pending)
+        # Paths with a write still in the queue (touched by the caller only)
+        self._queued = set()
+        self._errors = []
+        self._threads = [
+            threading.Thread(target=self._run, name=f"void-writer-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, data, mode = item
+                with _create_file(path, mode) as out:
+                    out.write(data)
+            except Exception as e:
+                self._errors.append(e)
+            finally:
+                self._queue.task_done()
+
+    def _raise_errors(self):
+        if self._errors:
+            raise self._errors[0]
+
+    def submit(self, path, data, mode):
+        """Queue a file write. Blocks while the queue is full."""
+        self._raise_errors()
+        self._queued.add(path)
+        self._queue.put((path, data, mode))
+
+    def settle(self, path):
+        """
+        Drain the queue if a queued write to path, or to one of its parents,
+        has not happened yet. Call before writing path any other way, so an
+        archive listing the same path twice always ends with its last member.
+        """
+        if not self._queued:
+            return
+        while True:
+            if path in self._queued:
+                self.drain()
+                return
+            parent = os.path.dirname(path)
+            if parent == path:
+                return
+            path = parent
+
+    def write_stream(self, path, src, mode, made_dirs=None):
+        """Write a large file from a stream on the calling thread."""
+        with _create_file(path, mode, made_dirs) as out:
+            shutil.copyfileobj(src, out, WRITE_BUFFER)
+
+    def drain(self):
+        """Wait until every queued write is on disk (e.g. before a hardlink)."""
+        self._queue.join()
+        self._queued.clear()
+        self._raise_errors()
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._raise_errors()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Don't mask the original error with a writer error
+            try:
+                self.close()
+            except Exception:
+                pass
+
+
+def extract_members(tar, dest, preserve_mtime=False, workers=None, reuse_from=None, stats=None,
+                    trusted=False, rebase_links=False):
+    """
+    Extract an open TarFile into dest, cheaper than TarFile.extractall.
+
+    extractall restores owner, mode and mtime for every member and re-checks
+    parent directories each time. Here directories are created once and
+    cached, files are written with large buffered writes and created with
+    just rw or rwx permissions, and mtimes are only restored (in one pass at
+    the end) when preserve_mtime is set. Every member still goes through
+    tarfile's data filter (or, in a fresh destination, an equivalent lexical
+    check), so path traversal and unsafe members are rejected; links pointing
+    outside the destination are skipped with a warning.
+
+    This thread only decodes the tar stream; small files are written by a
+    WriterPool of `workers` threads.
+
+    With reuse_from (the installed tree of the previous version), a member
+    whose file there has the same size is compared with it while streaming
+    and, if unchanged, hardlinked instead of written. stats (new_diff_stats())
+    counts what was written and what was reused.
+
+    trusted is for archives void wrote itself from a tree it owns (see
+    hibernate): members skip the safety filter, so links are restored
+    wherever they point, and files and directories get their exact mode and
+    mtime back, like tarfile's fully_trusted filter.
+
+    rebase_links is for payloads meant to be unpacked at / (.deb): a symlink
+    to an absolute path is rewritten relative to dest, as if dest were the
+    root, instead of being skipped (it would otherwise point at the host's
+    own files).
+    """
+    dest = os.path.realpath(dest)
+    if reuse_from is not None:
+        reuse_from = os.path.realpath(reuse_from)
+        stats = stats if stats is not None else new_diff_stats()
+    os.makedirs(dest, exist_ok=True)
+    made_dirs = {dest}
+    mtimes = []
+    modes = []
+    preserve_mtime = preserve_mtime or trusted
+
+    # In an empty destination the only symlinks are the ones we extract, so a
+    # plain file or directory whose name is lexically inside dest and not
+    # below one of those links can skip the filter's per-component realpath().
+    with os.scandir(dest) as entries:
+        fresh = next(entries, None) is None
+    links = set()
+
+    with WriterPool(workers) as pool:
+        for member in tar:
+            if rebase_links and member.issym() and os.path.isabs(member.linkname):
+                member.linkname = _rebased_link(member.name, member.linkname)
+            rel_path = os.path.normpath(member.name) if trusted else None
+            if rel_path is None and fresh and (member.isreg() or member.isdir()):
+                rel_path = _lexical_path(member.name)
+                if rel_path is not None and links and _under_link(rel_path, links):
+                    rel_path = None
+            if rel_path is None:
+                try:
+                    member = _safety_filter(member, dest)
+                except _LinkFilterErrors as e:
+                    print(f"Warning: skipping unsafe link {member.name}: {e}")
+                    continue
+                if member is None:
+                    continue
+                rel_path = os.path.normpath(member.name)
+
+            target = os.path.join(dest, rel_path)
+            pool.settle(target)
+            if member.isdir():
+                _make_dirs(target, made_dirs)
+                if trusted:
+                    modes.append((target, member.mode))
+                    mtimes.append((target, member.mtime))
+                continue
+            _make_dirs(os.path.dirname(target), made_dirs)
+
+            if member.isreg():
+                if trusted:
+                    modes.append((target, member.mode))
+                old_path = _reusable(reuse_from, rel_path, member.size, member.mode)
+                with tar.extractfile(member) as src:
+                    if old_path is not None:
+                        _write_if_changed(src, old_path, target, member.mode, made_dirs, stats)
+                        continue
+                    if stats is not None:
+                        stats["written_files"] += 1
+                        stats["written_bytes"] += member.size
+                    if member.size <= pool.INLINE_LIMIT:
+                        pool.submit(target, src.read(), member.mode)
+                    else:
+                        pool.write_stream(target, src, member.mode, made_dirs)
+            elif member.issym():
+                if os.path.lexists(target):
+                    _clear_path(target, made_dirs)
+                os.symlink(member.linkname, target)
+                links.add(rel_path)
+            elif member.islnk():
+                # The link source may still be sitting in the queue
+                pool.drain()
+                source = os.path.join(dest, member.linkname)
+                if os.path.lexists(target):
+                    _clear_path(target, made_dirs)
+                try:
+                    os.link(source, target, follow_symlinks=False)
+                except OSError:
+                    shutil.copy2(source, target, follow_symlinks=False)
+            else:
+                # Devices, fifos: nothing an app bundle needs
+                continue
+
+            if preserve_mtime:
+                mtimes.append((target, member.mtime))
+
+    # After every write: a directory may lose its write bit
+    for path, mode in reversed(modes):
+        os.chmod(path, mode & 0o7777)
+    for path, mtime in reversed(mtimes):
+        try:
+            os.utime(path, (mtime, mtime), follow_symlinks=False)
+        except OSError:
+            pass
+
+
+def _rebased_link(name, linkname):
+    """An absolute symlink target, made relative to the member's directory."""
+    parent = os.path.dirname(os.path.normpath(name.lstrip("/"))) or "."
+    return os.path.relpath(os.path.normpath(linkname.lstrip("/")) or ".", parent)
+
+
+def extract_tar(archive_path, extract_to, archive_type=None, reuse_from=None, stats=None,
+                trusted=False, rebase_links=False) -> None:
+    """
+    Extract a tarball of any supported compression into extract_to
+    (reusing unchanged files from reuse_from; trusted and rebase_links: see
+    extract_members).
+    """
+    Path(extract_to).mkdir(parents=True, exist_ok=True)
+    with open_tar(archive_path, archive_type) as tar:
+        extract_members(tar, extract_to, reuse_from=reuse_from, stats=stats, trusted=trusted,
+                        rebase_links=rebase_links)
+
+
+def _zip_member_path(name):
+    """
+    Sanitize a zip member name the way zipfile.extract does: drop the leading
+    slash, drive letters and '..' components.
+    """
+    parts = [p for p in name.replace("\\", "/").split("/")
+             if p not in ("", ".", "..") and not p.endswith(":")]
+    return os.path.join(*parts) if parts else None
+
+
+def extract_zip(archive_path, extract_to, workers=None, reuse_from=None, stats=None) -> None:
+    """
+    Extract a .zip through the same writer stage as tarballs.
+    Unlike ZipFile.extractall this keeps the executable bit and symlinks
+    recorded by Unix zip tools. reuse_from and stats work as in extract_members.
+    """
+    dest = os.path.realpath(extract_to)
+    if reuse_from is not None:
+        reuse_from = os.path.realpath(reuse_from)
+        stats = stats if stats is not None else new_diff_stats()
+    os.makedirs(dest, exist_ok=True)
+    made_dirs = {dest}
+
+    with zipfile.ZipFile(archive_path, "r") as zf, WriterPool(workers) as pool:
+        for info in zf.infolist():
+            rel_path = _zip_member_path(info.filename)
+            if rel_path is None:
+                continue
+            target = os.path.join(dest, rel_path)
+            pool.settle(target)
+            if info.is_dir():
+                _make_dirs(target, made_dirs)
+                continue
+            _make_dirs(os.path.dirname(target), made_dirs)
+
+            mode = info.external_attr >> 16
+            if stat.S_ISLNK(mode):
+                link_target = zf.read(info).decode("utf-8", errors="replace")
+                resolved = os.path.realpath(os.path.join(os.path.dirname(target), link_target))
+                if os.path.isabs(link_target) or os.path.commonpath([resolved, dest]) != dest:
+                    print(f"Warning: skipping unsafe link {info.filename}")
+                    continue
+                if os.path.lexists(target):
+                    _clear_path(target, made_dirs)
+                os.symlink(link_target, target)
+                continue
+
+            old_path = _reusable(reuse_from, rel_path, info.file_size, mode)
+            with zf.open(info) as src:
+                if old_path is not None:
+                    _write_if_changed(src, old_path, target, mode, made_dirs, stats)
+                    continue
+                if stats is not None:
+                    stats["written_files"] += 1
+                    stats["written_bytes"] += info.file_size
+                if info.file_size <= pool.INLINE_LIMIT:
+                    pool.submit(target, src.read(), mode)
+                else:
+                    pool.write_stream(target, src, mode, made_dirs)
+
+
+def _iter_ar_members(f):
+    """
+    Yield (name, offset, size) for each member of an ar archive (.deb).
+    f must be positioned just after the global '!<arch>\\n' header.
+    """
+    while True:
+        header = f.read(60)
+        if len(header) < 60:
+            return
+        name = header[0:16].decode("ascii", errors="replace").strip()
+        # GNU ar terminates names with '/'
+        name = name.rstrip("/")
+        size = int(header[48:58].decode("ascii").strip())
+        offset = f.tell()
+        yield name, offset, size
+        # Members are 2-byte aligned
+        f.seek(offset + size + (size % 2))
+
+
+def deb_data_member(deb_path):
+    """Return (name, offset, size) of the data.tar.* member of a .deb."""
+    with open(deb_path, "rb") as f:
+        if f.read(8) != b"!<arch>\n":
+            raise Exception(f"{deb_path} is not a Debian package (bad ar header)")
+        for name, offset, size in _iter_ar_members(f):
+            if name.startswith("data.tar"):
+                return name, offset, size
+    raise Exception(f"{deb_path} has no data.tar member")
+
+
+def _deb_payload_type(member_name: str) -> str:
+    if member_name == "data.tar":
+        return "tar"
+    return tar_type_from_name(member_name)
+
+
+class _MemberReader:
+    """Read-only stream over the `size` bytes at f's current position."""
+
+    def __init__(self, f, size):
+        self._f = f
+        self._left = size
+
+    def read(self, n=-1):
+        if n is None or n < 0 or n > self._left:
+            n = self._left
+        data = self._f.read(n)
+        self._left -= len(data)
+        return data
+
+
+def extract_deb(deb_path, extract_to) -> None:
+    """
+    Extract the filesystem payload of a .deb into extract_to.
+
+    The data.tar.* member is read straight out of the ar container and goes
+    through extract_members like any tarball (threaded writer stage, safety
+    filter), so the host's dpkg is not needed and its zstd support does not
+    matter. Absolute symlinks are rebased onto extract_to.
+    """
+    deb_path = Path(deb_path)
+    extract_to = Path(extract_to)
+    extract_to.mkdir(parents=True, exist_ok=True)
+
+    member_name, offset, size = deb_data_member(deb_path)
+    payload_type = _deb_payload_type(member_name)
+
+    if payload_type in TAR_MODES:
+        # Streamed: no temporary copy of the payload
+        with open(deb_path, "rb") as f:
+            f.seek(offset)
+            mode = "r|" + TAR_MODES[payload_type][2:]
+            with tarfile.open(fileobj=_MemberReader(f, size), mode=mode) as tar:
+                extract_members(tar, extract_to, rebase_links=True)
+        return
+
+    # zstd: copy the payload out of the ar container, then extract it as a tarball
+    payload_path = deb_path.with_name(deb_path.name + "." + member_name)
+    try:
+        with open(deb_path, "rb") as src, open(payload_path, "wb") as dst:
+            src.seek(offset)
+            remaining = size
+            while remaining > 0:
+                chunk = src.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    raise Exception(f"{deb_path} is truncated")
+                dst.write(chunk)
+                remaining -= len(chunk)
+        extract_tar(payload_path, extract_to, payload_type, rebase_links=True)
+    finally:
+        if payload_path.exists():
+            os.unlink(payload_path)
@@ -0,0 +1,136 @@
+"""
+Helpers for running a void command detached from the terminal (e.g. from a
+login hook) and reporting its progress through a status file.
+
+Detached installs also lower their priority (see lower_priority) so
+decompression and extraction yield to whatever the user is doing, and say
+when they are done with a desktop notification.
+"""
+import ctypes
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+
+# CPU nice value for detached installs
+BACKGROUND_NICE = 10
+# ioprio_set(2) has no libc wrapper: syscall numbers per machine
+IOPRIO_SET_SYSCALLS = {
+    "x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "riscv64": 30,
+    "armv7l": 314, "ppc64le": 273, "s390x": 282,
+}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+# Best-effort class, lowest level (`ionice -c2 -n7`): idle (-c3) could stall
+# an install for as long as the IDE keeps the disk busy
+IOPRIO_CLASS_BE = 2
+IOPRIO_LOWEST = 7
+
+
+def detach(log_path):
+    """
+    Fork into a new session with stdin from /dev/null and stdout/stderr
+    appended to log_path. Returns True in the detached child, False in the
+    original process (which should just report and return).
+    """
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    if os.fork() > 0:
+        return False
+    os.setsid()
+    if os.fork() > 0:
+        # Intermediate child exits so the worker is reparented and never
+        # reacquires a controlling terminal.
+        os._exit(0)
+
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    log = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    os.dup2(devnull, 0)
+    os.dup2(log, 1)
+    os.dup2(log, 2)
+    os.close(devnull)
+    os.close(log)
+    # Line-buffer so the log can be tailed
+    sys.stdout = os.fdopen(1, "w", buffering=1)
+    sys.stderr = os.fdopen(2, "w", buffering=1)
+    return True
+
+
+def write_status(path, status):
+    """Atomically replace a JSON status file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(status, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def read_status(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def set_io_priority(io_class=IOPRIO_CLASS_BE, level=IOPRIO_LOWEST, pid=0):
+    """ioprio_set(2) for pid (0: this thread). Returns True if it was applied."""
+    number = IOPRIO_SET_SYSCALLS.get(platform.machine())
+    if number is None:
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.syscall(number, IOPRIO_WHO_PROCESS, pid,
+                            (io_class << IOPRIO_CLASS_SHIFT) | level) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def lower_priority(nice=BACKGROUND_NICE):
+    """
+    Make the rest of this run yield CPU and disk to interactive work. Linux
+    applies both to the calling thread and everything it starts afterwards
+    (worker threads, tar/xz/zstd processes), so call it before any work.
+    Returns a description of what was applied.
+    """
+    applied = []
+    try:
+        os.nice(nice)
+        applied.append(f"nice +{nice}")
+    except OSError:
+        pass
+    if set_io_priority():
+        applied.append("I/O priority best-effort/7")
+    return applied
+
+
+def notify(summary, body="", urgency="normal"):
+    """Desktop notification through notify-send, when there is a desktop."""
+    if not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY")):
+        return False
+    command = shutil.which("notify-send")
+    if command is None:
+        return False
+    try:
+        subprocess.run([command, "-a", "void", "-u", urgency, summary, body],
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
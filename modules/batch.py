@@ -0,0 +1,261 @@
+"""
+Batch installs for install-all / import.
+
+Each app goes through three stages - download, extract, finish (link,
+desktop entry, data dirs, metadata, post-install) - and every stage has its
+own concurrency limit. With several jobs in flight one app can be extracting
+while the next is still downloading, so neither the network nor the disk sits
+idle. A failure only stops the app it belongs to.
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import apps, installer, lockfile, locks
+
+
+def stage_limits(jobs):
+    """
+    Concurrency limit per stage for a given --jobs value.
+    Downloads are network-bound and get every job; extraction is CPU/disk
+    bound and capped by the core count; finishing touches shared files in
+    $HOME (~/bin, desktop entries, data links) and runs one app at a time.
+    """
+    jobs = max(1, int(jobs))
+    cpus = os.cpu_count() or 2
+    return {
+        "download": jobs,
+        "extract": max(1, min(jobs, cpus // 2)),
+        "finish": 1,
+    }
+
+
+def make_gates(jobs):
+    """One semaphore per stage, sized by stage_limits."""
+    return {stage: threading.BoundedSemaphore(limit)
+            for stage, limit in stage_limits(jobs).items()}
+
+
+class _TaggedOutput:
+    """
+    stdout wrapper that prefixes each line with the app a thread is working
+    on, so output from parallel installs stays readable.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def set_tag(self, tag):
+        self._local.tag = tag
+        self._local.partial = ""
+
+    def write(self, text):
+        tag = getattr(self._local, "tag", None)
+        if not tag:
+            with self._lock:
+                return self._stream.write(text)
+
+        data = self._local.partial + text
+        lines = data.split("\n")
+        self._local.partial = lines.pop()
+        if lines:
+            with self._lock:
+                for line in lines:
+                    self._stream.write(f"[{tag}] {line}\n" if line else "\n")
+        return len(text)
+
+    def flush(self):
+        partial = getattr(self._local, "partial", "")
+        if partial:
+            self._local.partial = ""
+            self.write(partial + "\n")
+        with self._lock:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def install_one(app_name, gates, force, rerun_post_install=False, journal=None, app_info=None):
+    """
+    Run one app through the staged pipeline (gates from make_gates).
+    With a journal, each completed phase is recorded and phases already
+    recorded are not redone. app_info replaces the catalog entry (a locked
+    artifact, see modules/lockfile.py). Returns its result dict; exceptions
+    are caught and reported there.
+    """
+    result = {"app": app_name, "status": "installed", "error": None, "stages": {}}
+    started = time.monotonic()
+
+    def timed(stage, func, *args):
+        with gates[stage]:
+            t0 = time.monotonic()
+            try:
+                return func(*args)
+            finally:
+                result["stages"][stage] = round(time.monotonic() - t0, 2)
+
+    def record(phase, **data):
+        if journal is not None:
+            journal.record(app_name, phase, **data)
+
+    if journal is not None and journal.is_done(app_name):
+        # Finished in an earlier run: nothing to check, nothing to touch
+        result["status"] = "skipped"
+        result["duration"] = 0
+        return result
+
+    try:
+        with locks.app_lock(app_name):
+            print(f"\n--- Installing {app_name} ---")
+            resume_from = _resume_point(app_name, journal)
+            if app_info is not None and not force and not lockfile.matches_install(app_name, app_info):
+                if (installer.APPS_DIR / app_name).exists():
+                    print(f"Installed {app_name} is not the locked artifact; replacing it.")
+                force = True
+            if resume_from is None and timed("finish", installer.reuse_existing_install,
+                                             app_name, force, rerun_post_install):
+                result["status"] = "ready"
+                record("post-installed", reused=True)
+            else:
+                if resume_from is None:
+                    temp_path, dl_meta = timed("download", installer.download_app, app_name, app_info)
+                    record("downloaded", path=str(temp_path), dl_meta=dl_meta)
+                else:
+                    print(f"Resuming {app_name} after '{resume_from}'")
+                    downloaded = journal.data(app_name, "downloaded")
+                    temp_path = Path(downloaded["path"])
+                    dl_meta = downloaded.get("dl_meta") or {}
+
+                if resume_from == "downloaded":
+                    # Throw away a half-extracted tree, keep the download
+                    installer.remove_app_files(app_name)
+                if resume_from in (None, "downloaded"):
+                    archive_type = timed("extract", installer.extract_app, app_name, temp_path, dl_meta,
+                                         None, app_info)
+                    record("extracted", archive_type=archive_type)
+                else:
+                    archive_type = journal.data(app_name, "extracted")["archive_type"]
+
+                if resume_from == "linked":
+                    binary_path = installer.get_binary_path(app_name, archive_type=archive_type)
+                else:
+                    binary_path = timed("finish", installer.link_app, app_name, archive_type, dl_meta, app_info)
+                    record("linked", binary_path=str(binary_path))
+
+                timed("finish", installer.post_install_app, app_name, binary_path, rerun_post_install)
+                record("post-installed")
+                print(f"Successfully installed {app_name}!")
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        if journal is not None:
+            journal.record_failure(app_name, str(e))
+        print(f"✗ Failed: {e}")
+
+    result["duration"] = round(time.monotonic() - started, 2)
+    return result
+
+
+def _resume_point(app_name, journal):
+    """
+    Last completed phase whose artifacts are still on disk, or None to start
+    from scratch.
+    """
+    if journal is None:
+        return None
+    app_dir = installer.APPS_DIR / app_name
+    if journal.has(app_name, "linked") and app_dir.exists():
+        return "linked"
+    if journal.has(app_name, "extracted") and app_dir.exists():
+        return "extracted"
+    if journal.has(app_name, "downloaded"):
+        path = journal.data(app_name, "downloaded").get("path")
+        if path and Path(path).exists():
+            return "downloaded"
+    if app_name in journal.phases:
+        journal.reset(app_name)
+    return None
+
+
+def install_many(app_names, jobs=1, force=False, rerun_post_install=False, journal=None,
+                 on_result=None, app_infos=None):
+    """
+    Install several apps through the staged pipeline. Apps are started in
+    the order given, so put the most wanted ones first.
+    Returns a list of result dicts (app, status, error, duration, stages) in
+    the order the apps were given. Status is installed, ready (already
+    installed, relinked), skipped (finished according to the journal),
+    failed or unknown. on_result(result) is called as each app finishes.
+    app_infos ({app: app_info}) overrides catalog entries, for locked imports.
+    """
+    app_infos = app_infos or {}
+    results = {}
+    runnable = []
+    for app_name in app_names:
+        if app_name in apps.SUPPORTED_APPS:
+            runnable.append(app_name)
+        else:
+            results[app_name] = {"app": app_name, "status": "unknown",
+                                 "error": "Unknown app", "stages": {}, "duration": 0}
+
+    gates = make_gates(jobs)
+
+    def run(app_name):
+        result = install_one(app_name, gates, force, rerun_post_install, journal,
+                             app_infos.get(app_name))
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    if jobs <= 1 or len(runnable) <= 1:
+        for app_name in runnable:
+            results[app_name] = run(app_name)
+        return [results[name] for name in app_names]
+
+    out = _TaggedOutput(sys.stdout)
+
+    def worker(app_name):
+        out.set_tag(app_name)
+        try:
+            return run(app_name)
+        finally:
+            out.flush()
+            out.set_tag(None)
+
+    saved_stdout = sys.stdout
+    sys.stdout = out
+    try:
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="void-install") as pool:
+            for result in pool.map(worker, runnable):
+                results[result["app"]] = result
+    finally:
+        sys.stdout = saved_stdout
+
+    return [results[name] for name in app_names]
+
+
+def print_summary(results, title="Install complete"):
+    """Print a final per-app summary for a batch run."""
+    installed = [r for r in results if r["status"] == "installed"]
+    ready = [r for r in results if r["status"] in ("ready", "skipped")]
+    failed = [r for r in results if r["status"] in ("failed", "unknown")]
+
+    print(f"\n{'='*60}")
+    print(f"{title}: {len(installed)} installed, {len(ready)} already installed, "
+          f"{len(failed)} failed")
+    print(f"{'='*60}")
+    for r in results:
+        mark = "✗" if r in failed else "✓"
+        line = f"  {mark} {r['app']:<20} {r['status']:<10}"
+        if r.get("duration"):
+            line += f" {r['duration']:>6.1f}s"
+        if r["error"]:
+            line += f"  {r['error']}"
+        print(line)
+    print(f"{'='*60}\n")
@@ -0,0 +1,380 @@
+"""
+Content-addressed cache of downloaded artifacts (opt-in).
+
+Installs used to delete the archive as soon as it was extracted, so every
+reinstall, repair and `use` of a pruned version downloaded it again. Now
+the archive is moved into VOID_ROOT/void/cache/objects/<sha256> instead (a
+rename: same filesystem) and recorded in index.json with the URLs it came
+from and their validators (resolved URL, ETag, Last-Modified).
+
+Before downloading, download_app asks the cache. A locked artifact (known
+sha256) is used as is; otherwise the URL's cached entry is used if the
+server still reports the same validators (none at all means no reuse: the
+bytes may be stale). goinfre is usually short on space, so the cache is
+off until `void cache --enable`, and capped (`void cache --max-size`):
+least recently used artifacts go first, and all of it goes before any app
+is evicted for space.
+
+`void inspect` also leaves the tree it extracted in cache/trees/<sha256>.
+Installing the same artifact then renames that tree into place instead of
+extracting the archive again (see adopt_tree).
+"""
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import installer, locks, trash
+
+SETTINGS_FILE = Path.home() / ".config" / "void" / "cache.json"
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "max_gb": 5,
+}
+INDEX_NAME = "index.json"
+
+
+def settings():
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            return dict(DEFAULT_SETTINGS, **json.load(f))
+    except (OSError, ValueError):
+        return dict(DEFAULT_SETTINGS)
+
+
+def save_settings(**changes):
+    current = settings()
+    current.update({k: v for k, v in changes.items() if v is not None})
+    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(SETTINGS_FILE, "w") as f:
+        json.dump(current, f, indent=2, sort_keys=True)
+    return current
+
+
+def enabled():
+    return settings()["enabled"]
+
+
+def max_bytes():
+    return int(settings()["max_gb"] * 1024 ** 3)
+
+
+def cache_dir():
+    return installer.VOID_ROOT / "void" / "cache"
+
+
+def object_path(sha256):
+    return cache_dir() / "objects" / sha256[:2] / sha256
+
+
+def tree_path(sha256):
+    return cache_dir() / "trees" / sha256
+
+
+def staging_dir():
+    """Scratch space next to the cache, so keeping a file or tree is a rename."""
+    path = cache_dir() / "tmp"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _entry_size(entry):
+    return entry["size"] + entry.get("tree", {}).get("size", 0)
+
+
+def _drop_tree(sha256, entry):
+    if entry.pop("tree", None) is not None:
+        trash.discard(tree_path(sha256))
+
+
+def _load():
+    try:
+        with open(cache_dir() / INDEX_NAME, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    index.setdefault("entries", {})
+    index.setdefault("stats", {"hits": 0, "misses": 0, "bytes_saved": 0})
+    return index
+
+
+@contextmanager
+def _index():
+    """The index, locked against other threads and processes; saved on exit."""
+    with locks.shared_lock("cache"):
+        index = _load()
+        yield index
+        cache_dir().mkdir(parents=True, exist_ok=True)
+        tmp = cache_dir() / f".{INDEX_NAME}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp, cache_dir() / INDEX_NAME)
+
+
+def _place(src, dest, mode):
+    """Put src at dest by "move", "link" (hardlink) or "copy", atomically."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    if mode == "move":
+        try:
+            os.rename(src, tmp)
+        except OSError:
+            shutil.move(str(src), str(tmp))
+    else:
+        try:
+            if mode != "link":
+                raise OSError
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+def store(path, url, dl_meta, mode="move"):
+    """
+    Keep a downloaded artifact. mode "move" takes the file (it is deleted
+    anyway when caching is off), "link" and "copy" leave it in place.
+    Returns its sha256, or None if it was not cached.
+    """
+    path = Path(path)
+    if not enabled() or not path.is_file():
+        if mode == "move" and path.exists():
+            path.unlink()
+        return None
+    sha256 = (dl_meta.get("sha256") or "").lower() or installer.file_sha256(path)
+    obj = object_path(sha256)
+    with _index() as index:
+        if obj.exists():
+            if mode == "move":
+                path.unlink()
+        else:
+            _place(path, obj, mode)
+        entry = index["entries"].setdefault(sha256, {"urls": [], "added_at": installer._now_iso()})
+        entry.update({
+            "size": obj.stat().st_size,
+            "resolved_url": dl_meta.get("resolved_url"),
+            "etag": dl_meta.get("etag"),
+            "last_modified": dl_meta.get("last_modified"),
+            "detected_type": dl_meta.get("detected_type"),
+            "last_used": time.time(),
+        })
+        # The URL serves these bytes now; older artifacts are only found by sha256
+        for other_sha, other in index["entries"].items():
+            if other_sha != sha256 and url in other["urls"]:
+                other["urls"].remove(url)
+        if url not in entry["urls"]:
+            entry["urls"].append(url)
+    prune()
+    return sha256
+
+
+def _fresh(entry, remote):
+    """Does the server still serve the cached bytes at this URL?"""
+    if remote.get("etag") and entry.get("etag"):
+        return remote["etag"] == entry["etag"]
+    size_ok = remote.get("content_length") in (None, str(entry["size"]))
+    if remote.get("last_modified") and entry.get("last_modified"):
+        return remote["last_modified"] == entry["last_modified"] and size_ok
+    if remote.get("content_length"):
+        return size_ok and remote.get("resolved_url") == entry.get("resolved_url")
+    # Nothing to compare (offline, or a server that sends no validators)
+    return False
+
+
+def lookup(url, sha256=None):
+    """
+    (sha256, entry) of the cached artifact for url (or for the given sha256),
+    or None. A URL match only counts if the server still reports the same
+    validators.
+    """
+    if not enabled() or not (cache_dir() / INDEX_NAME).exists():
+        return None
+    with _index() as index:
+        if sha256:
+            found = [(sha256.lower(), index["entries"].get(sha256.lower()))]
+        else:
+            found = sorted(((s, e) for s, e in index["entries"].items() if url in e["urls"]),
+                           key=lambda item: item[1]["last_used"], reverse=True)
+        found = [(s, dict(e)) for s, e in found if e is not None and object_path(s).is_file()]
+        if not found:
+            index["stats"]["misses"] += 1
+            return None
+    sha, entry = found[0]
+    if not sha256 and not _fresh(entry, installer.fetch_url_metadata(url) or {}):
+        with _index() as index:
+            index["stats"]["misses"] += 1
+        return None
+    return sha, entry
+
+
+def open_cached(url, sha256=None):
+    """
+    (path of the cached artifact, download metadata like download_file's)
+    for url, or None on a miss. The file belongs to the cache: read it, or
+    use fetch() to get a copy to consume.
+    """
+    found = lookup(url, sha256)
+    if found is None:
+        return None
+    sha256, entry = found
+    with _index() as index:
+        if sha256 in index["entries"]:
+            index["entries"][sha256]["last_used"] = time.time()
+        index["stats"]["hits"] += 1
+        index["stats"]["bytes_saved"] += entry["size"]
+    print(f"Using cached {url} ({entry['size'] / 1024 ** 2:.1f} MB, no download).")
+    return object_path(sha256), {
+        "url": url,
+        "resolved_url": entry.get("resolved_url") or url,
+        "etag": entry.get("etag"),
+        "last_modified": entry.get("last_modified"),
+        "content_length": str(entry["size"]),
+        "detected_type": entry.get("detected_type"),
+        "sha256": sha256,
+        "size": entry["size"],
+    }
+
+
+def fetch(app_info, target):
+    """
+    Put the cached artifact for app_info at target (hardlinked: the install
+    consumes target, the cache keeps its copy). Returns its download
+    metadata, or None on a miss.
+    """
+    cached = open_cached(app_info["url"], app_info.get("sha256"))
+    if cached is None:
+        return None
+    path, dl_meta = cached
+    try:
+        _place(path, Path(target), "link")
+    except OSError:
+        return None
+    return dl_meta
+
+
+def unshare(path):
+    """Give path its own copy if it is hardlinked to a cached artifact."""
+    path = Path(path)
+    if path.stat().st_nlink > 1:
+        _place(path, path, "copy")
+
+
+def forget(sha256):
+    """Drop one artifact (e.g. it turned out not to extract)."""
+    with _index() as index:
+        _drop_tree(sha256, index["entries"].pop(sha256, None) or {})
+        try:
+            object_path(sha256).unlink()
+        except OSError:
+            pass
+
+
+def keep_tree(sha256, extracted, archive_type):
+    """
+    Keep a freshly extracted tree of a cached artifact for a later install
+    (moved, so it must be on the cache's filesystem; see staging_dir).
+    Returns where it was kept, or None.
+    """
+    if not sha256 or not enabled():
+        return None
+    with _index() as index:
+        entry = index["entries"].get(sha256)
+        if entry is None:
+            return None
+        _drop_tree(sha256, entry)
+        dest = tree_path(sha256)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(extracted, dest)
+        except OSError:
+            return None
+        entry["tree"] = {"type": archive_type, "size": _tree_size(dest), "created_at": installer._now_iso()}
+        entry["last_used"] = time.time()
+    prune()
+    return dest
+
+
+def adopt_tree(sha256, archive_type, install_dir):
+    """
+    Move the kept tree of artifact sha256 to install_dir if it was extracted
+    as archive_type. Returns True if the install can skip extraction.
+    """
+    if not sha256 or os.path.lexists(install_dir) or not (cache_dir() / INDEX_NAME).exists():
+        return False
+    sha256 = sha256.lower()
+    with _index() as index:
+        entry = index["entries"].get(sha256)
+        tree = (entry or {}).get("tree")
+        if tree is None or tree["type"] != archive_type:
+            return False
+        Path(install_dir).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.rename(tree_path(sha256), install_dir)
+        except OSError:
+            _drop_tree(sha256, entry)
+            return False
+        del entry["tree"]
+        index["stats"]["bytes_saved"] += tree["size"]
+    print(f"Using the files extracted by 'void inspect' ({tree['size'] / 1024 ** 2:.1f} MB), no extraction.")
+    return True
+
+
+def _tree_size(path):
+    total = 0
+    for dirpath, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def total_size():
+    return sum(_entry_size(e) for e in _load()["entries"].values())
+
+
+def prune(limit=None):
+    """
+    Delete least recently used artifacts until the cache fits in limit bytes
+    (default: the configured cap). Returns (artifacts removed, bytes freed).
+    """
+    limit = max_bytes() if limit is None else limit
+    removed = freed = 0
+    with _index() as index:
+        total = sum(_entry_size(e) for e in index["entries"].values())
+        for sha256, entry in sorted(index["entries"].items(), key=lambda item: item[1]["last_used"]):
+            if total <= limit:
+                break
+            size = _entry_size(entry)
+            _drop_tree(sha256, entry)
+            try:
+                object_path(sha256).unlink()
+            except OSError:
+                pass
+            del index["entries"][sha256]
+            total -= size
+            removed += 1
+            freed += size
+    return removed, freed
+
+
+def free_space(needed):
+    """Give back up to `needed` bytes (before evicting apps for space)."""
+    if needed <= 0:
+        return 0
+    freed = prune(max(0, total_size() - needed))[1]
+    if freed:
+        # Dropped trees went to the trash: the space is wanted now
+        trash.empty()
+    return freed
+
+
+def stats():
+    index = _load()
+    entries = index["entries"]
+    return dict(index["stats"], artifacts=len(entries),
+                size=sum(_entry_size(e) for e in entries.values()), max_bytes=max_bytes(),
+                enabled=enabled(), entries=entries)
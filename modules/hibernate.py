@@ -0,0 +1,272 @@
+"""
+Hibernation: pack an idle app into one compressed tarball inside goinfre
+and thaw it on its next launch.
+
+The active install directory is streamed through tarfile into the best
+compressor found (zstd, then xz, multi-threaded), and ~/bin/<link> becomes
+a "thaw" shim that runs `void thaw <app>` before exec'ing the binary. A
+hibernated app costs a fraction of its size and comes back without any
+network access. Installing it again (install, install-all, restore) thaws
+instead of downloading.
+
+Layout: APPS_DIR/.hibernated/<app>.tar.zst (or .tar.xz) plus <app>.json
+with what is needed to put it back.
+"""
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+from pathlib import Path
+
+from . import apps, archive, installer, locks, trash, usage
+
+HIBERNATED_DIRNAME = ".hibernated"
+THAW_MARKER = "# void-thaw:"
+VOID_SCRIPT = Path(__file__).resolve().parent.parent / "void.py"
+
+# Compression levels: a good ratio while packing stays I/O bound
+ZSTD_LEVEL = 6
+XZ_LEVEL = 6
+
+
+def hibernated_dir():
+    return installer.APPS_DIR / HIBERNATED_DIRNAME
+
+
+def _record_path(app_name):
+    return hibernated_dir() / f"{app_name}.json"
+
+
+def read_record(app_name):
+    try:
+        with open(_record_path(app_name), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_hibernated(app_name):
+    record = read_record(app_name)
+    return record is not None and (hibernated_dir() / record["archive"]).exists()
+
+
+def hibernated_apps():
+    if not hibernated_dir().is_dir():
+        return []
+    return sorted(p.stem for p in hibernated_dir().glob("*.json") if is_hibernated(p.stem))
+
+
+def _encoder():
+    """(archive type, command or None, tarfile mode) for the best compressor available."""
+    if shutil.which("zstd"):
+        return "tar.zst", ["zstd", "-q", f"-{ZSTD_LEVEL}", "-T0", "-c"], "w|"
+    if archive._zstd is not None:
+        return "tar.zst", None, "w:zst"
+    if shutil.which("xz"):
+        return "tar.xz", ["xz", "-q", f"-{XZ_LEVEL}", "-T0", "-c"], "w|"
+    return "tar.xz", None, "w:xz"
+
+
+def _decoder(archive_type):
+    """Fastest way to decompress: a separate (multi-threaded) process beats in-process."""
+    if archive_type == "tar.zst" and shutil.which("zstd"):
+        return "zstd", ["zstd", "-dc", "-q", "-T0"]
+    if archive_type == "tar.xz" and shutil.which("xz"):
+        return "xz", ["xz", "-dc", "-q", "-T0"]
+    return "python", None
+
+
+def _dir_size(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _pack(src, dest, command, mode):
+    """Write src's contents to dest as a tarball, compressed by command (or tarfile mode)."""
+    partial = dest.with_name(dest.name + ".partial")
+
+    def add_all(tar):
+        for entry in sorted(os.listdir(src)):
+            tar.add(os.path.join(src, entry), arcname=entry)
+
+    try:
+        if command is None:
+            with tarfile.open(partial, mode) as tar:
+                add_all(tar)
+        else:
+            with open(partial, "wb") as out:
+                proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=out, stderr=subprocess.PIPE)
+                try:
+                    with tarfile.open(fileobj=proc.stdin, mode=mode) as tar:
+                        add_all(tar)
+                finally:
+                    proc.stdin.close()
+                    stderr = proc.stderr.read().decode(errors="replace").strip()
+                    returncode = proc.wait()
+                if returncode != 0:
+                    raise Exception(f"{command[0]} failed (exit code {returncode}): {stderr}")
+    except BaseException:
+        if partial.exists():
+            partial.unlink()
+        raise
+    os.replace(partial, dest)
+
+
+def _unpack(src, dest, archive_type):
+    """
+    Extract a hibernation archive into dest, exactly as it was packed (void
+    wrote it from the app's own tree, so links and modes are kept as is).
+    Returns the decoder used.
+    """
+    name, command = _decoder(archive_type)
+    if command is None:
+        archive.extract_tar(src, dest, archive_type, trusted=True)
+        return name
+
+    with open(src, "rb") as f:
+        proc = subprocess.Popen(command, stdin=f, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+            archive.extract_members(tar, dest, trusted=True)
+    finally:
+        proc.stdout.close()
+        stderr = proc.stderr.read().decode(errors="replace").strip()
+        proc.stderr.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        raise Exception(f"{name} failed (exit code {returncode}): {stderr}")
+    return name
+
+
+def thaw_shim(app_name, binary_path):
+    thaw = " ".join(shlex.quote(str(a)) for a in (sys.executable, VOID_SCRIPT, "thaw", app_name))
+    return (
+        "#!/bin/sh\n"
+        f"{THAW_MARKER} {app_name}\n"
+        f"{thaw} >&2 || exit 1\n"
+        f"exec {shlex.quote(str(binary_path))} \"$@\"\n"
+    )
+
+
+def _write_thaw_shim(app_name, binary_path):
+    app_info = apps.SUPPORTED_APPS[app_name]
+    link_path = installer.BIN_DIR / app_info["link_name"]
+    temp_link = installer.BIN_DIR / f".{app_info['link_name']}.void-tmp"
+    installer.BIN_DIR.mkdir(parents=True, exist_ok=True)
+    with locks.shared_lock("bin"):
+        if temp_link.exists() or temp_link.is_symlink():
+            temp_link.unlink()
+        temp_link.write_text(thaw_shim(app_name, binary_path))
+        temp_link.chmod(0o755)
+        os.replace(temp_link, link_path)
+
+
+def hibernate(app_name):
+    """
+    Pack an installed app into APPS_DIR/.hibernated and free its directory.
+    Returns (bytes before, bytes after), or None if it was not hibernated.
+    """
+    if app_name not in apps.SUPPORTED_APPS:
+        raise Exception(f"Unknown app: {app_name}")
+
+    with locks.app_lock(app_name):
+        app_dir = installer.APPS_DIR / app_name
+        if not app_dir.exists():
+            print(f"{app_name} is not installed.")
+            return None
+        if usage.is_running(app_name):
+            print(f"Not hibernating {app_name}: it is running.")
+            return None
+
+        # Versioned installs: pack the active version, keep the link to it
+        version = installer.active_version(app_name)
+        src = Path(os.path.realpath(app_dir))
+        binary_path = installer.get_binary_path(app_name)
+
+        hibernated_dir().mkdir(parents=True, exist_ok=True)
+        started = time.monotonic()
+        before = _dir_size(src)
+        archive_type, command, mode = _encoder()
+        archive_name = f"{app_name}.{archive_type}"
+        print(f"Hibernating {app_name} ({before / 1024 ** 2:.0f} MB) with {command[0] if command else 'python'}...")
+        _pack(src, hibernated_dir() / archive_name, command, mode)
+        after = (hibernated_dir() / archive_name).stat().st_size
+
+        record = {
+            "archive": archive_name,
+            "archive_type": archive_type,
+            "version": version,
+            "binary_path": str(binary_path),
+            "bytes_before": before,
+            "bytes_after": after,
+            "hibernated_at": installer._now_iso(),
+        }
+        with open(_record_path(app_name), "w") as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+
+        # The shim goes in before the files go away, so a launch in between thaws
+        _write_thaw_shim(app_name, binary_path)
+        trash.discard(src)
+
+    print(f"Hibernated {app_name}: {before / 1024 ** 2:.0f} MB -> {after / 1024 ** 2:.0f} MB "
+          f"in {time.monotonic() - started:.1f}s")
+    return before, after
+
+
+def thaw(app_name):
+    """
+    Unpack a hibernated app back into place and restore its ~/bin entry.
+    Returns True if it was thawed (False if it was not hibernated).
+    """
+    with locks.app_lock(app_name):
+        # A second launch may have thawed it while we waited for the lock
+        if not is_hibernated(app_name):
+            return False
+        record = read_record(app_name)
+        if record["version"]:
+            dest = installer.APPS_DIR / installer.VERSIONS_DIRNAME / app_name / record["version"]
+        else:
+            dest = installer.APPS_DIR / app_name
+        partial = dest.with_name(dest.name + ".thawing")
+        if partial.exists():
+            shutil.rmtree(partial)
+
+        started = time.monotonic()
+        archive_path = hibernated_dir() / record["archive"]
+        try:
+            decoder = _unpack(archive_path, partial, record["archive_type"])
+        except BaseException:
+            shutil.rmtree(partial, ignore_errors=True)
+            raise
+        os.rename(partial, dest)
+        elapsed = time.monotonic() - started
+
+        archive_path.unlink()
+        _record_path(app_name).unlink()
+        installer._relink_active(app_name)
+
+    print(f"Thawed {app_name} in {elapsed:.1f}s using {decoder} "
+          f"({record['bytes_after'] / 1024 ** 2:.0f} MB -> {record['bytes_before'] / 1024 ** 2:.0f} MB)")
+    return True
+
+
+def discard(app_name):
+    """Forget a hibernated copy (used when the app is removed or reinstalled from scratch)."""
+    record = read_record(app_name)
+    if record is None:
+        return
+    for path in (hibernated_dir() / record["archive"], _record_path(app_name)):
+        try:
+            path.unlink()
+        except OSError:
+            pass
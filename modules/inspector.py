@@ -6,44 +6,28 @@ Downloads, extracts, and analyzes archive structure to identify executables.
 import os
 import shutil
 import tempfile
-import tarfile
-import zipfile
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-import urllib.request
 
+from . import archive, cache, installer
 
-def download_file(url: str, target_path: Path) -> None:
-    """Download a file from URL."""
-    print(f"Downloading {url}...")
-    try:
-        req = urllib.request.Request(
-            url,
-            data=None,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'
-            }
-        )
-        with urllib.request.urlopen(req) as response, open(target_path, 'wb') as out_file:
-            shutil.copyfileobj(response, out_file)
-        print("Download complete.")
-    except Exception as e:
-        print(f"Error downloading {url}: {e}")
-        raise e
 
-
-def extract_archive(archive_path: Path, extract_to: Path, archive_type: str) -> None:
-    """Extract archive based on type."""
+def extract_archive(archive_path: Path, extract_to: Path, archive_type: str,
+                    binary_name: str = "binary") -> None:
+    """Extract archive based on type. Raw binaries are copied as binary_name."""
     extract_to.mkdir(parents=True, exist_ok=True)
     
     try:
-        if archive_type == "zip":
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(path=extract_to)
+        if archive_type == "binary":
+            # Raw executable: nothing to extract, just show it as the single file
+            target = extract_to / binary_name
+            shutil.copy(archive_path, target)
+            target.chmod(0o755)
+        elif archive_type == "zip":
+            archive.extract_zip(archive_path, extract_to)
         elif archive_type == "deb":
-            cmd = ["dpkg", "-x", str(archive_path), str(extract_to)]
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            archive.extract_deb(archive_path, extract_to)
         elif archive_type == "appimage":
             # For AppImages, we extract using --appimage-extract
             archive_path.chmod(0o755)
@@ -56,31 +40,15 @@ def extract_archive(archive_path: Path, extract_to: Path, archive_type: str) ->
                     shutil.move(str(item), str(extract_to))
                 shutil.rmtree(squashfs_root)
         else:
-            # Tarball (tar.gz, tar.xz, tar.bz2)
-            mode = "r:gz"
-            if archive_type == "tar.xz":
-                mode = "r:xz"
-            elif archive_type == "tar.bz2":
-                mode = "r:bz2"
-            
-            with tarfile.open(archive_path, mode) as tar:
-                tar.extractall(path=extract_to)
+            # Tarball (tar.gz, tar.xz, tar.bz2, tar.zst)
+            archive.extract_tar(archive_path, extract_to, archive_type)
         
         print(f"Extracted to {extract_to}")
     except Exception as e:
-        # If extraction fails, try to detect actual type from file content
-        error_msg = str(e).lower()
-        if "not a gzip file" in error_msg or "bad magic number" in error_msg:
-            # File might be a different type than detected
-            # Try to detect from file signature
-            with open(archive_path, 'rb') as f:
-                header = f.read(4)
-                if header.startswith(b'PK\x03\x04'):
-                    raise Exception(f"File appears to be a ZIP archive, not {archive_type}. Try: --type zip")
-                elif header.startswith(b'\x1f\x8b'):
-                    raise Exception(f"File appears to be a gzip archive, not {archive_type}. Try: --type tar.gz")
-                elif header.startswith(b'!<arch>') or header.startswith(b'0\x00'):
-                    raise Exception(f"File appears to be a DEB archive, not {archive_type}. Try: --type deb")
+        # If extraction fails, point at the type the file content suggests
+        actual_type = archive.sniff_file(archive_path)
+        if actual_type and actual_type != archive_type:
+            raise Exception(f"File appears to be a {actual_type} archive, not {archive_type}. Try: --type {actual_type}")
         raise e
 
 
@@ -250,7 +218,10 @@ def get_directory_tree(root_dir: Path, max_depth: int = 3, max_items: int = 50)
 
 
 def detect_archive_type(url: str) -> str:
-    """Detect archive type from URL path, filename, or content."""
+    """
+    Guess archive type from the URL path or filename.
+    Only used when the downloaded bytes don't identify the format.
+    """
     url_lower = url.lower()
     
     # First, check filename extension (most reliable)
@@ -260,6 +231,8 @@ def detect_archive_type(url: str) -> str:
         return 'deb'
     elif url_lower.endswith('.appimage'):
         return 'appimage'
+    elif url_lower.endswith('.tar.zst') or url_lower.endswith('.tzst'):
+        return 'tar.zst'
     elif url_lower.endswith('.tar.xz'):
         return 'tar.xz'
     elif url_lower.endswith('.tar.bz2'):
@@ -275,6 +248,8 @@ def detect_archive_type(url: str) -> str:
         return 'appimage'
     elif '/zip/' in url_lower or url_lower.endswith('/zip'):
         return 'zip'
+    elif '/tar.zst/' in url_lower or url_lower.endswith('/tar.zst'):
+        return 'tar.zst'
     elif '/tar.xz/' in url_lower or url_lower.endswith('/tar.xz'):
         return 'tar.xz'
     elif '/tar.bz2/' in url_lower or url_lower.endswith('/tar.bz2'):
@@ -289,33 +264,42 @@ def detect_archive_type(url: str) -> str:
 def inspect_archive(url: str, archive_type: Optional[str] = None) -> Dict:
     """
     Inspect an archive: download, extract, and analyze structure.
-    Returns analysis results.
+    With the download cache on, the archive and the extracted tree are kept
+    in it, so installing a custom app with this URL afterwards neither
+    downloads nor extracts it again. Returns analysis results.
     """
-    if archive_type is None:
-        archive_type = detect_archive_type(url)
-    
-    # Create temporary directory
-    temp_dir = Path(tempfile.mkdtemp(prefix="void_inspect_"))
+    # Work next to the cache (same filesystem): keeping the results is a rename
+    try:
+        work_dir = cache.staging_dir() if cache.enabled() else None
+    except OSError:
+        work_dir = None  # no goinfre here: plain temp dir, nothing kept
+    temp_dir = Path(tempfile.mkdtemp(prefix="void_inspect_", dir=work_dir))
     archive_path = temp_dir / "archive"
     extract_dir = temp_dir / "extracted"
     
+    cached = None
     try:
-        # Download
-        download_file(url, archive_path)
+        # Download, unless an install (or an earlier inspection) cached it
+        cached = cache.open_cached(url)
+        if cached is not None:
+            archive_path, dl_meta = cached
+        else:
+            dl_meta = installer.download_file(url, archive_path)
+        detected_type = dl_meta.get("detected_type") or archive.sniff_file(archive_path)
+        
+        # The content decides; the URL is only a fallback when it's unrecognized
+        declared_type = archive_type or detect_archive_type(url)
+        archive_type = archive.resolve_type(declared_type, detected_type)
+        if archive_type != declared_type:
+            print(f"Note: content looks like '{archive_type}', not '{declared_type}'.")
         
         # Extract
         print(f"Extracting {archive_type} archive...")
-        try:
-            extract_archive(archive_path, extract_dir, archive_type)
-        except Exception as extract_error:
-            # If extraction fails and type was auto-detected, suggest alternatives
-            error_str = str(extract_error).lower()
-            if archive_type == "tar.gz" and ("not a gzip" in error_str or "bad magic" in error_str):
-                # Might be a deb file
-                print(f"\n⚠ Warning: Extraction failed. The file might be a .deb archive.")
-                print(f"   Try: ./void.py inspect {url} --type deb")
-                raise Exception(f"Failed to extract as {archive_type}. File might be a different archive type. Try specifying --type deb")
-            raise extract_error
+        binary_name = url.split("?")[0].rstrip("/").split("/")[-1] or "binary"
+        extract_archive(archive_path, extract_dir, archive_type, binary_name)
+        if cached is None:
+            # Keep it: the install that usually follows needs the same bytes
+            dl_meta["sha256"] = cache.store(archive_path, url, dl_meta)
         
         # Find root directory (often archives have a single root folder)
         entries = list(extract_dir.iterdir())
@@ -356,6 +340,9 @@ def inspect_archive(url: str, archive_type: Optional[str] = None) -> Dict:
             'extract_root': str(root_content.relative_to(extract_dir)) if root_content != extract_dir else ".",
             'directory_tree': tree,
             'executables': executable_paths,
+            # Raw binaries are placed differently by the installer: nothing to hand over
+            'kept_tree': None if archive_type == "binary" else
+                         cache.keep_tree(dl_meta.get("sha256"), extract_dir, archive_type),
             'temp_dir': temp_dir,  # Keep for cleanup
         }
     
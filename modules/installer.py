@@ -1,14 +1,17 @@
+import hashlib
 import os
+import re
 import shutil
+import urllib.error
 import urllib.request
-import tarfile
-import zipfile
 import subprocess
 from pathlib import Path
 import sys
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from . import apps
+from . import apps, archive, cache, hibernate, locks, postinstall, prefetch, templates, trash, usage
 
 # Constants
 # Default to /goinfre/$USER if not overridden
@@ -21,6 +24,80 @@ DESKTOP_DIR = Path.home() / ".local" / "share" / "applications"
 
 
 META_FILENAME = ".void_meta.json"
+# Side-by-side versions: APPS_DIR/.versions/<app>/<version>. Once an app has
+# been updated, APPS_DIR/<app> is a symlink to the active version.
+VERSIONS_DIRNAME = ".versions"
+# Versions kept per app, the active one included
+KEEP_VERSIONS = 2
+
+# Per-thread progress reporting for background installs (TUI job queue)
+_progress = threading.local()
+
+
+class InstallCancelled(Exception):
+    pass
+
+
+@contextmanager
+def progress_hook(callback, cancel_event=None):
+    """
+    Route this thread's install progress to callback(stage, fraction).
+    fraction is 0..1 while downloading with a known size, otherwise None.
+    If cancel_event gets set, the install stops at its next progress report
+    with InstallCancelled.
+    """
+    _progress.callback = callback
+    _progress.cancel = cancel_event
+    try:
+        yield
+    finally:
+        _progress.callback = None
+        _progress.cancel = None
+
+
+def report_progress(stage, fraction=None):
+    cancel = getattr(_progress, "cancel", None)
+    if cancel is not None and cancel.is_set():
+        raise InstallCancelled("Cancelled")
+    callback = getattr(_progress, "callback", None)
+    if callback is not None:
+        callback(stage, fraction)
+
+
+class _ProgressWriter:
+    """File wrapper that reports download progress as chunks are written."""
+
+    def __init__(self, f, total):
+        self._f = f
+        self._total = total
+        self._done = 0
+
+    def write(self, data):
+        self._done += len(data)
+        report_progress("downloading", min(1.0, self._done / self._total) if self._total else None)
+        return self._f.write(data)
+
+
+class _HashingWriter:
+    """File wrapper that computes the sha256 and size of what is written."""
+
+    def __init__(self, f):
+        self._f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
 def _meta_path_for_app(app_name: str) -> Path:
@@ -72,11 +149,11 @@ def fetch_url_metadata(url: str):
         return {"url": url, "resolved_url": url}
 
 
-def _write_app_meta(app_name: str, meta: dict):
+def _write_app_meta(app_name: str, meta: dict, app_dir=None):
     try:
-        app_dir = APPS_DIR / app_name
+        app_dir = app_dir or APPS_DIR / app_name
         app_dir.mkdir(parents=True, exist_ok=True)
-        meta_path = _meta_path_for_app(app_name)
+        meta_path = app_dir / META_FILENAME
         with open(meta_path, "w") as f:
             json.dump(meta, f, indent=2, sort_keys=True)
     except Exception:
@@ -84,8 +161,8 @@ def _write_app_meta(app_name: str, meta: dict):
         pass
 
 
-def _read_app_meta(app_name: str):
-    meta_path = _meta_path_for_app(app_name)
+def _read_app_meta(app_name: str, app_dir=None):
+    meta_path = (app_dir or APPS_DIR / app_name) / META_FILENAME
     if not meta_path.exists():
         return None
     try:
@@ -117,6 +194,31 @@ def _ensure_app_meta(app_name: str, app_info: dict):
     )
 
 
+def get_binary_path(app_name, app_info=None, archive_type=None, app_dir=None):
+    """
+    Path of the executable for an app. Extracted AppImages always use AppRun,
+    everything else uses bin_path. The type recorded at install time wins over
+    the catalog type, since the download may have been re-detected, and a
+    version installed with `void use` keeps the bin_path of that version.
+    app_dir defaults to the active install (APPS_DIR/<app>).
+    """
+    if app_info is None:
+        app_info = apps.SUPPORTED_APPS[app_name]
+    if archive_type is None:
+        meta = _read_app_meta(app_name, app_dir) or {}
+        archive_type = meta.get("archive_type") or app_info["type"]
+        installed_version = meta.get("version")
+        if installed_version and installed_version != app_info.get("version") and apps.is_versioned(app_info):
+            app_info = apps.pin_version(app_info, installed_version)
+        if meta.get("locked") and meta.get("bin_path"):
+            # Installed from a lockfile: the locked bin_path, not today's catalog
+            app_info = dict(app_info, bin_path=meta["bin_path"])
+    app_install_dir = app_dir or APPS_DIR / app_name
+    if archive_type == "appimage":
+        return app_install_dir / "AppRun"
+    return app_install_dir / app_info["bin_path"]
+
+
 def get_installed_apps():
     """Get list of installed apps with metadata."""
     installed = []
@@ -210,11 +312,7 @@ def get_app_info(app_name: str):
     size = sum(f.stat().st_size for f in app_dir.rglob('*') if f.is_file())
     
     # Check binary
-    if app_info['type'] == 'appimage':
-        binary_path = app_dir / "AppRun"
-    else:
-        binary_path = app_dir / app_info['bin_path']
-    
+    binary_path = get_binary_path(app_name, app_info)
     binary_exists = binary_path.exists()
     
     # Check symlink
@@ -327,63 +425,91 @@ def link_data_dirs(app_name, data_paths):
     If Home dir doesn't exist, create it in Goinfre and link.
     Handles broken symlinks (e.g. after migrating to a new post).
     """
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    with locks.shared_lock("data"):
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    for relative_path in data_paths:
-        home_path = Path.home() / relative_path
-        goinfre_path = DATA_DIR / app_name / \
-            relative_path.replace("/", "_").strip(".")
-
-        # If we're linking a nested path (e.g. ~/.vscode/extensions),
-        # ensure the parent in $HOME is a real directory (not a symlink).
-        # This avoids "mkdir: ... File exists" errors from apps/scripts that
-        # expect to create the parent directory.
-        if home_path.parent != Path.home():
-            _materialize_symlink_dir(home_path.parent, exclude_names=[home_path.name])
+        for relative_path in data_paths:
+            home_path = Path.home() / relative_path
+            goinfre_path = data_link_target(app_name, relative_path)
+
+            # If we're linking a nested path (e.g. ~/.vscode/extensions),
+            # ensure the parent in $HOME is a real directory (not a symlink).
+            # This avoids "mkdir: ... File exists" errors from apps/scripts that
+            # expect to create the parent directory.
+            if home_path.parent != Path.home():
+                _materialize_symlink_dir(home_path.parent, exclude_names=[home_path.name])
+                home_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Ensure goinfre parent exists
+            goinfre_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Case 1: Symlink already correct
+            # NOTE: also ensure the goinfre target exists. It's possible to have a
+            # symlink that points to the right place but the target directory was
+            # wiped (common after migration / cleanup).
+            # A broken symlink (e.g. old post path) is relinked below.
+            if _data_linked(home_path, goinfre_path):
+                if not goinfre_path.exists():
+                    goinfre_path.mkdir(parents=True, exist_ok=True)
+                continue
+
+            # Case 2: Real directory exists in Home (User has existing data)
+            if home_path.exists() and not home_path.is_symlink():
+                print(f"Moving existing data from {home_path} to {goinfre_path}...")
+                if goinfre_path.exists():
+                    print(
+                        f"Warning: {goinfre_path} already exists. Backing up home version and using goinfre.")
+                    shutil.move(home_path, home_path.with_suffix(".bak"))
+                else:
+                    shutil.move(home_path, goinfre_path)
+
+            # Case 3: Nothing in Goinfre yet. Create directory in Goinfre.
+            if not goinfre_path.exists():
+                goinfre_path.mkdir(parents=True, exist_ok=True)
+
+            # Remove whatever is at home_path (real dir, symlink, or broken symlink)
+            _remove_home_path_for_relink(home_path)
+
+            # Ensure parent of home_path exists (e.g. .config/)
             home_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Ensure goinfre parent exists
-        goinfre_path.parent.mkdir(parents=True, exist_ok=True)
+            home_path.symlink_to(goinfre_path)
+            print(f"Linked data {home_path} -> {goinfre_path}")
 
-        # Case 1: Symlink already correct
-        # NOTE: also ensure the goinfre target exists. It's possible to have a
-        # symlink that points to the right place but the target directory was
-        # wiped (common after migration / cleanup).
-        if home_path.is_symlink():
-            try:
-                if home_path.resolve() == goinfre_path.resolve():
-                    if not goinfre_path.exists():
-                        goinfre_path.mkdir(parents=True, exist_ok=True)
-                    continue
-            except (OSError, RuntimeError):
-                # Broken symlink (e.g. old post path) - we will relink below
-                pass
-
-        # Case 2: Real directory exists in Home (User has existing data)
-        if home_path.exists() and not home_path.is_symlink():
-            print(f"Moving existing data from {home_path} to {goinfre_path}...")
-            if goinfre_path.exists():
-                print(
-                    f"Warning: {goinfre_path} already exists. Backing up home version and using goinfre.")
-                shutil.move(home_path, home_path.with_suffix(".bak"))
-            else:
-                shutil.move(home_path, goinfre_path)
 
-        # Case 3: Nothing in Goinfre yet. Create directory in Goinfre.
-        if not goinfre_path.exists():
-            goinfre_path.mkdir(parents=True, exist_ok=True)
+def data_link_target(app_name, relative_path):
+    """Where a data path of app_name lives in goinfre."""
+    return DATA_DIR / app_name / relative_path.replace("/", "_").strip(".")
+
 
-        # Remove whatever is at home_path (real dir, symlink, or broken symlink)
-        _remove_home_path_for_relink(home_path)
+def _data_linked(home_path, goinfre_path):
+    """True if home_path is a symlink that resolves to goinfre_path."""
+    if not home_path.is_symlink():
+        return False
+    try:
+        return home_path.resolve() == goinfre_path.resolve()
+    except (OSError, RuntimeError):
+        return False
 
-        # Ensure parent of home_path exists (e.g. .config/)
-        home_path.parent.mkdir(parents=True, exist_ok=True)
 
-        home_path.symlink_to(goinfre_path)
-        print(f"Linked data {home_path} -> {goinfre_path}")
+def broken_data_paths(app_name, app_info):
+    """The app's data_paths that link_data_dirs would have to redo."""
+    broken = []
+    for relative_path in app_info.get("data_paths", []):
+        home_path = Path.home() / relative_path
+        goinfre_path = data_link_target(app_name, relative_path)
+        if home_path.parent != Path.home() and home_path.parent.is_symlink():
+            broken.append(relative_path)
+        elif not _data_linked(home_path, goinfre_path) or not goinfre_path.is_dir():
+            broken.append(relative_path)
+    return broken
 
 
-def download_file(url, target_path):
+def download_file(url, target_path, sha256=None):
+    """
+    Stream url into target_path, hashing it on the way.
+    With sha256, a download that does not match is deleted and raises.
+    """
     print(f"Downloading {url}...")
     try:
         # User-Agent is sometimes needed for some sites to allow download script
@@ -395,7 +521,24 @@ def download_file(url, target_path):
             }
         )
         with urllib.request.urlopen(req) as response, open(target_path, 'wb') as out_file:
-            shutil.copyfileobj(response, out_file)
+            hashed = _HashingWriter(out_file)
+            # Sniff the real format from the first chunk as it streams past
+            head = response.read(archive.SNIFF_SIZE)
+            hashed.write(head)
+            if getattr(_progress, "callback", None) or getattr(_progress, "cancel", None):
+                try:
+                    total = int(response.headers.get("Content-Length") or 0)
+                except (TypeError, ValueError):
+                    total = 0
+                writer = _ProgressWriter(hashed, total)
+                writer._done = len(head)
+                shutil.copyfileobj(response, writer)
+            else:
+                shutil.copyfileobj(response, hashed)
+        digest = hashed.sha256.hexdigest()
+        if sha256 and digest != sha256.lower():
+            Path(target_path).unlink()
+            raise Exception(f"Checksum mismatch: expected sha256 {sha256}, got {digest}")
         print("Download complete.")
         return {
             "url": url,
@@ -403,41 +546,36 @@ def download_file(url, target_path):
             "etag": response.headers.get("ETag"),
             "last_modified": response.headers.get("Last-Modified"),
             "content_length": response.headers.get("Content-Length"),
+            "detected_type": archive.sniff_format(head),
+            "sha256": digest,
+            "size": hashed.size,
         }
     except Exception as e:
         print(f"Error downloading {url}: {e}")
         raise e
 
 
-def extract_tar(archive_path, extract_to):
+def extract_tar(archive_path, extract_to, archive_type=None, reuse_from=None, stats=None):
     print(f"Extracting {archive_path}...")
     try:
-        # Detect mode based on suffix
-        mode = "r:gz"
-        path_str = str(archive_path)
-        if path_str.endswith("tar.xz") or path_str.endswith(".txz"):
-            mode = "r:xz"
-        elif path_str.endswith("tar.bz2"):
-            mode = "r:bz2"
-
-        with tarfile.open(archive_path, mode) as tar:
-            tar.extractall(path=extract_to)
+        # Compression comes from the catalog type; fall back to the suffix
+        if archive_type not in archive.TAR_TYPES:
+            archive_type = archive.tar_type_from_name(archive_path)
+        archive.extract_tar(archive_path, extract_to, archive_type, reuse_from=reuse_from, stats=stats)
         print("Extraction complete.")
     except Exception as e:
         print(f"Error extracting {archive_path}: {e}")
         raise e
 
 
-def extract_zip(archive_path, extract_to):
+def extract_zip(archive_path, extract_to, reuse_from=None, stats=None):
     """
     Extract .zip archive.
     Extracts to 'extract_to' directory.
     """
     print(f"Extracting ZIP {archive_path}...")
     try:
-        Path(extract_to).mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-            zip_ref.extractall(path=extract_to)
+        archive.extract_zip(archive_path, extract_to, reuse_from=reuse_from, stats=stats)
         print("Extraction complete.")
     except Exception as e:
         print(f"Error extracting zip: {e}")
@@ -446,45 +584,65 @@ def extract_zip(archive_path, extract_to):
 
 def extract_deb(archive_path, extract_to):
     """
-    Extract .deb package using dpkg -x (does not require root).
+    Extract .deb package (does not require root or dpkg).
+    The payload goes through the same writer stage as tarballs.
     Extracts to 'extract_to' directory.
     """
     print(f"Extracting DEB {archive_path}...")
     try:
-        # dpkg -x <deb> <dir>
-        # Ensure target dir actually exists
-        Path(extract_to).mkdir(parents=True, exist_ok=True)
-
-        cmd = ["dpkg", "-x", str(archive_path), str(extract_to)]
-        result = subprocess.run(
-            cmd, check=True, capture_output=True, text=True)
+        archive.extract_deb(archive_path, extract_to)
         print("Extraction complete.")
-    except subprocess.CalledProcessError as e:
-        print(f"Error extracting deb: {e.stderr}")
-        raise Exception(f"Failed to extract deb: {e.stderr}")
     except Exception as e:
         print(f"Error extracting deb: {e}")
         raise e
 
 
-def create_symlink(target, link_name):
+def create_symlink(target, link_name, app_name=None):
+    """
+    Point ~/bin/<link_name> at target. With usage tracking on (and app_name
+    given) this is a launch shim instead of a symlink; see modules/usage.py.
+    """
     # Ensure bin dir exists
     BIN_DIR.mkdir(parents=True, exist_ok=True)
 
     link_path = BIN_DIR / link_name
+    temp_link = BIN_DIR / f".{link_name}.void-tmp"
+
+    with locks.shared_lock("bin"):
+        # Build the new link aside and rename it over the old one, so the
+        # command never disappears, even for a moment
+        if temp_link.exists() or temp_link.is_symlink():
+            temp_link.unlink()
+        if link_path.is_dir() and not link_path.is_symlink():
+            raise Exception(f"{link_path} is a directory, not replacing it")
+
+        if app_name and usage.enabled():
+            print(f"Linking {target} -> {link_path} (usage shim)")
+            temp_link.write_text(usage.shim_script(app_name, target))
+            temp_link.chmod(0o755)
+        else:
+            print(f"Linking {target} -> {link_path}")
+            temp_link.symlink_to(target)
+        os.replace(temp_link, link_path)
 
-    # Remove existing link/file if it exists
-    if link_path.exists() or link_path.is_symlink():
-        link_path.unlink()
 
-    print(f"Linking {target} -> {link_path}")
-    link_path.symlink_to(target)
+def install_binary(source_path, install_dir, bin_path):
+    """
+    Place a raw executable (no archive) at install_dir/bin_path and chmod it.
+    """
+    print(f"Installing binary {bin_path}...")
+    target = Path(install_dir) / bin_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(source_path, target)
+    target.chmod(0o755)
 
 
 def install_appimage(app_name, source_path, install_dir):
     """
     Extract AppImage using --appimage-extract.
     This creates 'squashfs-root' which we then move to install_dir.
+    The AppImage's own runtime writes the files (void has no squashfs
+    reader), so this does not go through archive.WriterPool.
     """
     print(f"Extracting AppImage for {app_name}...")
     install_dir.mkdir(parents=True, exist_ok=True)
@@ -653,89 +811,245 @@ Terminal=false
 Categories=Utility;Development;
 Comment=Managed by Void
 """
-        with open(desktop_file, "w") as f:
-            f.write(content)
+        with locks.shared_lock("desktop"):
+            with open(desktop_file, "w") as f:
+                f.write(content)
 
-        # Make executable
-        desktop_file.chmod(0o755)
+            # Make executable
+            desktop_file.chmod(0o755)
         print(f"Created desktop entry: {desktop_file}")
 
     except Exception as e:
         print(f"Warning: Failed to create desktop entry: {e}")
 
 
-def run_post_install_scripts(app_name, scripts, binary_path):
+def desktop_entry_problem(app_name, app_info):
+    """Why the app's desktop entry needs rewriting, or None if it is fine."""
+    desktop_file = DESKTOP_DIR / f"void_{app_name}.desktop"
+    try:
+        content = desktop_file.read_text()
+    except OSError:
+        return "desktop entry missing"
+    if f"\nExec={BIN_DIR / app_info['link_name']}\n" not in content:
+        return "desktop entry points elsewhere"
+    for line in content.splitlines():
+        if line.startswith("Icon="):
+            icon = line[len("Icon="):]
+            if icon.startswith("/") and not os.path.exists(icon):
+                return "desktop icon missing"
+    return None
+
+
+POST_INSTALL_CACHE = ".void_post_install.json"
+
+
+def _post_install_cache_path(app_name):
+    # Lives next to the app's data so it is lost together with what the
+    # steps produced (extensions, plugins...), not with the app dir.
+    return DATA_DIR / app_name / POST_INSTALL_CACHE
+
+
+def _read_post_install_cache(app_name):
+    try:
+        with open(_post_install_cache_path(app_name), "r") as f:
+            return json.load(f).get("steps", {})
+    except Exception:
+        return {}
+
+
+def _write_post_install_cache(app_name, steps):
+    try:
+        path = _post_install_cache_path(app_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"steps": steps}, f, indent=2, sort_keys=True)
+    except Exception:
+        # Cache only saves time; never fail an install over it
+        pass
+
+
+def _post_install_identity(app_name, binary_path):
+    """Identity of the installed target that post-install steps ran against."""
+    meta = _read_app_meta(app_name) or {}
+    try:
+        binary_size = Path(binary_path).stat().st_size
+    except OSError:
+        binary_size = None
+    return {
+        "resolved_url": meta.get("resolved_url") or meta.get("source_url"),
+        "etag": meta.get("etag"),
+        "content_length": meta.get("content_length"),
+        "binary": str(binary_path),
+        "binary_size": binary_size,
+    }
+
+
+def run_post_install_scripts(app_name, scripts, binary_path, rerun=False):
     """
     Execute post-install scripts for an application.
-    Scripts can use {bin} placeholder for the binary path.
+    Scripts can use {bin} and {link} placeholders. See modules/postinstall.py
+    for ordering ("after"), concurrency groups and per-step timeouts.
+    Steps that already succeeded against the same command and binary are
+    skipped unless rerun is True.
+    Returns the per-step results.
     """
     print(f"\n--- Running post-install scripts for {app_name} ---")
-    
-    for idx, script in enumerate(scripts, 1):
-        # Replace placeholders
-        script = script.replace("{bin}", str(binary_path))
-        script = script.replace("{link}", str(BIN_DIR / apps.SUPPORTED_APPS[app_name]["link_name"]))
-        
-        print(f"[{idx}/{len(scripts)}] Executing: {script}")
-        
+
+    try:
+        steps = postinstall.normalize_steps(scripts)
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return []
+
+    placeholders = {
+        "bin": binary_path,
+        "link": BIN_DIR / apps.SUPPORTED_APPS[app_name]["link_name"],
+    }
+    cache = _read_post_install_cache(app_name)
+    results = postinstall.run_steps(
+        steps,
+        placeholders,
+        identity=_post_install_identity(app_name, binary_path),
+        cached=() if rerun else set(cache),
+    )
+
+    # Only keep fingerprints of steps in the current list
+    done = {r["fingerprint"]: cache.get(r["fingerprint"]) for r in results if r["status"] == "cached"}
+    for r in results:
+        if r["status"] == "ok":
+            done[r["fingerprint"]] = {"id": r["id"], "finished_at": _now_iso(), "duration": r["duration"]}
+    _write_post_install_cache(app_name, done)
+
+    failed = [r["id"] for r in results if r["status"] not in ("ok", "cached")]
+    skipped = sum(1 for r in results if r["status"] == "cached")
+    total = sum(r["duration"] for r in results)
+    print(f"Post-install: {len(results) - len(failed)}/{len(results)} steps succeeded in {total:.1f}s"
+          + (f", {skipped} already done" if skipped else "")
+          + (f" (not ok: {', '.join(failed)})" if failed else ""))
+    return results
+
+
+def _run_app_post_install(app_name, app_info, binary_path, rerun=False):
+    """Run an app's post_install steps and keep their durations in its meta for tuning."""
+    results = run_post_install_scripts(app_name, app_info["post_install"], binary_path, rerun)
+    meta = _read_app_meta(app_name) or {}
+    meta["post_install"] = [
+        {"id": r["id"], "status": r["status"], "duration": r["duration"]} for r in results
+    ]
+    _write_app_meta(app_name, meta)
+
+
+def link_fixups(app_name, app_info=None, binary_path=None):
+    """
+    What is out of place around an installed app - ~/bin link, desktop
+    entry, data links, install metadata - as planner actions in ACTIONS
+    order (see modules/planner.py). Only stats, readlinks and reads the
+    small .desktop file.
+    """
+    app_info = app_info or apps.SUPPORTED_APPS[app_name]
+    binary_path = binary_path or get_binary_path(app_name, app_info)
+
+    actions = []
+    link_path = BIN_DIR / app_info["link_name"]
+    if not usage.link_matches(app_name, link_path, binary_path):
+        reason = "bin link missing" if not os.path.lexists(link_path) else "bin link points elsewhere"
+        actions.append(dict(app=app_name, action="link-bin", reason=reason, target=str(binary_path)))
+
+    reason = desktop_entry_problem(app_name, app_info)
+    if reason:
+        actions.append(dict(app=app_name, action="desktop", reason=reason))
+
+    broken = broken_data_paths(app_name, app_info)
+    if broken:
+        actions.append(dict(app=app_name, action="link-data",
+                            reason=f"{len(broken)} data link(s) wrong", paths=broken))
+
+    if _read_app_meta(app_name) is None:
+        actions.append(dict(app=app_name, action="write-meta", reason="install metadata missing"))
+    return actions
+
+
+def apply_fixup(action):
+    """Perform one action from link_fixups."""
+    app_name = action["app"]
+    app_info = apps.SUPPORTED_APPS[app_name]
+    if action["action"] == "link-bin":
+        create_symlink(Path(action["target"]), app_info["link_name"], app_name)
+    elif action["action"] == "desktop":
+        create_desktop_entry(app_name, app_info)
+    elif action["action"] == "link-data":
+        link_data_dirs(app_name, action["paths"])
+    elif action["action"] == "write-meta":
+        _ensure_app_meta(app_name, app_info)
+
+
+def _apply_link_fixups(actions):
+    for action in actions:
         try:
-            result = subprocess.run(
-                script,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-            
-            if result.returncode == 0:
-                print(f"  ✓ Success")
-                if result.stdout.strip():
-                    print(f"  Output: {result.stdout.strip()}")
-            else:
-                print(f"  ✗ Failed (exit code {result.returncode})")
-                if result.stderr.strip():
-                    print(f"  Error: {result.stderr.strip()}")
-                    
-        except subprocess.TimeoutExpired:
-            print(f"  ✗ Timeout (exceeded 5 minutes)")
+            apply_fixup(action)
         except Exception as e:
-            print(f"  ✗ Error: {e}")
+            print(f"Warning: {action['action']} failed: {e}")
 
 
-def install_app(app_name, force=False):
-    print(f"\n--- Installing {app_name} ---")
+def reuse_existing_install(app_name, force=False, rerun_post_install=False):
+    """
+    Handle an app whose directory already exists.
+    Returns True if the existing install was relinked and nothing else is
+    needed; otherwise clears the directory so a fresh install can proceed.
+    With rerun_post_install, an existing install also reruns its post_install
+    steps.
+    """
     app_info = apps.SUPPORTED_APPS[app_name]
-
-    # Prepare paths
     app_install_dir = APPS_DIR / app_name
 
-    # 1. Check if already installed
-    if app_install_dir.exists():
-        print(
-            f"{app_name} seems to be installed at {app_install_dir}. Checking symlink...")
+    if not force and hibernate.is_hibernated(app_name):
+        # Unpacking the local copy beats downloading it again
+        hibernate.thaw(app_name)
 
-        if force:
-            print("Force reinstall requested. Removing existing installation...")
-            shutil.rmtree(app_install_dir)
-        else:
-        # Verify binary
-            if app_info["type"] == "appimage":
-                # For extracted AppImages, we always use AppRun
-                binary_path = app_install_dir / "AppRun"
-            else:
-                binary_path = app_install_dir / app_info["bin_path"]
-
-            if binary_path.exists():
-                create_symlink(binary_path, app_info["link_name"])
-                create_desktop_entry(app_name, app_info)
-                if "data_paths" in app_info:
-                    link_data_dirs(app_name, app_info["data_paths"])
-                _ensure_app_meta(app_name, app_info)
-                print(f"{app_name} is ready.")
-                return
-            else:
-                print(f"Components missing. Re-installing...")
-                shutil.rmtree(app_install_dir)
+    if not app_install_dir.exists():
+        # Deleted by hand: a kept template brings it back without a download
+        return templates.restore(app_name, rerun_post_install)
+
+    print(
+        f"{app_name} seems to be installed at {app_install_dir}. Checking symlink...")
+
+    if force:
+        print("Force reinstall requested. Removing existing installation...")
+        if templates.restore(app_name, rerun_post_install):
+            return True
+        remove_app_files(app_name)
+        return False
+
+    binary_path = get_binary_path(app_name, app_info)
+    if binary_path.exists():
+        # Only redo what is actually out of place
+        actions = link_fixups(app_name, app_info, binary_path)
+        for action in actions:
+            print(f"Fixing {action['action']}: {action['reason']}")
+        _apply_link_fixups(actions)
+        if rerun_post_install and "post_install" in app_info:
+            _run_app_post_install(app_name, app_info, get_binary_path(app_name, app_info), rerun=True)
+        print(f"{app_name} is ready." if actions else f"{app_name} is ready (nothing to change).")
+        return True
+
+    print(f"Components missing. Re-installing...")
+    if templates.restore(app_name, rerun_post_install):
+        return True
+    remove_app_files(app_name)
+    return False
+
+
+def download_app(app_name, app_info=None):
+    """
+    Download stage: fetch the app's artifact into APPS_DIR.
+    app_info defaults to the catalog entry (pass a pinned one for another version).
+    Returns (temp_download_path, download metadata dict).
+    """
+    app_info = app_info or apps.SUPPORTED_APPS[app_name]
+    report_progress("downloading", 0.0)
+
+    # Make room first if the user enabled automatic eviction
+    usage.auto_evict(exclude=(app_name,))
 
     # Create installation directory
     APPS_DIR.mkdir(parents=True, exist_ok=True)
@@ -748,40 +1062,142 @@ def install_app(app_name, force=False):
 
     temp_download_path = APPS_DIR / f"{app_name}_temp_{filename}"
 
-    # 2. Download
+    # Already fetched (or being fetched) while the app was selected in the TUI
+    dl_meta = prefetch.claim(app_name, app_info, temp_download_path)
+    if dl_meta is not None:
+        return temp_download_path, dl_meta
+
+    # Downloaded before (reinstall, repair, an older version again)
+    dl_meta = cache.fetch(app_info, temp_download_path)
+    if dl_meta is not None:
+        return temp_download_path, dl_meta
+
+    if app_info.get("sha256"):
+        # Locked artifact (void import --locked): exactly this file, verified
+        dl_meta = _reuse_artifact(temp_download_path, app_info)
+        if dl_meta is None:
+            dl_meta = _download_locked(app_info, temp_download_path)
+        return temp_download_path, dl_meta
+
     dl_meta = download_file(app_info["url"], temp_download_path) or {}
+    return temp_download_path, dl_meta
+
 
-    # 3. Extract or Move
+def _download_locked(app_info, target_path):
+    """
+    Download a locked artifact from its resolved URL, or from its source URL
+    if that fails (signed release-asset URLs expire). Verified either way.
+    """
+    fallback = app_info.get("source_url")
+    try:
+        return download_file(app_info["url"], target_path, sha256=app_info["sha256"]) or {}
+    except urllib.error.URLError:
+        if not fallback or fallback == app_info["url"]:
+            raise
+    print(f"Resolved URL is no longer valid, downloading from {fallback} instead.")
+    return download_file(fallback, target_path, sha256=app_info["sha256"]) or {}
+
+
+def _reuse_artifact(path, app_info):
+    """
+    Download metadata for a file already at path if it is the locked
+    artifact (same size, then same sha256), else None.
+    """
     try:
-        if app_info["type"] == "appimage":
-            # AppImage logic - Extract
+        if app_info.get("size") and path.stat().st_size != int(app_info["size"]):
+            return None
+        if file_sha256(path) != app_info["sha256"].lower():
+            return None
+    except OSError:
+        return None
+    print(f"Using local copy of {app_info['url']} (sha256 verified).")
+    return {
+        "url": app_info["url"],
+        "resolved_url": app_info["url"],
+        "etag": app_info.get("etag"),
+        "content_length": str(app_info["size"]) if app_info.get("size") else None,
+        "sha256": app_info["sha256"].lower(),
+        "size": path.stat().st_size,
+    }
+
+
+def extract_app(app_name, temp_download_path, dl_meta, install_dir=None, app_info=None,
+                reuse_from=None, diff_stats=None):
+    """
+    Extract stage: unpack (or place) a downloaded artifact into the app dir
+    (or into install_dir, e.g. a new version staged next to the active one).
+    With reuse_from (the installed previous version), tarball and zip members
+    that did not change are hardlinked from it instead of written; diff_stats
+    (archive.new_diff_stats()) records the bytes written and reused.
+    Returns the archive type that was actually used.
+    """
+    app_info = app_info or apps.SUPPORTED_APPS[app_name]
+    app_install_dir = install_dir or APPS_DIR / app_name
+    report_progress("extracting")
+
+    # The catalog type can be wrong (or a raw binary typed as appimage), so
+    # trust the magic bytes of what was actually downloaded.
+    detected_type = dl_meta.get("detected_type") or archive.sniff_file(temp_download_path)
+    archive_type = archive.resolve_type(app_info["type"], detected_type)
+    if archive_type != app_info["type"]:
+        print(f"Note: download looks like '{archive_type}', not '{app_info['type']}'. Installing as {archive_type}.")
+
+    # The artifact is kept in the cache instead of deleted once it is in place
+    url = app_info["url"]
+    if archive_type != "binary" and cache.adopt_tree(dl_meta.get("sha256"), archive_type, app_install_dir):
+        # `void inspect` already extracted these exact bytes
+        cache.store(temp_download_path, url, dl_meta)
+        return archive_type
+
+    cached_sha = None
+    try:
+        if archive_type == "binary":
+            # Raw executable - just place and chmod (the cache keeps its own copy)
+            cache.unshare(temp_download_path)
+            cache.store(temp_download_path, url, dl_meta, mode="copy")
+            install_binary(temp_download_path, app_install_dir, app_info["bin_path"])
+
+        elif archive_type == "appimage":
+            # AppImage logic - Extract (consumes the file; the cache keeps a link)
+            cached_sha = cache.store(temp_download_path, url, dl_meta, mode="link")
             install_appimage(app_name, temp_download_path, app_install_dir)
 
-        elif app_info["type"] == "deb":
+        elif archive_type == "deb":
             # DEB logic
             app_install_dir.mkdir(parents=True, exist_ok=True)
             extract_deb(temp_download_path, app_install_dir)
-            temp_download_path.unlink()
+            cache.store(temp_download_path, url, dl_meta)
 
-        elif app_info["type"] == "zip":
+        elif archive_type == "zip":
             # ZIP logic
             app_install_dir.mkdir(parents=True, exist_ok=True)
-            extract_zip(temp_download_path, app_install_dir)
-            temp_download_path.unlink()
+            extract_zip(temp_download_path, app_install_dir, reuse_from, diff_stats)
+            cache.store(temp_download_path, url, dl_meta)
 
         else:
-            # Tarball logic (tar.gz, tar.xz, tar.bz2)
+            # Tarball logic (tar, tar.gz, tar.xz, tar.bz2, tar.zst)
             app_install_dir.mkdir(parents=True, exist_ok=True)
-            extract_tar(temp_download_path, app_install_dir)
-            temp_download_path.unlink()
+            extract_tar(temp_download_path, app_install_dir, archive_type, reuse_from, diff_stats)
+            cache.store(temp_download_path, url, dl_meta)
     except Exception as e:
+        if cached_sha:
+            cache.forget(cached_sha)
         raise Exception(f"Installation failed during extraction: {e}")
 
-    # 4. Link
-    if app_info["type"] == "appimage":
-        binary_path = app_install_dir / "AppRun"
-    else:
-        binary_path = app_install_dir / app_info["bin_path"]
+    return archive_type
+
+
+def link_app(app_name, archive_type, dl_meta, app_info=None):
+    """
+    Link the binary, create the desktop entry and data links, and write
+    install metadata. Returns the binary path.
+    """
+    app_info = app_info or apps.SUPPORTED_APPS[app_name]
+    app_install_dir = APPS_DIR / app_name
+    report_progress("linking")
+
+    # Link
+    binary_path = get_binary_path(app_name, app_info, archive_type)
 
     if not binary_path.exists():
         # Debug list
@@ -792,77 +1208,155 @@ def install_app(app_name, force=False):
         raise Exception(
             f"Expected binary not found at {binary_path}. Found files: {files_found[:5]}...")
 
-    create_symlink(binary_path, app_info["link_name"])
+    create_symlink(binary_path, app_info["link_name"], app_name)
 
-    # 5. Create Desktop Entry
+    # Create Desktop Entry
     create_desktop_entry(app_name, app_info)
 
-    # 6. Link Data Directories
+    # Link Data Directories
     if "data_paths" in app_info:
         link_data_dirs(app_name, app_info["data_paths"])
 
-    # 7. Write install metadata (used for update checks)
+    # Write install metadata (used for update checks)
+    _write_app_meta(app_name, _install_meta(app_name, archive_type, dl_meta, app_info))
+
+    # Pristine copy for instant reinstalls (opt-in), before post-install touches anything
+    templates.capture(app_name)
+
+    return binary_path
+
+
+def _install_meta(app_name, archive_type, dl_meta, app_info=None):
+    """Install metadata for a fresh download (see link_app)."""
+    app_info = app_info or apps.SUPPORTED_APPS[app_name]
     remote_meta = dl_meta or fetch_url_metadata(app_info["url"])
-    _write_app_meta(
-        app_name,
-        {
-            "app_name": app_name,
-            "name": app_info.get("name"),
-            "installed_at": _now_iso(),
-            "source_url": app_info.get("url"),
-            "archive_type": app_info.get("type"),
-            "bin_path": app_info.get("bin_path"),
-            "link_name": app_info.get("link_name"),
-            "resolved_url": remote_meta.get("resolved_url"),
-            "etag": remote_meta.get("etag"),
-            "last_modified": remote_meta.get("last_modified"),
-            "content_length": remote_meta.get("content_length"),
-        },
-    )
+    return {
+        "app_name": app_name,
+        "name": app_info.get("name"),
+        "version": app_info.get("version"),
+        "installed_at": _now_iso(),
+        # A locked install downloads the resolved URL; keep the stable one
+        "source_url": app_info.get("source_url") or app_info.get("url"),
+        "archive_type": archive_type,
+        "bin_path": app_info.get("bin_path"),
+        "link_name": app_info.get("link_name"),
+        "resolved_url": remote_meta.get("resolved_url"),
+        "etag": remote_meta.get("etag"),
+        "last_modified": remote_meta.get("last_modified"),
+        "content_length": remote_meta.get("content_length"),
+        "sha256": remote_meta.get("sha256"),
+        "size": remote_meta.get("size"),
+        "locked": bool(app_info.get("locked")),
+    }
+
 
-    # 8. Run post-install scripts
+def post_install_app(app_name, binary_path, rerun_post_install=False):
+    """Run the app's post-install scripts, if any."""
+    app_info = apps.SUPPORTED_APPS[app_name]
     if "post_install" in app_info:
-        run_post_install_scripts(app_name, app_info["post_install"], binary_path)
+        report_progress("post-install")
+        _run_app_post_install(app_name, app_info, binary_path, rerun_post_install)
+
 
+def finish_install(app_name, archive_type, dl_meta, rerun_post_install=False):
+    """
+    Finalize stage: link the binary, create the desktop entry and data links,
+    write install metadata and run post-install scripts.
+    """
+    binary_path = link_app(app_name, archive_type, dl_meta)
+    post_install_app(app_name, binary_path, rerun_post_install)
     print(f"Successfully installed {app_name}!")
 
 
+def install_app(app_name, force=False, rerun_post_install=False):
+    print(f"\n--- Installing {app_name} ---")
+
+    with locks.app_lock(app_name):
+        # 1. Check if already installed
+        if reuse_existing_install(app_name, force, rerun_post_install):
+            return
+
+        # 2. Download
+        temp_download_path, dl_meta = download_app(app_name)
+
+        # 3. Extract or Move
+        archive_type = extract_app(app_name, temp_download_path, dl_meta)
+
+        # 4. Link, desktop entry, data dirs, metadata, post-install
+        finish_install(app_name, archive_type, dl_meta, rerun_post_install)
+
+
 def uninstall_app(app_name):
     print(f"\n--- Uninstalling {app_name} ---")
     if app_name not in apps.SUPPORTED_APPS:
         print(f"Unknown app: {app_name}")
         return
 
+    with locks.app_lock(app_name):
+        app_info = apps.SUPPORTED_APPS[app_name]
+        app_install_dir = APPS_DIR / app_name
+        link_path = BIN_DIR / app_info["link_name"]
+        report_progress("uninstalling")
+
+        # 1. Remove Symlink and Desktop Entry
+        if not (link_path.exists() or link_path.is_symlink()):
+            print(f"Symlink not found at {link_path}")
+        remove_links(app_name)
+
+        # 2. Remove App Directory (and any kept versions)
+        if app_install_dir.exists() or app_install_dir.is_symlink():
+            print(f"Removing app directory: {app_install_dir}")
+        else:
+            print(f"App directory not found at {app_install_dir}")
+        remove_app_files(app_name)
+        templates.discard(app_name)
+
+        # 3. Data Directory (Optional - currently kept for safety)
+        # data_path = DATA_DIR / app_name
+        # if data_path.exists():
+        #     print(f"Note: Data directory preserved at {data_path}")
+
+        print(f"Successfully uninstalled {app_name}")
+
+
+def remove_links(app_name):
+    """Remove an app's ~/bin command and its desktop entry."""
     app_info = apps.SUPPORTED_APPS[app_name]
-    app_install_dir = APPS_DIR / app_name
     link_path = BIN_DIR / app_info["link_name"]
+    with locks.shared_lock("bin"):
+        if link_path.exists() or link_path.is_symlink():
+            print(f"Removing symlink: {link_path}")
+            link_path.unlink()
+    desktop_file = DESKTOP_DIR / f"void_{app_name}.desktop"
+    with locks.shared_lock("desktop"):
+        if desktop_file.exists():
+            print(f"Removing desktop entry: {desktop_file}")
+            desktop_file.unlink()
 
-    # 1. Remove Symlink
-    if link_path.exists() or link_path.is_symlink():
-        print(f"Removing symlink: {link_path}")
-        link_path.unlink()
-    else:
-        print(f"Symlink not found at {link_path}")
 
-    # 1a. Remove Desktop Entry
-    desktop_file = DESKTOP_DIR / f"void_{app_name}.desktop"
-    if desktop_file.exists():
-        print(f"Removing desktop entry: {desktop_file}")
-        desktop_file.unlink()
-
-    # 2. Remove App Directory
-    if app_install_dir.exists():
-        print(f"Removing app directory: {app_install_dir}")
-        shutil.rmtree(app_install_dir)
-    else:
-        print(f"App directory not found at {app_install_dir}")
+def discard_partial_install(app_name):
+    """
+    Remove leftovers of an interrupted install (temp download, partial app
+    dir). A cancel can arrive after linking (at post-install), so the ~/bin
+    command and desktop entry go too rather than point at nothing.
+    """
+    for temp in APPS_DIR.glob(f"{app_name}_temp_*"):
+        try:
+            temp.unlink()
+        except OSError:
+            pass
+    remove_app_files(app_name)
+    remove_links(app_name)
 
-    # 3. Data Directory (Optional - currently kept for safety)
-    # data_path = DATA_DIR / app_name
-    # if data_path.exists():
-    #     print(f"Note: Data directory preserved at {data_path}")
 
-    print(f"Successfully uninstalled {app_name}")
+def remove_app_files(app_name):
+    """
+    Remove an app's install: the app dir (or active-version link) and all
+    kept versions. The trees go to the trash and are deleted in the background.
+    """
+    trash.discard(APPS_DIR / app_name)
+    trash.discard(_versions_dir(app_name))
+    hibernate.discard(app_name)
 
 
 def get_installed_app_names():
@@ -884,10 +1378,7 @@ def check_app_health(app_name):
     issues = []
 
     # Binary
-    if app_info["type"] == "appimage":
-        binary_path = app_install_dir / "AppRun"
-    else:
-        binary_path = app_install_dir / app_info["bin_path"]
+    binary_path = get_binary_path(app_name, app_info)
     binary_ok = binary_path.exists()
     if not binary_ok:
         issues.append(f"Binary missing: {binary_path}")
@@ -895,7 +1386,12 @@ def check_app_health(app_name):
     # Bin symlink
     link_path = BIN_DIR / app_info["link_name"]
     symlink_ok = link_path.is_symlink()
-    if symlink_ok:
+    if usage.is_shim(link_path):
+        # Usage-tracking shim instead of a symlink
+        symlink_ok = usage.link_target(link_path) == str(binary_path)
+        if not symlink_ok:
+            issues.append(f"Bin shim runs the wrong target: {link_path} -> {usage.link_target(link_path)}")
+    elif symlink_ok:
         try:
             target = link_path.resolve()
             if target != binary_path.resolve():
@@ -952,28 +1448,27 @@ def repair_app(app_name):
         return False
     app_info = apps.SUPPORTED_APPS[app_name]
     app_install_dir = APPS_DIR / app_name
-    if not app_install_dir.exists():
-        print(f"App not installed: {app_name}. Run install first.")
-        return False
 
-    if app_info["type"] == "appimage":
-        binary_path = app_install_dir / "AppRun"
-    else:
-        binary_path = app_install_dir / app_info["bin_path"]
-    if not binary_path.exists():
-        print(f"Binary not found: {binary_path}. Re-install the app.")
-        return False
+    with locks.app_lock(app_name):
+        if not app_install_dir.exists():
+            print(f"App not installed: {app_name}. Run install first.")
+            return False
 
-    # Recreate bin symlink
-    create_symlink(binary_path, app_info["link_name"])
-    print(f"Repaired bin symlink: {app_info['link_name']} -> {binary_path}")
+        binary_path = get_binary_path(app_name, app_info)
+        if not binary_path.exists():
+            print(f"Binary not found: {binary_path}. Re-install the app.")
+            return False
 
-    # Recreate desktop entry
-    create_desktop_entry(app_name, app_info)
+        # Recreate bin symlink
+        create_symlink(binary_path, app_info["link_name"], app_name)
+        print(f"Repaired bin symlink: {app_info['link_name']} -> {binary_path}")
 
-    # Re-link data dirs (handles broken symlinks)
-    if "data_paths" in app_info:
-        link_data_dirs(app_name, app_info["data_paths"])
+        # Recreate desktop entry
+        create_desktop_entry(app_name, app_info)
+
+        # Re-link data dirs (handles broken symlinks)
+        if "data_paths" in app_info:
+            link_data_dirs(app_name, app_info["data_paths"])
 
     return True
 
@@ -1034,10 +1529,309 @@ def check_update_for_app(app_name: str):
     return {"app": app_name, "status": "up_to_date"}
 
 
+def _versions_dir(app_name):
+    return APPS_DIR / VERSIONS_DIRNAME / app_name
+
+
+def active_version(app_name):
+    """Name of the active version, or None for a plain (unversioned) install."""
+    try:
+        return os.path.basename(os.readlink(APPS_DIR / app_name))
+    except OSError:
+        return None
+
+
+def list_versions(app_name):
+    """
+    Kept versions of an app, oldest first:
+    [{"version", "path", "installed_at", "active", "release", "pinned"}].
+    "version" is the directory name; "release" the catalog version it was
+    installed from, if known; "pinned" is set for versions installed with
+    `void use`, which retention never removes.
+    """
+    versions_dir = _versions_dir(app_name)
+    if not versions_dir.is_dir():
+        return []
+    active = active_version(app_name)
+    found = []
+    for path in versions_dir.iterdir():
+        if not path.is_dir() or path.name.startswith("."):
+            continue
+        meta = _read_app_meta(app_name, path) or {}
+        found.append({
+            "version": path.name,
+            "path": path,
+            "installed_at": meta.get("installed_at") or "",
+            "active": path.name == active,
+            "release": meta.get("version"),
+            "pinned": bool(meta.get("pinned")),
+        })
+    return sorted(found, key=lambda v: (v["installed_at"], v["version"]))
+
+
+def _new_version_name(app_name, installed_at=None):
+    """Sortable, unique name for a new version dir, from its install time."""
+    try:
+        when = datetime.fromisoformat(installed_at) if installed_at else datetime.now(timezone.utc)
+    except ValueError:
+        when = datetime.now(timezone.utc)
+    base = when.strftime("%Y%m%d-%H%M%S")
+    name, n = base, 1
+    while (_versions_dir(app_name) / name).exists():
+        n += 1
+        name = f"{base}-{n}"
+    return name
+
+
+def _legacy_version_name(app_name, meta):
+    """Name for a plain install moved into the versions dir: its release if known."""
+    app_info = apps.SUPPORTED_APPS[app_name]
+    release = meta.get("version")
+    if not release and app_info.get("version") and meta.get("source_url") == app_info.get("url"):
+        # Installed before versions were recorded, from the pinned URL
+        release = app_info["version"]
+    if release and not (_versions_dir(app_name) / release).exists():
+        return release
+    return _new_version_name(app_name, meta.get("installed_at"))
+
+
+def _find_version(app_name, version):
+    """Kept version matching a directory name or a release, or None."""
+    versions = list_versions(app_name)
+    for key in ("version", "release"):
+        for v in versions:
+            if v[key] == version:
+                return v
+    return None
+
+
+def _migrate_to_versions(app_name):
+    """
+    Move a plain APPS_DIR/<app> install into the versions dir and link it
+    back, so the next update can switch versions with one rename.
+    """
+    app_install_dir = APPS_DIR / app_name
+    if app_install_dir.is_symlink() or not app_install_dir.is_dir():
+        return
+    meta = _read_app_meta(app_name) or {}
+    version = _legacy_version_name(app_name, meta)
+    _versions_dir(app_name).mkdir(parents=True, exist_ok=True)
+    os.rename(app_install_dir, _versions_dir(app_name) / version)
+    _point_current_at(app_name, version)
+
+
+def _point_current_at(app_name, version):
+    """Atomically repoint APPS_DIR/<app> at a kept version."""
+    link = APPS_DIR / app_name
+    temp_link = APPS_DIR / f".{app_name}.void-tmp"
+    if temp_link.exists() or temp_link.is_symlink():
+        temp_link.unlink()
+    # Relative, so the apps dir can be moved as a whole
+    temp_link.symlink_to(Path(VERSIONS_DIRNAME) / app_name / version)
+    os.replace(temp_link, link)
+
+
+def _verify_binary(binary_path):
+    """Raise unless binary_path is a non-empty executable file."""
+    binary_path = Path(binary_path)
+    if not binary_path.is_file():
+        raise Exception(f"Expected binary not found at {binary_path}")
+    if binary_path.stat().st_size == 0 or not os.access(binary_path, os.X_OK):
+        raise Exception(f"Binary at {binary_path} is empty or not executable")
+
+
+def _relink_active(app_name):
+    """
+    After switching versions. The ~/bin link and desktop entry point through
+    APPS_DIR/<app>, so they already follow the switch; only fix them up when
+    the new version moved the binary (e.g. now an AppImage) or the icon.
+    """
+    binary_path = get_binary_path(app_name)
+    if binary_path.exists():
+        _apply_link_fixups(link_fixups(app_name, binary_path=binary_path))
+    return binary_path
+
+
+def prune_versions(app_name, keep=None, needed_bytes=0):
+    """
+    Remove inactive versions, oldest first, beyond the newest `keep` (the
+    active one always stays). With needed_bytes, instead remove inactive
+    versions only while the apps volume has less free space than that.
+    Returns the removed version names.
+    """
+    keep = KEEP_VERSIONS if keep is None else keep
+    # Versions chosen with `void use` stay until uninstalled
+    versions = [v for v in list_versions(app_name) if not v["pinned"]]
+    inactive = [v for v in versions if not v["active"]]
+    excess = max(0, len(versions) - max(keep, 1))
+    removed = []
+    for v in inactive:
+        if needed_bytes:
+            if shutil.disk_usage(APPS_DIR).free >= needed_bytes:
+                break
+        elif len(removed) >= excess:
+            break
+        print(f"Removing old version {app_name} {v['version']}")
+        trash.discard(v["path"])
+        if needed_bytes:
+            # The space is needed now, not when the reaper gets to it
+            trash.empty()
+        removed.append(v["version"])
+    return removed
+
+
+def rollback_app(app_name, version=None):
+    """
+    Switch an app back to a kept version: the given one, or the newest
+    version older than the active one. Returns the version now active.
+    """
+    if app_name not in apps.SUPPORTED_APPS:
+        raise Exception(f"Unknown app: {app_name}")
+
+    with locks.app_lock(app_name):
+        versions = list_versions(app_name)
+        active = next((v for v in versions if v["active"]), None)
+        if version is None:
+            older = versions[:versions.index(active)] if active else []
+            if not older:
+                raise Exception(f"No previous version of {app_name} to roll back to.")
+            target = older[-1]
+        else:
+            target = _find_version(app_name, version)
+            if target is None:
+                raise Exception(f"Version {version} of {app_name} is not kept.")
+
+        _switch_to(app_name, target)
+        print(f"{app_name}: {active['version'] if active else 'unknown'} -> {target['version']}")
+        return target["version"]
+
+
+def _switch_to(app_name, kept):
+    """Make a kept version (from list_versions) the active one."""
+    _verify_binary(get_binary_path(app_name, app_dir=kept["path"]))
+    _point_current_at(app_name, kept["version"])
+    return _relink_active(app_name)
+
+
+def _stage_version(app_name, version, app_info=None, pinned=False):
+    """
+    Download, extract and verify a version into the versions dir without
+    touching the active one. Removes its leftovers on failure.
+    """
+    temp_download_path, dl_meta = download_app(app_name, app_info)
+    version_dir = _versions_dir(app_name) / version
+    # Unchanged executables, libraries and packed resources are hardlinked
+    # from the active version instead of rewritten, so the two versions share
+    # those inodes. Their modes are not touched (the active tree is live), and
+    # a write into one in place would reach the rollback copy too; updaters
+    # that replace such files by rename do not. Other files (configs, data)
+    # are always written, never shared.
+    active_dir = APPS_DIR / app_name
+    reuse_from = os.path.realpath(active_dir) if active_dir.exists() else None
+    diff_stats = archive.new_diff_stats()
+    try:
+        archive_type = extract_app(app_name, temp_download_path, dl_meta,
+                                   install_dir=version_dir, app_info=app_info,
+                                   reuse_from=reuse_from, diff_stats=diff_stats)
+        _verify_binary(get_binary_path(app_name, app_info, archive_type, version_dir))
+        meta = _install_meta(app_name, archive_type, dl_meta, app_info)
+        if pinned:
+            meta["pinned"] = True
+        if reuse_from is not None and diff_stats["reused_files"]:
+            diff_stats["removed_files"] = _count_removed(reuse_from, version_dir)
+            meta["update_stats"] = diff_stats
+            print(f"Wrote {diff_stats['written_bytes'] / 1024 ** 2:.1f} MB ({diff_stats['written_files']} files), "
+                  f"reused {diff_stats['reused_bytes'] / 1024 ** 2:.1f} MB ({diff_stats['reused_files']} unchanged files), "
+                  f"{diff_stats['removed_files']} files removed")
+        _write_app_meta(app_name, meta, version_dir)
+        templates.capture(app_name, version_dir)
+    except Exception:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        if temp_download_path.exists():
+            temp_download_path.unlink()
+        raise
+    return version_dir
+
+
+def _count_removed(old_dir, new_dir):
+    """Files of the previous version that the new one no longer has."""
+    removed = 0
+    for root, dirs, files in os.walk(old_dir):
+        rel = os.path.relpath(root, old_dir)
+        for name in files:
+            if name in (META_FILENAME, POST_INSTALL_CACHE):
+                continue
+            if not os.path.lexists(os.path.join(new_dir, rel, name)):
+                removed += 1
+    return removed
+
+
+def use_version(app_name, version):
+    """
+    Make `version` of an app the active one. A kept version is switched to
+    with a single rename; any other version of a versioned catalog entry is
+    installed next to the active one first and kept until uninstall.
+    """
+    if app_name not in apps.SUPPORTED_APPS:
+        raise Exception(f"Unknown app: {app_name}")
+    if not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9._+-]*", version):
+        raise Exception(f"Invalid version: {version!r}")
+    app_info = apps.SUPPORTED_APPS[app_name]
+
+    with locks.app_lock(app_name):
+        _migrate_to_versions(app_name)
+        kept = _find_version(app_name, version)
+        if kept and kept["active"]:
+            print(f"{app_name} {version} is already active.")
+            return
+        if kept:
+            _switch_to(app_name, kept)
+            print(f"Now using {app_name} {version} (already installed, nothing downloaded)")
+            return
+
+        if not apps.is_versioned(app_info):
+            raise Exception(f"{app_name} has no versioned download; only kept versions can be used.")
+        pinned_info = apps.pin_version(app_info, version)
+        print(f"\n--- Installing {app_name} {version} ---")
+        _stage_version(app_name, version, pinned_info, pinned=True)
+        binary_path = _switch_to(app_name, _find_version(app_name, version))
+        post_install_app(app_name, binary_path)
+        print(f"Now using {app_name} {version}")
+
+
 def update_app(app_name: str):
     """
-    Reinstall the app (force) to get the latest bits.
+    Blue-green update: install the new version next to the active one,
+    verify its binary, then switch APPS_DIR/<app> to it with a single rename.
+    The app stays usable during the download and is untouched if anything
+    fails; the previous version is kept for rollback_app().
     """
     if app_name not in apps.SUPPORTED_APPS:
         raise Exception(f"Unknown app: {app_name}")
-    install_app(app_name, force=True)
+
+    with locks.app_lock(app_name):
+        if not (APPS_DIR / app_name).exists():
+            install_app(app_name)
+            return
+
+        # Old versions go first if the new one would not fit
+        remote_meta = fetch_url_metadata(apps.SUPPORTED_APPS[app_name]["url"]) or {}
+        try:
+            needed = int(remote_meta.get("content_length") or 0) * 4
+        except ValueError:
+            needed = 0
+        if needed:
+            prune_versions(app_name, needed_bytes=needed)
+
+        version = _new_version_name(app_name)
+        _stage_version(app_name, version)
+
+        _migrate_to_versions(app_name)
+        previous = active_version(app_name)
+        _point_current_at(app_name, version)
+        binary_path = _relink_active(app_name)
+        print(f"Switched {app_name} to {version} (previous: {previous}; 'void rollback {app_name}' to go back)")
+
+        post_install_app(app_name, binary_path)
+        prune_versions(app_name)
+        print(f"Successfully updated {app_name}!")
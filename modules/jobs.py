@@ -0,0 +1,192 @@
+"""
+Background job queue for the TUI.
+
+Installs and uninstalls are queued and run by worker threads, so the
+interface stays responsive. Each job tracks its state (queued, downloading,
+extracting, linking, post-install, uninstalling, done, failed, cancelled),
+download progress and the last line it printed. Jobs can be cancelled while
+queued or running; a running install stops at its next progress report.
+"""
+import collections
+import queue
+import threading
+import time
+
+from . import apps, batch, installer
+
+ACTIVE_STATES = ("queued", "downloading", "extracting", "linking", "post-install", "uninstalling")
+FINAL_STATES = ("done", "failed", "cancelled")
+
+
+class Job:
+    def __init__(self, app_name, action):
+        self.app_name = app_name
+        self.action = action  # "install" or "uninstall"
+        self.state = "queued"
+        self.progress = None
+        self.error = None
+        self.last_line = ""
+        self.log = collections.deque(maxlen=200)
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+    def describe(self):
+        """Short status label for a list row."""
+        if self.state == "downloading" and self.progress is not None:
+            return f"downloading {int(self.progress * 100)}%"
+        if self.state == "failed" and self.error:
+            return f"failed: {self.error}"
+        return self.state
+
+
+class JobOutput:
+    """
+    stdout replacement while the TUI runs: lines printed by a job's worker
+    thread go to that job's log, everything else goes to `fallback`.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def bind(self, job):
+        self._local.job = job
+        self._local.partial = ""
+
+    def write(self, text):
+        job = getattr(self._local, "job", None)
+        if job is None:
+            return self._fallback.write(text)
+        lines = (self._local.partial + text).split("\n")
+        self._local.partial = lines.pop()
+        for line in lines:
+            line = line.strip()
+            if line:
+                job.log.append(line)
+                job.last_line = line
+        return len(text)
+
+    def flush(self):
+        self._fallback.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._fallback, name)
+
+
+class JobQueue:
+    def __init__(self, workers=2, output=None):
+        self.jobs = {}  # app_name -> latest Job
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._output = output
+        self._gates = batch.make_gates(workers)
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"void-job-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, app_name, action):
+        """Queue an install/uninstall. Returns the job (the existing one if already active)."""
+        with self._lock:
+            job = self.jobs.get(app_name)
+            if job is not None and job.active:
+                return job
+            job = Job(app_name, action)
+            self.jobs[app_name] = job
+        self._queue.put(job)
+        return job
+
+    def cancel(self, app_name):
+        """Cancel an app's active job. Returns True if there was one."""
+        with self._lock:
+            job = self.jobs.get(app_name)
+            if job is None or not job.active:
+                return False
+            job.cancel_event.set()
+            if job.state == "queued":
+                self._finish(job, "cancelled")
+        return True
+
+    def get(self, app_name):
+        return self.jobs.get(app_name)
+
+    def active_jobs(self):
+        return [job for job in list(self.jobs.values()) if job.active]
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            self.cancel(job.app_name)
+
+    def shutdown(self, timeout=None):
+        """Stop the workers after the current jobs finish (or time out)."""
+        for _ in self._threads:
+            self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+    def wait(self, timeout=None):
+        """Block until no job is active. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.active_jobs():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def _finish(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        job.progress = None
+        job.finished_at = time.time()
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.state != "queued":  # cancelled while waiting
+                continue
+            if self._output is not None:
+                self._output.bind(job)
+            try:
+                self._run(job)
+            finally:
+                if self._output is not None:
+                    self._output.bind(None)
+
+    def _run(self, job):
+        def on_progress(stage, fraction):
+            job.state = stage
+            job.progress = fraction
+
+        with installer.progress_hook(on_progress, job.cancel_event):
+            if job.action == "uninstall":
+                try:
+                    installer.report_progress("uninstalling")
+                    installer.uninstall_app(job.app_name)
+                    self._finish(job, "done")
+                except installer.InstallCancelled:
+                    self._finish(job, "cancelled")
+                except Exception as e:
+                    self._finish(job, "failed", str(e))
+                return
+
+            if job.app_name not in apps.SUPPORTED_APPS:
+                self._finish(job, "failed", "Unknown app")
+                return
+            result = batch.install_one(job.app_name, self._gates, False)
+
+        if job.cancel_event.is_set() and result["status"] == "failed":
+            installer.discard_partial_install(job.app_name)
+            self._finish(job, "cancelled")
+        elif result["status"] == "failed":
+            self._finish(job, "failed", result["error"])
+        else:
+            self._finish(job, "done")
@@ -0,0 +1,131 @@
+"""
+Operation journal for batch installs (install-all, import).
+
+An append-only JSON-lines file under VOID_ROOT records, for every batch, the
+apps it covers and each app's completed phases: downloaded, extracted,
+linked, post-installed. `void resume` replays the last unfinished batch from
+there: finished apps are skipped straight from the journal, and an app that
+stopped mid-way continues from its last completed phase using the artifacts
+it left behind.
+"""
+import json
+import os
+import threading
+import uuid
+
+from . import installer
+
+JOURNAL_NAME = "journal.jsonl"
+# Older batches are dropped when a new one starts and the file is bigger
+MAX_JOURNAL_BYTES = 1024 * 1024
+
+PHASES = ("downloaded", "extracted", "linked", "post-installed")
+
+
+def journal_path():
+    return installer.VOID_ROOT / "void" / JOURNAL_NAME
+
+
+def _read_records():
+    path = journal_path()
+    records = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn last line from an interrupted write
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+class Journal:
+    def __init__(self, op_id, command=None, apps=None, options=None):
+        self.op_id = op_id
+        self.command = command
+        self.apps = list(apps or [])
+        self.options = dict(options or {})
+        self.phases = {}  # app -> {phase: data}
+        self.failures = {}  # app -> last error
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, command, apps, options=None):
+        """Begin a new batch and record it."""
+        path = journal_path()
+        try:
+            if path.stat().st_size > MAX_JOURNAL_BYTES:
+                path.unlink()
+        except OSError:
+            pass
+        journal = cls(uuid.uuid4().hex[:12], command, apps, options)
+        journal._append({"event": "batch-start", "command": command,
+                         "apps": journal.apps, "options": journal.options})
+        return journal
+
+    @classmethod
+    def load_last(cls):
+        """The most recent batch rebuilt from the journal, or None."""
+        records = _read_records()
+        journal = None
+        for rec in records:
+            if rec.get("event") == "batch-start":
+                journal = cls(rec["op"], rec.get("command"), rec.get("apps"), rec.get("options"))
+            elif journal is not None and rec.get("op") == journal.op_id:
+                app = rec.get("app")
+                if rec.get("event") == "phase":
+                    journal.phases.setdefault(app, {})[rec["phase"]] = rec.get("data") or {}
+                    journal.failures.pop(app, None)
+                elif rec.get("event") == "failed":
+                    journal.failures[app] = rec.get("error")
+                elif rec.get("event") == "reset":
+                    journal.phases.pop(app, None)
+        return journal
+
+    def pending_apps(self):
+        """Apps of this batch that have not finished every phase."""
+        return [app for app in self.apps if not self.is_done(app)]
+
+    def is_done(self, app):
+        return "post-installed" in self.phases.get(app, {})
+
+    def has(self, app, phase):
+        return phase in self.phases.get(app, {})
+
+    def data(self, app, phase):
+        return self.phases.get(app, {}).get(phase, {})
+
+    def record(self, app, phase, **data):
+        with self._lock:
+            self.phases.setdefault(app, {})[phase] = data
+            self.failures.pop(app, None)
+        self._append({"event": "phase", "app": app, "phase": phase, "data": data})
+
+    def record_failure(self, app, error):
+        with self._lock:
+            self.failures[app] = error
+        self._append({"event": "failed", "app": app, "error": error})
+
+    def reset(self, app):
+        """Forget an app's phases (its artifacts are gone)."""
+        with self._lock:
+            self.phases.pop(app, None)
+        self._append({"event": "reset", "app": app})
+
+    def _append(self, record):
+        record = dict(record, op=self.op_id, ts=installer._now_iso())
+        line = json.dumps(record, sort_keys=True) + "\n"
+        path = journal_path()
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # One write per record on an O_APPEND fd, synced so a phase is
+            # never recorded before it is durable.
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode())
+                os.fsync(fd)
+            finally:
+                os.close(fd)
@@ -0,0 +1,136 @@
+"""
+On-demand installs: placeholder commands in ~/bin (opt-in).
+
+With lazy mode on, `void restore` does not download every configured app.
+Each missing app gets a tiny "lazy" script at ~/bin/<link_name> instead. The
+first time it runs, it installs the app (`void lazy --launch <app>`, with
+progress on the terminal) and then execs the real command with the
+original arguments. Apps that are never used today cost nothing.
+
+The script has the same layout as the other ~/bin shims (see
+usage.read_shim). Its exec target is the ~/bin entry itself: the install
+replaces the placeholder with the real link, so exec'ing the same path runs
+the app.
+"""
+import json
+import os
+import shlex
+import sys
+from pathlib import Path
+
+from . import apps, hibernate, installer, locks, usage
+
+LAZY_MARKER = "# void-lazy:"
+SETTINGS_FILE = Path.home() / ".config" / "void" / "lazy.json"
+VOID_SCRIPT = Path(__file__).resolve().parent.parent / "void.py"
+
+
+def enabled():
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            return bool(json.load(f).get("enabled"))
+    except (OSError, ValueError):
+        return False
+
+
+def set_enabled(value):
+    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(SETTINGS_FILE, "w") as f:
+        json.dump({"enabled": bool(value)}, f, indent=2)
+
+
+def link_path(app_name):
+    return installer.BIN_DIR / apps.SUPPORTED_APPS[app_name]["link_name"]
+
+
+def lazy_shim(app_name):
+    launch = " ".join(shlex.quote(str(a)) for a in (sys.executable, VOID_SCRIPT, "lazy", "--launch", app_name))
+    return (
+        "#!/bin/sh\n"
+        f"{LAZY_MARKER} {app_name}\n"
+        f"{launch} >&2 || exit 1\n"
+        f"exec {shlex.quote(str(link_path(app_name)))} \"$@\"\n"
+    )
+
+
+def is_placeholder(app_name):
+    shim = usage.read_shim(link_path(app_name))
+    return shim is not None and shim[0] == "lazy" and shim[1] == app_name
+
+
+def placeholders():
+    return [app_name for app_name in apps.SUPPORTED_APPS if is_placeholder(app_name)]
+
+
+def place(app_name):
+    """
+    Put a placeholder at ~/bin/<link_name> for an app that is not installed.
+    Returns True if one was written.
+    """
+    if installer.get_binary_path(app_name).exists() or hibernate.is_hibernated(app_name):
+        return False
+    path = link_path(app_name)
+    if os.path.lexists(path) and usage.read_shim(path) is None and not path.is_symlink():
+        # Not ours: leave the user's own command alone
+        print(f"Not replacing {path}: it was not created by void.")
+        return False
+    temp_link = path.with_name(f".{path.name}.void-tmp")
+    installer.BIN_DIR.mkdir(parents=True, exist_ok=True)
+    with locks.shared_lock("bin"):
+        if temp_link.exists() or temp_link.is_symlink():
+            temp_link.unlink()
+        temp_link.write_text(lazy_shim(app_name))
+        temp_link.chmod(0o755)
+        os.replace(temp_link, path)
+    return True
+
+
+def remove(app_name):
+    """Delete app_name's placeholder, if it has one."""
+    if not is_placeholder(app_name):
+        return False
+    link_path(app_name).unlink()
+    return True
+
+
+class _TerminalProgress:
+    """Progress callback printing one line per stage (redrawn in place on a tty)."""
+
+    def __init__(self, app_name, stream):
+        self.app_name = app_name
+        self.stream = stream
+        self.tty = stream.isatty()
+        self.last = None
+
+    def __call__(self, stage, fraction):
+        label = f"{stage} {int(fraction * 100)}%" if fraction is not None else stage
+        if label == self.last or (not self.tty and self.last and self.last.split()[0] == stage):
+            return
+        if self.tty:
+            self.stream.write(f"\r\033[K[void] {self.app_name}: {label}")
+        else:
+            self.stream.write(f"[void] {self.app_name}: {label}\n")
+        self.stream.flush()
+        self.last = label
+
+    def close(self):
+        if self.tty and self.last:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+def launch(app_name):
+    """
+    First run of a placeholder: install the app so the ~/bin entry becomes
+    the real command. Raises if the placeholder is still there afterwards.
+    """
+    progress = _TerminalProgress(app_name, sys.stderr)
+    print(f"{app_name} is not installed yet: installing it now (first launch).")
+    try:
+        with installer.progress_hook(progress):
+            # Another launch may have installed it meanwhile: then this only relinks
+            installer.install_app(app_name)
+    finally:
+        progress.close()
+    if is_placeholder(app_name):
+        raise Exception(f"{link_path(app_name)} is still a placeholder after installing")
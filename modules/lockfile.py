@@ -0,0 +1,100 @@
+"""
+Lockfiles: `void export --lock` / `void import --locked`.
+
+A plain export lists app names, and importing it installs whatever the
+catalog URLs serve today. A lockfile also records, per app, the exact
+artifact that was installed: the URL it was finally downloaded from, its
+ETag, size and sha256, the archive type and the bin_path. Importing it
+fetches exactly those artifacts from the resolved URL (no redirect
+resolution, no update checks), verifies the hash while the download
+streams, and skips the download entirely when a matching file is already
+on disk.
+
+Resolved URLs do not always last: GitHub release downloads redirect to
+signed asset URLs that expire within minutes. When the resolved URL answers
+with an error, the artifact is downloaded from the source URL instead; the
+hash check still guarantees the bytes are the locked ones.
+
+Apps installed before hashes were recorded are exported without sha256;
+they are fetched from their resolved URL but cannot be verified.
+"""
+from . import apps, installer
+
+LOCK_VERSION = "1.0"
+
+# Fields of an artifact entry that override the catalog entry on import
+PINNED_FIELDS = ("url", "source_url", "type", "bin_path", "version", "sha256", "size", "etag")
+
+
+def artifact_entry(app_name):
+    """Lock entry for an installed app, from its install metadata (None if unknown)."""
+    meta = installer._read_app_meta(app_name)
+    if not meta:
+        return None
+    size = meta.get("size") or meta.get("content_length")
+    return {
+        "url": meta.get("resolved_url") or meta.get("source_url"),
+        "source_url": meta.get("source_url"),
+        "etag": meta.get("etag"),
+        "size": int(size) if size else None,
+        "sha256": meta.get("sha256"),
+        "type": meta.get("archive_type"),
+        "bin_path": meta.get("bin_path"),
+        "version": meta.get("version"),
+    }
+
+
+def build(app_names):
+    """
+    Lockfile dict for the given installed apps. "apps" keeps the plain
+    export format, so an older void can still import it by name.
+    Returns (lock, names of apps without a recorded hash).
+    """
+    artifacts = {}
+    unverified = []
+    for app_name in app_names:
+        entry = artifact_entry(app_name)
+        if entry is None or not entry["url"]:
+            continue
+        artifacts[app_name] = entry
+        if not entry["sha256"]:
+            unverified.append(app_name)
+    lock = {
+        "version": LOCK_VERSION,
+        "exported_at": installer._now_iso(),
+        "apps": list(artifacts),
+        "artifacts": artifacts,
+    }
+    return lock, unverified
+
+
+def pinned_app_info(app_name, entry):
+    """The catalog entry for app_name with the locked artifact's fields on top."""
+    app_info = apps.SUPPORTED_APPS[app_name]
+    if entry.get("version") and apps.is_versioned(app_info):
+        app_info = apps.pin_version(app_info, entry["version"])
+    pinned = dict(app_info)
+    pinned.update({k: entry[k] for k in PINNED_FIELDS if entry.get(k) is not None})
+    pinned["locked"] = True
+    return pinned
+
+
+def app_infos(lock):
+    """{app: pinned app_info} for the lockfile's apps that are in the catalog."""
+    return {app_name: pinned_app_info(app_name, entry)
+            for app_name, entry in (lock.get("artifacts") or {}).items()
+            if app_name in apps.SUPPORTED_APPS}
+
+
+def matches_install(app_name, app_info):
+    """
+    True if the installed copy of app_name is the locked artifact. Installs
+    without a recorded hash match on resolved URL and ETag instead.
+    """
+    meta = installer._read_app_meta(app_name)
+    if not meta:
+        return False
+    if meta.get("sha256") and app_info.get("sha256"):
+        return meta["sha256"] == app_info["sha256"]
+    return (meta.get("resolved_url") == app_info["url"]
+            and meta.get("etag") == app_info.get("etag"))
@@ -0,0 +1,134 @@
+"""
+Advisory locks so several void processes (two terminals, the TUI and a
+script, a background restore) can work at the same time.
+
+- app_lock(app): held for a whole install/uninstall/repair of one app, so
+  different apps proceed in parallel and the same app is never touched by
+  two operations at once.
+- shared_lock(name): short lock around writes to directories every app
+  shares (~/bin, the desktop entries dir, the data dir).
+
+Locks are fcntl.flock()s on files under VOID_ROOT/void/locks and are
+released automatically if the process dies. Within a process they are
+re-entrant per thread (install_app -> repair helpers may nest).
+By default a busy lock is waited for; with WAIT = False (--no-wait) a lock
+held by another process raises LockBusy right away. Threads of the same
+process always queue for each other (parallel installs, TUI jobs and
+prefetches share "bin", "desktop" and "cache"), so --no-wait only applies
+between processes.
+"""
+import fcntl
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from . import installer
+
+WAIT = True
+POLL_INTERVAL = 0.1
+
+
+class LockBusy(Exception):
+    pass
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+        self.rlock = threading.RLock()
+        self.fd = None
+        self.depth = 0
+
+
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def lock_dir():
+    return installer.VOID_ROOT / "void" / "locks"
+
+
+def _get(name):
+    path = lock_dir() / f"{name}.lock"
+    with _registry_lock:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = _FileLock(path)
+        return lock
+
+
+def _holder(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _flock(lock, what, wait, timeout):
+    lock.path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    announced = False
+    try:
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                holder = _holder(lock.path)
+                if not wait or (deadline is not None and time.monotonic() >= deadline):
+                    raise LockBusy(f"{what} is busy: another void process is using it "
+                                   f"(pid {holder}). Try again when it finishes.")
+                if not announced:
+                    print(f"Waiting for {what} (held by pid {holder})...")
+                    announced = True
+                time.sleep(POLL_INTERVAL)
+    except BaseException:
+        os.close(fd)
+        raise
+
+    # Record who holds it, for the message other processes print
+    os.ftruncate(fd, 0)
+    os.pwrite(fd, f"{os.getpid()}: {' '.join(os.path.basename(a) for a in sys.argv[:3])}\n".encode(), 0)
+    return fd
+
+
+@contextmanager
+def _hold(name, what, wait=None, timeout=None):
+    wait = WAIT if wait is None else wait
+    if not wait:
+        # Fails at once on another process's lock: nothing to time out
+        timeout = None
+    lock = _get(name)
+
+    # Threads of this process queue on the RLock (even without wait); the
+    # flock is taken once
+    if not lock.rlock.acquire(timeout=-1 if timeout is None else timeout):
+        raise LockBusy(f"{what} is busy in this process. Try again when it finishes.")
+    try:
+        if lock.depth == 0:
+            lock.fd = _flock(lock, what, wait, timeout)
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0:
+                fcntl.flock(lock.fd, fcntl.LOCK_UN)
+                os.close(lock.fd)
+                lock.fd = None
+    finally:
+        lock.rlock.release()
+
+
+def app_lock(app_name, wait=None, timeout=None):
+    """Exclusive lock for operations on one app."""
+    return _hold(f"app-{app_name}", f"App '{app_name}'", wait, timeout)
+
+
+def shared_lock(name, wait=None, timeout=None):
+    """Short exclusive lock for a shared directory ("bin", "desktop", "data")."""
+    return _hold(f"shared-{name}", f"Shared '{name}' directory", wait, timeout)
@@ -0,0 +1,78 @@
+"""
+Desired-state planner.
+
+Compares what the config asks for (apps.json / the catalog) with what is on
+disk - install metadata, binary, ~/bin symlink, desktop entry, data links -
+and produces the minimal list of actions to reconcile them. Checking only
+uses stat/readlink and reads the small .desktop file, so a fully provisioned
+post is verified in milliseconds and nothing is rewritten.
+"""
+from . import apps, hibernate, installer, lazy
+
+# Actions in execution order for one app
+ACTIONS = ("install", "link-bin", "desktop", "link-data", "write-meta")
+
+
+def _action(app_name, action, reason, **extra):
+    return dict(extra, app=app_name, action=action, reason=reason)
+
+
+def plan_app(app_name):
+    """Actions needed for one app to match its catalog entry."""
+    if app_name not in apps.SUPPORTED_APPS:
+        return [_action(app_name, "unknown", "not in catalog")]
+    app_info = apps.SUPPORTED_APPS[app_name]
+
+    # Reads the install metadata for the archive type and installed version
+    binary_path = installer.get_binary_path(app_name, app_info)
+    if not binary_path.exists():
+        if hibernate.is_hibernated(app_name):
+            reason = "hibernated"
+        elif lazy.is_placeholder(app_name):
+            reason = "installs on first launch"
+        elif not (installer.APPS_DIR / app_name).exists():
+            reason = "not installed"
+        else:
+            reason = "binary missing"
+        return [_action(app_name, "install", reason)]
+
+    # The per-link checks live next to the code that creates the links
+    return installer.link_fixups(app_name, app_info, binary_path)
+
+
+def plan(app_names):
+    """Actions for every app in app_names, in order."""
+    actions = []
+    for app_name in app_names:
+        actions.extend(plan_app(app_name))
+    return actions
+
+
+def apply_fixups(actions):
+    """
+    Perform every non-install action. Returns a list of (action, error)
+    for the ones that failed.
+    """
+    failed = []
+    for action in actions:
+        if action["action"] in ("install", "unknown"):
+            continue
+        try:
+            installer.apply_fixup(action)
+        except Exception as e:
+            failed.append((action, str(e)))
+    return failed
+
+
+def format_plan(actions):
+    """Human-readable diff, one line per action."""
+    if not actions:
+        return "Nothing to do: everything matches the configuration."
+    symbols = {"install": "+", "unknown": "?"}
+    lines = []
+    for action in actions:
+        detail = action["action"]
+        if action.get("paths"):
+            detail += f" ({', '.join(action['paths'])})"
+        lines.append(f"  {symbols.get(action['action'], '~')} {action['app']:<20} {detail:<30} # {action['reason']}")
+    return "\n".join(lines)
@@ -0,0 +1,228 @@
+"""
+Post-install step engine.
+
+A post_install entry is either a plain command string or a dict:
+
+    {"id": "extensions", "run": "{link} --install-extension ...",
+     "after": ["other-id"], "follows": ["another-id"], "group": "code-cli",
+     "timeout": 600}
+
+Plain strings keep the old behaviour: they run one after another, in order,
+and a failing one does not stop the next ("follows": it waits for the step
+before it to finish, whatever the outcome). Dict steps only wait for the ids
+listed in "after" (which must succeed) and "follows" (which only have to
+finish), so independent steps run
+in parallel. Steps sharing a "group" never run at the same time (e.g. two
+commands that write the same config). Output is streamed line by line, each
+step has its own timeout, and a failed step only skips the steps that depend
+on it.
+
+Steps can be skipped when an identical step already succeeded: the caller
+passes the fingerprints of previous successes (see step_fingerprint), and a
+step whose expanded command and target identity are unchanged is reported
+as "cached" instead of being run again.
+"""
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import threading
+import time
+
+DEFAULT_TIMEOUT = 300  # 5 minutes per step
+MAX_PARALLEL = 4
+
+
+def expand(command, placeholders):
+    """Replace {bin}/{link}-style placeholders in a command."""
+    for key, value in placeholders.items():
+        command = command.replace("{" + key + "}", str(value))
+    return command
+
+
+def step_fingerprint(command, identity):
+    """
+    Fingerprint of one step: its expanded command plus the identity of the
+    installed target (artifact URL/ETag/size, binary path and size).
+    """
+    payload = json.dumps({"run": command, "target": identity}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def normalize_steps(scripts):
+    """
+    Turn a post_install list into step dicts with id, run, after, follows,
+    group and timeout. Raises on unknown dependencies, duplicate ids or cycles.
+    """
+    steps = []
+    previous = None
+    for idx, entry in enumerate(scripts, 1):
+        if isinstance(entry, str):
+            step = {"id": f"step{idx}", "run": entry, "after": [],
+                    "follows": [previous] if previous else [], "group": None}
+        elif isinstance(entry, dict) and entry.get("run"):
+            after, follows = (entry.get(key) or [] for key in ("after", "follows"))
+            if isinstance(after, str):
+                after = [after]
+            if isinstance(follows, str):
+                follows = [follows]
+            step = {"id": str(entry.get("id") or f"step{idx}"), "run": entry["run"],
+                    "after": list(after), "follows": list(follows), "group": entry.get("group")}
+        else:
+            raise Exception(f"Invalid post_install entry #{idx}: {entry!r}")
+        step["timeout"] = (entry.get("timeout") if isinstance(entry, dict) else None) or DEFAULT_TIMEOUT
+        steps.append(step)
+        previous = step["id"]
+
+    ids = [s["id"] for s in steps]
+    if len(set(ids)) != len(ids):
+        raise Exception(f"Duplicate post_install step ids: {ids}")
+    for step in steps:
+        for dep in step["after"] + step["follows"]:
+            if dep not in ids:
+                raise Exception(f"post_install step '{step['id']}' waits for unknown step '{dep}'")
+
+    # Cycle check (Kahn)
+    remaining = {s["id"]: set(s["after"]) | set(s["follows"]) for s in steps}
+    while remaining:
+        free = [sid for sid, deps in remaining.items() if not deps]
+        if not free:
+            raise Exception(f"post_install steps have circular 'after': {sorted(remaining)}")
+        for sid in free:
+            del remaining[sid]
+        for deps in remaining.values():
+            deps.difference_update(free)
+
+    return steps
+
+
+def _run_step(step, command):
+    """Run one shell step, streaming its output. Returns a result dict."""
+    tag = step["id"]
+    result = {"id": tag, "run": command, "status": "ok", "returncode": None, "duration": 0.0}
+    started = time.monotonic()
+    timed_out = threading.Event()
+
+    try:
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            start_new_session=True,  # own process group so a timeout kills children too
+        )
+    except Exception as e:
+        print(f"  [{tag}] ✗ Error: {e}")
+        result["status"] = "failed"
+        return result
+
+    def kill():
+        timed_out.set()
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    timer = threading.Timer(step["timeout"], kill)
+    timer.daemon = True
+    timer.start()
+    try:
+        for line in proc.stdout:
+            line = line.rstrip()
+            if line:
+                print(f"  [{tag}] {line}")
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+
+    result["returncode"] = proc.returncode
+    result["duration"] = round(time.monotonic() - started, 2)
+    if timed_out.is_set():
+        result["status"] = "timeout"
+        print(f"  [{tag}] ✗ Timeout (exceeded {step['timeout']}s)")
+    elif proc.returncode != 0:
+        result["status"] = "failed"
+        print(f"  [{tag}] ✗ Failed (exit code {proc.returncode}, {result['duration']}s)")
+    else:
+        print(f"  [{tag}] ✓ Success ({result['duration']}s)")
+    return result
+
+
+def run_steps(steps, placeholders, max_parallel=MAX_PARALLEL, identity=None, cached=()):
+    """
+    Run normalized steps respecting 'after', 'follows' and 'group'.
+    Returns result dicts in step order; status is ok, cached (fingerprint in
+    `cached`, not run), failed, timeout or skipped (a dependency did not
+    succeed). Each result carries the step's fingerprint.
+    """
+    results = {}
+    running = {}  # id -> thread
+    busy_groups = set()
+    cond = threading.Condition()
+
+    def worker(step, command):
+        res = _run_step(step, command)
+        res["fingerprint"] = step_fingerprint(command, identity)
+        with cond:
+            results[step["id"]] = res
+            running.pop(step["id"], None)
+            if step["group"]:
+                busy_groups.discard(step["group"])
+            cond.notify_all()
+
+    pending = list(steps)
+    with cond:
+        while pending or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for step in list(pending):
+                    deps = [results.get(dep) for dep in step["after"]]
+                    if any(d is not None and d["status"] not in ("ok", "cached") for d in deps):
+                        pending.remove(step)
+                        results[step["id"]] = {"id": step["id"], "run": step["run"],
+                                               "status": "skipped", "returncode": None,
+                                               "duration": 0.0}
+                        print(f"  [{step['id']}] - Skipped (depends on a failed step)")
+                        progressed = True
+                        continue
+                    if any(d is None for d in deps):
+                        continue
+                    if any(dep not in results for dep in step["follows"]):
+                        continue
+                    if step["group"] and step["group"] in busy_groups:
+                        continue
+                    if len(running) >= max_parallel:
+                        break
+                    pending.remove(step)
+                    command = expand(step["run"], placeholders)
+                    fingerprint = step_fingerprint(command, identity)
+                    if fingerprint in cached:
+                        results[step["id"]] = {"id": step["id"], "run": command,
+                                               "status": "cached", "returncode": 0,
+                                               "duration": 0.0, "fingerprint": fingerprint}
+                        print(f"  [{step['id']}] ✓ Already done, skipping")
+                        progressed = True
+                        continue
+                    print(f"  [{step['id']}] Executing: {command}")
+                    if step["group"]:
+                        busy_groups.add(step["group"])
+                    thread = threading.Thread(target=worker, args=(step, command),
+                                              name=f"void-post-{step['id']}", daemon=True)
+                    running[step["id"]] = thread
+                    thread.start()
+                    progressed = True
+            if running:
+                cond.wait()
+            elif pending:
+                # Nothing running and nothing startable: cannot happen after the
+                # cycle check, but never spin forever.
+                break
+
+    return [results[s["id"]] for s in steps if s["id"] in results]
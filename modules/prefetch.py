@@ -0,0 +1,260 @@
+"""
+Speculative downloads for the TUI.
+
+Selecting an app to install (SPACE) starts downloading its artifact right
+away into APPS_DIR/.prefetch, while the user keeps browsing. When the
+install is queued (ENTER), download_app claims the staged file, a rename on
+the same filesystem, instead of downloading it again. Deselecting the app
+cancels its prefetch and deletes whatever was fetched.
+
+Prefetches run in low-priority threads, at most `max_concurrent` at a time
+(see SETTINGS_FILE), and never eat into the free space kept in goinfre
+(`void usage --min-free`): an artifact that would not fit is skipped, and a
+download of unknown size stops when free space runs low.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from . import apps, installer, usage
+
+PREFETCH_DIRNAME = ".prefetch"
+SETTINGS_FILE = Path.home() / ".config" / "void" / "prefetch.json"
+DEFAULT_SETTINGS = {
+    "enabled": True,
+    "max_concurrent": 2,
+}
+# Nice value of prefetch threads (Linux nices threads individually)
+PREFETCH_NICE = 10
+# Seconds between free space checks while downloading
+SPACE_CHECK_INTERVAL = 1.0
+
+FINAL_STATES = ("ready", "failed", "cancelled", "skipped")
+
+_lock = threading.Condition()
+_entries = {}
+_running = 0
+
+
+def settings():
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            return dict(DEFAULT_SETTINGS, **json.load(f))
+    except (OSError, ValueError):
+        return dict(DEFAULT_SETTINGS)
+
+
+def save_settings(**changes):
+    current = settings()
+    current.update({k: v for k, v in changes.items() if v is not None})
+    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(SETTINGS_FILE, "w") as f:
+        json.dump(current, f, indent=2, sort_keys=True)
+    return current
+
+
+def staging_dir():
+    return installer.APPS_DIR / PREFETCH_DIRNAME
+
+
+class Prefetch:
+    def __init__(self, app_name, url):
+        self.app_name = app_name
+        self.url = url
+        self.state = "waiting"  # waiting, downloading, then one of FINAL_STATES
+        self.progress = None
+        self.error = None
+        self.size = 0
+        self.dl_meta = None
+        filename = url.split("/")[-1].split("?")[0] or "download.archive"
+        self.path = staging_dir() / f"{app_name}_{filename}"
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+
+    def describe(self):
+        """Short status label for a list row."""
+        if self.state == "downloading" and self.progress is not None:
+            return f"prefetching {int(self.progress * 100)}%"
+        if self.state in ("failed", "skipped") and self.error:
+            return f"prefetch {self.state}: {self.error}"
+        if self.state == "ready":
+            return "prefetched"
+        return f"prefetch {self.state}"
+
+
+def get(app_name):
+    with _lock:
+        return _entries.get(app_name)
+
+
+def start(app_name):
+    """
+    Start prefetching app_name's artifact in the background.
+    Returns its Prefetch, or None if prefetching is off or does not apply.
+    """
+    current = settings()
+    app_info = apps.SUPPORTED_APPS.get(app_name) or {}
+    if not current["enabled"] or not app_info.get("url"):
+        return None
+    with _lock:
+        entry = _entries.get(app_name)
+        if entry is not None and entry.url == app_info["url"] and entry.state in ("waiting", "downloading", "ready"):
+            return entry
+        if entry is not None:
+            entry.cancel_event.set()
+        entry = Prefetch(app_name, app_info["url"])
+        _entries[app_name] = entry
+    threading.Thread(target=_run, args=(entry, max(1, int(current["max_concurrent"]))),
+                     name=f"void-prefetch-{app_name}", daemon=True).start()
+    return entry
+
+
+def cancel(app_name):
+    """Stop app_name's prefetch and drop what it fetched."""
+    with _lock:
+        entry = _entries.pop(app_name, None)
+    if entry is None:
+        return False
+    entry.cancel_event.set()
+    if entry.done.is_set():
+        _remove(entry.path)
+    return True
+
+
+def cancel_all(timeout=2):
+    """Cancel every prefetch (TUI exit) and clear the staging dir."""
+    with _lock:
+        pending = list(_entries.values())
+        _entries.clear()
+    for entry in pending:
+        entry.cancel_event.set()
+    deadline = time.monotonic() + timeout
+    for entry in pending:
+        entry.done.wait(max(0, deadline - time.monotonic()))
+    shutil.rmtree(staging_dir(), ignore_errors=True)
+
+
+def claim(app_name, app_info, target):
+    """
+    Move app_name's prefetched artifact to target for the install stage.
+    Waits for a prefetch that is already downloading; one that has not
+    started yet is cancelled. Returns the download metadata, or None when
+    there is nothing usable (the caller downloads as usual).
+    """
+    with _lock:
+        entry = _entries.get(app_name)
+        if entry is None or entry.url != app_info["url"]:
+            return None
+        if entry.state == "waiting":
+            _entries.pop(app_name)
+            entry.cancel_event.set()
+            return None
+
+    while not entry.done.wait(0.2):
+        # Shows the prefetch's progress, and lets the install be cancelled
+        installer.report_progress("downloading", entry.progress)
+
+    with _lock:
+        if _entries.get(app_name) is entry:
+            _entries.pop(app_name)
+    if entry.state != "ready":
+        return None
+    sha256 = app_info.get("sha256")
+    if sha256 and (entry.dl_meta or {}).get("sha256") != sha256.lower():
+        _remove(entry.path)
+        return None
+    try:
+        os.replace(entry.path, target)
+    except OSError:
+        _remove(entry.path)
+        return None
+    print(f"Using prefetched {entry.url}.")
+    return entry.dl_meta
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _lower_priority():
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICE)
+    except (AttributeError, OSError):
+        pass
+
+
+def _reserved_bytes(entry):
+    """Bytes still to come for the other running prefetches."""
+    with _lock:
+        others = [e for e in _entries.values() if e is not entry and e.state == "downloading"]
+    return sum(int(e.size * (1 - (e.progress or 0))) for e in others)
+
+
+def _run(entry, max_concurrent):
+    global _running
+    _lower_priority()
+    with _lock:
+        while _running >= max_concurrent and not entry.cancel_event.is_set():
+            _lock.wait(0.5)
+        if entry.cancel_event.is_set():
+            entry.state = "cancelled"
+            entry.done.set()
+            return
+        _running += 1
+    try:
+        _fetch(entry)
+    except installer.InstallCancelled:
+        if entry.state != "skipped":
+            entry.state = "cancelled"
+    except Exception as e:
+        entry.state = "failed"
+        entry.error = str(e)
+    finally:
+        with _lock:
+            _running -= 1
+            _lock.notify_all()
+        if entry.cancel_event.is_set() and entry.state == "ready":
+            entry.state = "cancelled"
+        if entry.state != "ready":
+            _remove(entry.path)
+        entry.done.set()
+
+
+def _fetch(entry):
+    reserve = int(usage.settings()["min_free_gb"] * 1024 ** 3)
+    try:
+        entry.size = int(installer.fetch_url_metadata(entry.url).get("content_length") or 0)
+    except (TypeError, ValueError):
+        entry.size = 0
+    free = usage.free_bytes()
+    if free is not None and free - entry.size - _reserved_bytes(entry) < reserve:
+        entry.state = "skipped"
+        entry.error = "not enough free space"
+        return
+
+    last_check = [time.monotonic()]
+
+    def on_progress(stage, fraction):
+        entry.progress = fraction
+        now = time.monotonic()
+        if not entry.size and now - last_check[0] >= SPACE_CHECK_INTERVAL:
+            last_check[0] = now
+            free = usage.free_bytes()
+            if free is not None and free < reserve:
+                entry.state = "skipped"
+                entry.error = "not enough free space"
+                entry.cancel_event.set()
+
+    staging_dir().mkdir(parents=True, exist_ok=True)
+    entry.state = "downloading"
+    with installer.progress_hook(on_progress, entry.cancel_event):
+        dl_meta = installer.download_file(entry.url, entry.path) or {}
+    entry.dl_meta = dl_meta
+    entry.progress = 1.0
+    entry.state = "ready"
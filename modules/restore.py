@@ -0,0 +1,138 @@
+"""
+Rebuild apps after /goinfre was wiped (new post, cleanup).
+
+Home survives a wipe: ~/.config/void/apps.json still lists the configured
+apps and ~/bin still holds Void's (now dangling) links, which also reveal
+apps installed with a plain `void install`. Missing apps are reinstalled in
+priority order - most recently used first according to shell history, then
+smallest download first - so the apps the user reaches for come back first.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import apps, installer, usage
+
+STATUS_NAME = "restore.status.json"
+LOG_NAME = "restore.log"
+
+HISTORY_FILES = (".zsh_history", ".bash_history", ".local/share/fish/fish_history")
+# Only the tail of the history matters for "recent"
+HISTORY_TAIL_BYTES = 512 * 1024
+
+_ZSH_PREFIX = re.compile(r"^: \d+:\d+;")
+
+
+def status_path():
+    return installer.VOID_ROOT / "void" / STATUS_NAME
+
+
+def log_path():
+    return installer.VOID_ROOT / "void" / LOG_NAME
+
+
+def goinfre_wiped():
+    """True when the apps directory is gone (fresh post or wiped goinfre)."""
+    return not installer.APPS_DIR.exists()
+
+
+def dangling_link_apps():
+    """Apps whose ~/bin link still points into a Void apps dir that no longer exists."""
+    found = []
+    for app_name, app_info in apps.SUPPORTED_APPS.items():
+        # A symlink or a usage shim
+        target = usage.link_target(installer.BIN_DIR / app_info["link_name"])
+        if target is None:
+            continue
+        if f"/void/apps/{app_name}/" in target and not os.path.exists(target):
+            found.append(app_name)
+    return found
+
+
+def wanted_apps(configured):
+    """Configured apps plus apps left behind as dangling links, deduplicated."""
+    wanted = []
+    for app_name in list(configured) + dangling_link_apps():
+        if app_name in apps.SUPPORTED_APPS and app_name not in wanted:
+            wanted.append(app_name)
+    return wanted
+
+
+def _history_commands():
+    """Commands from shell history, oldest first (last HISTORY_TAIL_BYTES of each file)."""
+    commands = []
+    home = Path.home()
+    for name in HISTORY_FILES:
+        path = home / name
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                size = f.tell()
+                f.seek(max(0, size - HISTORY_TAIL_BYTES))
+                data = f.read().decode(errors="replace")
+        except OSError:
+            continue
+        for line in data.splitlines():
+            if name.endswith("fish_history"):
+                if not line.startswith("- cmd: "):
+                    continue
+                line = line[len("- cmd: "):]
+            line = _ZSH_PREFIX.sub("", line).strip()
+            if line:
+                commands.append(line)
+    return commands
+
+
+def usage_recency(app_names):
+    """
+    {app: position of its last use in shell history}; higher is more recent.
+    Apps never seen in history are missing from the result.
+    """
+    by_link = {apps.SUPPORTED_APPS[a]["link_name"]: a for a in app_names}
+    recency = {}
+    for idx, command in enumerate(_history_commands()):
+        # Any command word in a pipeline/chain counts (e.g. "cd x && code .")
+        for part in re.split(r"[|;&]+", command):
+            words = part.split()
+            if not words:
+                continue
+            word = os.path.basename(words[0])
+            if word in ("sudo", "time", "nohup", "exec") and len(words) > 1:
+                word = os.path.basename(words[1])
+            if word in by_link:
+                recency[by_link[word]] = idx
+    return recency
+
+
+def download_sizes(app_names, workers=8):
+    """{app: Content-Length or None}, fetched in parallel."""
+    def size_of(app_name):
+        meta = installer.fetch_url_metadata(apps.SUPPORTED_APPS[app_name]["url"]) or {}
+        try:
+            return app_name, int(meta.get("content_length"))
+        except (TypeError, ValueError):
+            return app_name, None
+
+    if not app_names:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(app_names))) as pool:
+        return dict(pool.map(size_of, app_names))
+
+
+def prioritize(app_names, sizes=None):
+    """
+    Order apps for restore: recently used first (most recent first), then
+    the rest; ties broken by smaller download first, unknown sizes last.
+    """
+    recency = usage_recency(app_names)
+    if sizes is None:
+        sizes = download_sizes(app_names)
+
+    def key(app_name):
+        used = app_name in recency
+        size = sizes.get(app_name)
+        return (0 if used else 1, -recency.get(app_name, 0),
+                size is None, size or 0)
+
+    return sorted(app_names, key=key)
@@ -0,0 +1,269 @@
+"""
+Pristine install templates for instant reinstalls (opt-in).
+
+With templates on, every freshly extracted install is also kept as a
+read-only tree in APPS_DIR/.templates/<app>/<key>, where key identifies the
+downloaded artifact (its sha256, or URL/ETag for older metadata). Repairing
+or reinstalling the app then clones that tree back into place instead of
+downloading and extracting it again: seconds instead of minutes.
+
+Cloning uses reflinks (FICLONE) where the filesystem supports them: the
+copy shares blocks with the template until either side is written, so it is
+instant and costs no space. Elsewhere, capturing a template makes a real
+copy: the template must not share inodes with the live install it may later
+replace, and making it read-only must not touch the app's own files.
+Restoring then hardlinks files the app never writes in place (executables,
+libraries, packed resources) to the template and copies everything else.
+Template files are read-only, so a hardlinked file cannot be modified
+through the working tree by accident.
+"""
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from . import apps, archive, installer, trash
+
+TEMPLATES_DIRNAME = ".templates"
+SETTINGS_FILE = Path.home() / ".config" / "void" / "templates.json"
+# Templates kept per app (the one matching the active install)
+KEEP_TEMPLATES = 1
+
+# ioctl from linux/fs.h: share src's extents with dest
+FICLONE = 0x40049409
+# errnos meaning "this filesystem (pair) cannot reflink", not a real failure
+NO_REFLINK_ERRNOS = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EPERM}
+
+
+def enabled():
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            return bool(json.load(f).get("enabled"))
+    except (OSError, ValueError):
+        return False
+
+
+def set_enabled(value):
+    SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(SETTINGS_FILE, "w") as f:
+        json.dump({"enabled": bool(value)}, f, indent=2)
+
+
+def templates_dir(app_name=None):
+    root = installer.APPS_DIR / TEMPLATES_DIRNAME
+    return root / app_name if app_name else root
+
+
+def template_key(meta):
+    """Identity of the artifact an install came from (None if unknown)."""
+    if not meta:
+        return None
+    if meta.get("sha256"):
+        return meta["sha256"][:16]
+    parts = [meta.get(k) or "" for k in ("resolved_url", "etag", "last_modified", "content_length", "version")]
+    if not any(parts):
+        return None
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def list_templates(app_name):
+    """[(key, path, meta)] for an app's templates, newest first."""
+    root = templates_dir(app_name)
+    if not root.is_dir():
+        return []
+    found = []
+    for path in root.iterdir():
+        if path.name.startswith(".") or not path.is_dir():
+            continue
+        found.append((path.stat().st_mtime, path.name, path,
+                      installer._read_app_meta(app_name, path) or {}))
+    return [(key, path, meta) for _, key, path, meta in sorted(found, reverse=True)]
+
+
+def _reflink(src, dest):
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def clone_tree(src, dest, share=True):
+    """
+    Recreate the tree at src in dest (which must not exist): reflink each
+    file if possible, else hardlink immutable files (only if share) and copy
+    the rest. Returns {"reflink": n, "hardlink": n, "copy": n, "symlink": n}.
+    """
+    counts = {"reflink": 0, "hardlink": 0, "copy": 0, "symlink": 0}
+    can_reflink = True
+    src = str(src)
+    for root, dirs, files in os.walk(src):
+        rel = os.path.relpath(root, src)
+        target_root = os.path.join(dest, rel) if rel != "." else str(dest)
+        os.makedirs(target_root, exist_ok=True)
+        shutil.copymode(root, target_root)
+        for name in dirs + files:
+            s = os.path.join(root, name)
+            d = os.path.join(target_root, name)
+            st = os.lstat(s)
+            if os.path.islink(s):
+                os.symlink(os.readlink(s), d)
+                counts["symlink"] += 1
+                if name in dirs:
+                    dirs.remove(name)
+                continue
+            if name in dirs:
+                continue
+
+            if can_reflink:
+                try:
+                    _reflink(s, d)
+                    shutil.copystat(s, d)
+                    counts["reflink"] += 1
+                    continue
+                except OSError as e:
+                    if e.errno not in NO_REFLINK_ERRNOS:
+                        raise
+                    can_reflink = False
+                    os.unlink(d)
+            if share and archive.is_immutable(name, st.st_mode):
+                os.link(s, d)
+                counts["hardlink"] += 1
+            else:
+                shutil.copy2(s, d)
+                counts["copy"] += 1
+    return counts
+
+
+def _summary(counts):
+    return ", ".join(f"{n} {kind}ed" if kind != "copy" else f"{n} copied"
+                     for kind, n in counts.items() if n)
+
+
+def _make_read_only(path):
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            p = os.path.join(root, name)
+            if not os.path.islink(p):
+                os.chmod(p, os.lstat(p).st_mode & ~0o222)
+
+
+def capture(app_name, app_dir=None):
+    """
+    Keep a pristine copy of a freshly installed tree (APPS_DIR/<app> or a
+    version dir) if templates are on. Call before post-install runs.
+    """
+    if not enabled():
+        return None
+    app_dir = Path(app_dir or installer.APPS_DIR / app_name)
+    key = template_key(installer._read_app_meta(app_name, app_dir))
+    if key is None:
+        return None
+    dest = templates_dir(app_name) / key
+    if dest.exists():
+        return dest
+
+    started = time.monotonic()
+    partial = templates_dir(app_name) / f".{key}.partial"
+    if partial.exists():
+        shutil.rmtree(partial)
+    templates_dir(app_name).mkdir(parents=True, exist_ok=True)
+    try:
+        # Never hardlink: the live tree must stay independent of its template
+        counts = clone_tree(os.path.realpath(app_dir), partial, share=False)
+        _make_read_only(partial)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    os.rename(partial, dest)
+
+    for old_key, old_path, _ in list_templates(app_name)[KEEP_TEMPLATES:]:
+        trash.discard(old_path)
+    print(f"Saved template for {app_name} ({_summary(counts)}) in {time.monotonic() - started:.1f}s")
+    return dest
+
+
+def find_template(app_name):
+    """
+    Template for an app's current install: the one matching its metadata,
+    or, if the metadata is gone too, the newest one built from the catalog URL.
+    """
+    meta = installer._read_app_meta(app_name)
+    key = template_key(meta)
+    candidates = list_templates(app_name)
+    if key is not None:
+        return next((path for k, path, _ in candidates if k == key), None)
+    url = apps.SUPPORTED_APPS[app_name].get("url")
+    return next((path for _, path, m in candidates if m.get("source_url") == url), None)
+
+
+def restore(app_name, rerun_post_install=False):
+    """
+    Replace an app's working tree with a fresh clone of its template, then
+    relink and run post-install. Returns False if there is no template.
+    The caller holds the app lock.
+    """
+    template = find_template(app_name)
+    if template is None:
+        return False
+
+    started = time.monotonic()
+    link = installer.APPS_DIR / app_name
+    # Versioned installs: rebuild the active version, keep the others
+    dest = Path(os.path.realpath(link)) if link.is_symlink() else link
+    partial = dest.with_name(f".{dest.name}.cloning")
+    if partial.exists():
+        shutil.rmtree(partial)
+    try:
+        counts = clone_tree(template, partial)
+        # The clone is the working tree: writable like a fresh extraction
+        for root, dirs, files in os.walk(partial):
+            for name in files:
+                p = os.path.join(root, name)
+                st = os.lstat(p)
+                # Hardlinks stay read-only: they are the template's own inode
+                if not os.path.islink(p) and st.st_nlink == 1:
+                    os.chmod(p, st.st_mode | 0o200)
+    except BaseException:
+        shutil.rmtree(partial, ignore_errors=True)
+        raise
+    trash.discard(dest)
+    os.rename(partial, dest)
+    if not link.exists():
+        # A dangling active-version link, or nothing at all
+        if link.is_symlink():
+            link.unlink()
+        if dest != link:
+            installer._point_current_at(app_name, dest.name)
+
+    meta = installer._read_app_meta(app_name) or {}
+    meta["installed_at"] = installer._now_iso()
+    meta["restored_from_template"] = template.name
+    installer._write_app_meta(app_name, meta)
+
+    binary_path = installer._relink_active(app_name)
+    print(f"Restored {app_name} from template in {time.monotonic() - started:.1f}s ({_summary(counts)})")
+    installer.post_install_app(app_name, binary_path, rerun_post_install)
+    return True
+
+
+def discard(app_name):
+    """Drop an app's templates (uninstall, eviction)."""
+    trash.discard(templates_dir(app_name))
+
+
+def total_size(app_name=None):
+    """Bytes used by templates, counting each hardlinked inode once."""
+    seen = set()
+    total = 0
+    for root, dirs, files in os.walk(templates_dir(app_name)):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
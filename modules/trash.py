@@ -0,0 +1,208 @@
+"""
+Deferred deletion of app trees.
+
+Removing an install used to rmtree tens of thousands of files before the
+command could return. Now the tree is renamed into APPS_DIR/.trash (same
+filesystem, so it is one rename whatever its size) and the command carries
+on. When the process exits, a detached reaper process empties the trash at
+low priority, unlinking subtrees in parallel. Only one reaper runs at a
+time; anything left behind (e.g. the session was killed at logout) is
+picked up by the next one, or by `void trash --empty`.
+
+Callers that need the space back right away (eviction, pruning before a
+download) call empty() themselves.
+"""
+import atexit
+import fcntl
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import installer
+
+TRASH_DIRNAME = ".trash"
+REAPER_LOCK = ".reaper.lock"
+VOID_SCRIPT = Path(__file__).resolve().parent.parent / "void.py"
+# Nice value of the background reaper
+REAPER_NICE = 10
+
+# Trash dirs that got something in this process (reaped at exit)
+_pending = set()
+
+
+def trash_dir():
+    return installer.APPS_DIR / TRASH_DIRNAME
+
+
+def discard(path):
+    """
+    Move path (a directory, file or symlink) out of the way and schedule it
+    for deletion. Falls back to deleting in place if it cannot be renamed.
+    """
+    path = Path(path)
+    if not (path.exists() or path.is_symlink()):
+        return
+    if path.is_symlink() or not path.is_dir():
+        path.unlink()
+        return
+
+    root = trash_dir()
+    target = root / f"{path.name}.{time.time_ns()}.{os.getpid()}"
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        os.rename(path, target)
+    except OSError:
+        # Another filesystem (or no room for the trash dir): the slow way
+        shutil.rmtree(path, ignore_errors=True)
+        return
+
+    if not _pending:
+        atexit.register(_spawn_pending)
+    _pending.add(str(root))
+
+
+def entries(root=None):
+    root = Path(root or trash_dir())
+    try:
+        return [root / name for name in os.listdir(root) if not name.startswith(".")]
+    except OSError:
+        return []
+
+
+def size(root=None):
+    total = 0
+    for entry in entries(root):
+        for dirpath, dirs, files in os.walk(entry):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(dirpath, name)).st_size
+                except OSError:
+                    pass
+    return total
+
+
+def _spawn_pending():
+    for root in sorted(_pending):
+        spawn_reaper(root)
+    _pending.clear()
+
+
+def spawn_reaper(root=None):
+    """Start a detached reaper for the trash dir (it exits if one is running)."""
+    root = str(root or trash_dir())
+    if not entries(root):
+        return None
+    return subprocess.Popen(
+        [sys.executable, str(VOID_SCRIPT), "trash", "--reap", root],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True, close_fds=True)
+
+
+def _work_units(path, want):
+    """
+    Split a tree into about `want` subtrees to delete in parallel, deleting
+    the loose files met on the way. Returns (subtrees, dirs to rmdir after,
+    deepest first).
+    """
+    units = [path]
+    parents = []
+    while len(units) < want:
+        dirs = {u for u in units if os.path.isdir(u) and not os.path.islink(u)}
+        if not dirs:
+            break
+        units = [u for u in units if u not in dirs]
+        for d in dirs:
+            parents.append(d)
+            try:
+                names = os.listdir(d)
+            except OSError:
+                continue
+            for name in names:
+                p = os.path.join(d, name)
+                if os.path.isdir(p) and not os.path.islink(p):
+                    units.append(p)
+                else:
+                    try:
+                        os.unlink(p)
+                    except OSError:
+                        pass
+    return units, parents[::-1]
+
+
+def _delete(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def empty(root=None, workers=None):
+    """
+    Delete everything in the trash now, several subtrees at a time.
+    Entries that cannot be deleted (permissions, EBUSY) are tried once and
+    left in place with a warning. Returns the number of entries deleted.
+    """
+    workers = workers or min(8, (os.cpu_count() or 2) * 2)
+    removed = 0
+    stuck = set()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="void-reaper") as pool:
+        while True:
+            # Rescan for entries trashed meanwhile, but never retry a stuck one
+            batch = [entry for entry in entries(root) if entry not in stuck]
+            if not batch:
+                break
+            for entry in batch:
+                units, parents = _work_units(str(entry), workers * 4)
+                list(pool.map(_delete, units))
+                for d in parents:
+                    try:
+                        os.rmdir(d)
+                    except OSError:
+                        pass
+                if os.path.lexists(entry):
+                    _delete(str(entry))
+                if os.path.lexists(entry):
+                    stuck.add(entry)
+                else:
+                    removed += 1
+    if stuck:
+        print(f"Warning: could not delete {len(stuck)} trash item(s): "
+              f"{', '.join(sorted(str(p) for p in stuck))}")
+    return removed
+
+
+def reap(root):
+    """
+    Reaper process body: empty the trash unless another reaper holds the
+    lock. Rechecks after letting go, so nothing trashed meanwhile is missed.
+    """
+    try:
+        os.nice(REAPER_NICE)
+    except OSError:
+        pass
+    lock_path = Path(root) / REAPER_LOCK
+    while entries(root):
+        try:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        except OSError:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return
+        try:
+            removed = empty(root)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        if not removed:
+            # Only undeletable entries are left: the next reaper retries them
+            return
@@ -2,13 +2,23 @@ import curses
 import sys
 import os
 from pathlib import Path
-from . import apps, installer, cleanup
+from . import apps, installer, cleanup, jobs, prefetch
+
+# Row labels for background jobs
+JOB_PREFIX = {"queued": "[q]", "done": "[✓]", "failed": "[!]", "cancelled": "[x]"}
 
 
 class VoidTUI:
-    def __init__(self, stdscr, missing_path=False):
+    def __init__(self, stdscr, missing_path=False, output=None):
         self.stdscr = stdscr
         self.missing_path = missing_path
+
+        # Installs/uninstalls run in the background; the loop redraws on a
+        # timer so progress stays live while the user keeps browsing.
+        self.jobs = jobs.JobQueue(workers=2, output=output)
+        self.message = ""
+        self.quit_armed = False
+        self.stdscr.timeout(250)
         self.all_apps = sorted(apps.SUPPORTED_APPS.keys())
         self.apps_list = self.all_apps  # Currently displayed list
         self.selected_indices = set()
@@ -53,7 +63,7 @@ class VoidTUI:
         self.scroll_offset = 0  # simple reset to top on search change
 
     def draw(self):
-        self.stdscr.clear()
+        self.stdscr.erase()
         height, width = self.stdscr.getmaxyx()
 
         # Title
@@ -82,7 +92,12 @@ class VoidTUI:
         if self.search_mode:
             status_bar = " TYPE to search | ENTER: Done | ESC: Cancel "
         else:
-            status_bar = f" UP/DOWN: Navigate | SPACE: Toggle | /: Search | ENTER: Install ({len(self.selected_indices)}) | c: Cleanup | q: Quit "
+            status_bar = f" UP/DOWN: Navigate | SPACE: Toggle | /: Search | ENTER: Queue ({len(self.selected_indices)}) | x: Cancel | c: Cleanup | q: Quit "
+            active = len(self.jobs.active_jobs())
+            if active:
+                status_bar = f" Jobs: {active} running |" + status_bar
+        if self.message:
+            status_bar = f" {self.message} "
 
         try:
             self.stdscr.addstr(
@@ -90,8 +105,19 @@ class VoidTUI:
         except curses.error:
             pass  # Ignore if window too small
 
-        # List area
-        list_h = height - list_start_y - 1
+        # List area (one line above the status bar shows job output)
+        list_h = height - list_start_y - 2
+
+        if self.apps_list:
+            job = self.jobs.get(self.apps_list[self.current_index])
+            if job is not None:
+                detail = f" {job.app_name}: {job.describe()}"
+                if job.last_line and job.active:
+                    detail += f" | {job.last_line}"
+                try:
+                    self.stdscr.addstr(height - 2, 0, detail[:width-1], curses.color_pair(5))
+                except curses.error:
+                    pass
 
         if not self.apps_list:
             self.stdscr.addstr(list_start_y + 1, 2,
@@ -108,9 +134,11 @@ class VoidTUI:
             # Status Indicators
             installed = self.is_installed(app_key)
             selected = app_key in self.selected_indices
+            job = self.jobs.get(app_key)
 
             prefix = "[ ]"
             attr = curses.A_NORMAL
+            suffix = ""
 
             if installed:
                 prefix = "[I]"
@@ -118,13 +146,20 @@ class VoidTUI:
             if selected:
                 prefix = "[*]"
                 attr = curses.color_pair(3) | curses.A_BOLD
+                fetch = prefetch.get(app_key)
+                if fetch is not None:
+                    suffix = f"  {fetch.describe()}"
+            if job is not None and (job.active or job.state in ("failed", "cancelled")):
+                prefix = JOB_PREFIX.get(job.state, "[~]")
+                suffix = f"  {job.action}: {job.describe()}"
+                attr = curses.color_pair(5) | curses.A_BOLD
 
             # Highlight current row
             row_attr = attr
             if idx == self.current_index and not self.search_mode:
                 row_attr = curses.color_pair(1)
 
-            display_name = f"{prefix} {app_info['name']} ({app_key})"
+            display_name = f"{prefix} {app_info['name']} ({app_key}){suffix}"
 
             # Truncate
             if len(display_name) > width - 2:
@@ -139,6 +174,12 @@ class VoidTUI:
 
     def handle_input(self):
         key = self.stdscr.getch()
+        if key == -1:
+            # Redraw tick, no key pressed
+            return True
+        self.message = ""
+        if key != ord('q'):
+            self.quit_armed = False
 
         if self.search_mode:
             # Search Input Handling
@@ -168,7 +209,7 @@ class VoidTUI:
         if self.search_query:
             list_start_y += 1  # Search bar room
 
-        list_h = height - list_start_y - 1
+        list_h = height - list_start_y - 2
 
         if key == curses.KEY_UP and self.current_index > 0:
             self.current_index -= 1
@@ -183,8 +224,13 @@ class VoidTUI:
                 app = self.apps_list[self.current_index]
                 if app in self.selected_indices:
                     self.selected_indices.remove(app)
+                    prefetch.cancel(app)
                 else:
                     self.selected_indices.add(app)
+                    job = self.jobs.get(app)
+                    if not self.is_installed(app) and not (job and job.active):
+                        # Start fetching now; ENTER will find it local
+                        prefetch.start(app)
         elif key == ord('/') or key == ord('s'):
             self.search_mode = True
         elif key == 27:  # ESC to clear search if not in search mode
@@ -193,78 +239,34 @@ class VoidTUI:
                 self.update_filter()
         elif key == ord('\n') or key == curses.KEY_ENTER:
             if self.selected_indices:
-                self.run_install()
-                self.selected_indices.clear()  # Clear selection after install
+                self.queue_selected()
+                self.selected_indices.clear()  # Clear selection after queueing
+        elif key == ord('x'):
+            if self.apps_list:
+                app = self.apps_list[self.current_index]
+                if self.jobs.cancel(app):
+                    self.message = f"Cancelling {app}..."
         elif key == ord('c'):
             self.run_cleanup()
         elif key == ord('q'):
+            active = self.jobs.active_jobs()
+            if active and not self.quit_armed:
+                self.quit_armed = True
+                self.message = f"{len(active)} job(s) still running. Press q again to cancel them and quit."
+                return True
+            self.jobs.cancel_all()
+            self.jobs.shutdown(timeout=5)
+            prefetch.cancel_all()
             return False
 
         return True
 
-    def run_install(self):
-        # Exit curses mode nicely essentially, or draw a progress window.
-        # Simple approach: standard print is hijacked by curses.
-        # We can suspend curses or just use a simple modal.
-
-        # We'll use a simple blocking render for now.
-        height, width = self.stdscr.getmaxyx()
-        win = curses.newwin(height - 4, width - 4, 2, 2)
-        win.box()
-        win.refresh()
-
-        total = len(self.selected_indices)
-        for i, app_name in enumerate(self.selected_indices):
-            win.clear()
-            win.box()
-
-            # Determine action
-            installed = self.is_installed(app_name)
-            action = "Uninstalling" if installed else "Installing"
-
-            win.addstr(
-                2, 2, f"{action} {i+1}/{total}: {apps.SUPPORTED_APPS[app_name]['name']}")
-            win.addstr(4, 2, "Please wait... (Check stdout logs if needed)")
-            win.refresh()
-
-            try:
-                # Basic suppression
-                with open(os.devnull, 'w') as fnull:
-                    # Save originals
-                    old_stdout = sys.stdout
-                    sys.stdout = fnull
-
-                    try:
-                        if installed:
-                            installer.uninstall_app(app_name)
-                        else:
-                            installer.install_app(app_name)
-                    finally:
-                        sys.stdout = old_stdout
-            except Exception as e:
-                # Show error dialog
-                win.clear()
-                win.box()
-                win.addstr(
-                    2, 2, f"ERROR installing {apps.SUPPORTED_APPS[app_name]['name']}:")
-                error_msg = str(e)
-                # split long error
-                if len(error_msg) > width - 6:
-                    win.addstr(3, 2, error_msg[:width-6])
-                    win.addstr(4, 2, error_msg[width-6:2*width-12])
-                else:
-                    win.addstr(3, 2, error_msg)
-
-                win.addstr(height-6, 2, "Press any key to skip/continue...")
-                win.refresh()
-                win.getch()
-
-        win.clear()
-        win.box()
-        win.addstr(2, 2, "Batch processing complete!")
-        win.addstr(4, 2, "Press any key to return to menu.")
-        win.refresh()
-        win.getch()
+    def queue_selected(self):
+        """Queue selected apps: install if missing, uninstall if installed."""
+        for app_name in sorted(self.selected_indices):
+            action = "uninstall" if self.is_installed(app_name) else "install"
+            self.jobs.submit(app_name, action)
+        self.message = f"Queued {len(self.selected_indices)} job(s)"
 
     def run_cleanup(self):
         """Show cleanup analysis and allow user to clean."""
@@ -355,8 +357,17 @@ def run(missing_path=False):
 
 
 def _run_loop(stdscr, missing_path):
-    tui = VoidTUI(stdscr, missing_path)
-    while True:
-        tui.draw()
-        if not tui.handle_input():
-            break
+    # Printing would corrupt the curses screen: job output goes to the job's
+    # log, anything else is dropped.
+    with open(os.devnull, 'w') as fnull:
+        output = jobs.JobOutput(fnull)
+        old_stdout = sys.stdout
+        sys.stdout = output
+        try:
+            tui = VoidTUI(stdscr, missing_path, output=output)
+            while True:
+                tui.draw()
+                if not tui.handle_input():
+                    break
+        finally:
+            sys.stdout = old_stdout
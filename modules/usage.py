@@ -0,0 +1,321 @@
+"""
+Optional usage tracking and least-recently-used eviction.
+
+When tracking is on, ~/bin/<link> is a tiny sh shim instead of a
+symlink. Each launch appends one byte to ~/.config/void/usage/<app> before
+exec'ing the real binary, so the launch count is the file size and the last
+use is its mtime: no parsing, no locking, and well under a millisecond on
+startup. The files live in home, so they survive a goinfre wipe.
+
+Eviction removes an app's files from goinfre but keeps its data dirs, so
+`void install <app>` brings it back as it was; evicted.json remembers when
+it went and how much it had been used, for `void usage`. With auto-evict on, every download first evicts idle apps,
+least recently used first, while goinfre has less free space than the
+configured minimum.
+"""
+import json
+import os
+import shlex
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+from . import apps, cache, installer, locks, templates, trash
+
+USAGE_DIR = Path.home() / ".config" / "void" / "usage"
+SETTINGS_NAME = "settings.json"
+EVICTED_NAME = "evicted.json"
+SHIM_MARKER = "# void-shim:"
+# Other void-generated ~/bin scripts with the same layout (see read_shim)
+SHIM_MARKERS = {SHIM_MARKER: "usage", "# void-thaw:": "thaw", "# void-lazy:": "lazy"}
+
+DEFAULT_SETTINGS = {
+    "enabled": False,
+    "auto_evict": False,
+    "min_free_gb": 5,
+    "min_idle_days": 14,
+}
+
+
+def settings():
+    try:
+        with open(USAGE_DIR / SETTINGS_NAME, "r") as f:
+            return dict(DEFAULT_SETTINGS, **json.load(f))
+    except (OSError, ValueError):
+        return dict(DEFAULT_SETTINGS)
+
+
+def save_settings(**changes):
+    current = settings()
+    current.update({k: v for k, v in changes.items() if v is not None})
+    USAGE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(USAGE_DIR / SETTINGS_NAME, "w") as f:
+        json.dump(current, f, indent=2, sort_keys=True)
+    return current
+
+
+def enabled():
+    return settings()["enabled"]
+
+
+def usage_file(app_name):
+    return USAGE_DIR / app_name
+
+
+# --- Shims ---
+
+def shim_script(app_name, target):
+    return (
+        "#!/bin/sh\n"
+        f"{SHIM_MARKER} {app_name}\n"
+        f"printf . >>{shlex.quote(str(usage_file(app_name)))} 2>/dev/null\n"
+        f"exec {shlex.quote(str(target))} \"$@\"\n"
+    )
+
+
+def read_shim(path):
+    """
+    (kind, app_name, target) if path is a void-generated script, else None.
+    Every such script is "#!/bin/sh", "<marker> <app>", one command, and
+    "exec <target> ..."; kind is "usage", "thaw" (modules/hibernate.py) or
+    "lazy" (modules/lazy.py).
+    """
+    try:
+        if os.path.islink(path):
+            return None
+        with open(path, "r") as f:
+            head = f.read(4096)
+    except (OSError, UnicodeDecodeError):
+        return None
+    lines = head.splitlines()
+    if len(lines) < 4:
+        return None
+    marker, _, app_name = lines[1].partition(": ")
+    kind = SHIM_MARKERS.get(marker + ":")
+    if kind is None:
+        return None
+    try:
+        target = shlex.split(lines[3])[1]
+    except (ValueError, IndexError):
+        return None
+    return kind, app_name.strip(), target
+
+
+def is_shim(path):
+    """True for a usage-tracking shim."""
+    shim = read_shim(path)
+    return shim is not None and shim[0] == "usage"
+
+
+def link_target(path):
+    """Where a ~/bin entry leads: symlink target or shim target; None if neither."""
+    try:
+        return os.readlink(path)
+    except OSError:
+        pass
+    shim = read_shim(path)
+    return shim[2] if shim else None
+
+
+def link_matches(app_name, path, target):
+    """True if the ~/bin entry is the right kind (shim or symlink) and leads to target."""
+    if enabled():
+        return read_shim(path) == ("usage", app_name, str(target))
+    try:
+        return os.readlink(path) == str(target)
+    except OSError:
+        return False
+
+
+# --- Stats ---
+
+def stats(app_names=None):
+    """{app: {"launches": int, "last_used": epoch seconds or None}}"""
+    if app_names is None:
+        app_names = installer.get_installed_app_names()
+    result = {}
+    for app_name in app_names:
+        try:
+            st = usage_file(app_name).stat()
+            result[app_name] = {"launches": st.st_size, "last_used": st.st_mtime}
+        except OSError:
+            result[app_name] = {"launches": 0, "last_used": None}
+    return result
+
+
+def _installed_at(app_name):
+    meta = installer._read_app_meta(app_name) or {}
+    try:
+        return datetime.fromisoformat(meta["installed_at"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        try:
+            return (installer.APPS_DIR / app_name).stat().st_mtime
+        except OSError:
+            return 0
+
+
+def last_activity(app_name, app_stats=None):
+    """Last launch, or the install time for apps never launched through a shim."""
+    app_stats = app_stats or stats([app_name])[app_name]
+    return app_stats["last_used"] or _installed_at(app_name)
+
+
+def is_running(app_name):
+    """True if a process is executing from the app's install dir."""
+    try:
+        app_dir = os.path.realpath(installer.APPS_DIR / app_name) + os.sep
+    except OSError:
+        return False
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            if os.readlink(f"/proc/{pid}/exe").startswith(app_dir):
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def lru_candidates(exclude=(), min_idle_days=0):
+    """Installed apps idle for at least min_idle_days, least recently used first."""
+    now = time.time()
+    all_stats = stats()
+    candidates = []
+    for app_name, app_stats in all_stats.items():
+        if app_name in exclude:
+            continue
+        last = last_activity(app_name, app_stats)
+        if now - last < min_idle_days * 86400:
+            continue
+        candidates.append((last, app_name))
+    return [app_name for _, app_name in sorted(candidates)]
+
+
+# --- Eviction ---
+
+def evicted():
+    """{app: record} for evicted apps that have not been reinstalled since."""
+    try:
+        with open(USAGE_DIR / EVICTED_NAME, "r") as f:
+            records = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {a: r for a, r in records.items() if not (installer.APPS_DIR / a).exists()}
+
+
+def _dir_size(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def evict(app_name, wait=None):
+    """
+    Remove an app's files from goinfre, keeping its data dirs.
+    Returns the bytes freed, or None if it was not evicted.
+    """
+    app_info = apps.SUPPORTED_APPS[app_name]
+    with locks.app_lock(app_name, wait=wait):
+        app_dir = installer.APPS_DIR / app_name
+        if not app_dir.exists():
+            return None
+        if is_running(app_name):
+            print(f"Not evicting {app_name}: it is running.")
+            return None
+
+        app_stats = stats([app_name])[app_name]
+        record = {
+            "evicted_at": installer._now_iso(),
+            "launches": app_stats["launches"],
+            "last_used": app_stats["last_used"],
+        }
+        freed = _dir_size(installer.APPS_DIR / installer.VERSIONS_DIRNAME / app_name)
+        if not app_dir.is_symlink():
+            freed += _dir_size(app_dir)
+
+        link_path = installer.BIN_DIR / app_info["link_name"]
+        with locks.shared_lock("bin"):
+            if link_target(link_path) is not None:
+                link_path.unlink()
+        desktop_file = installer.DESKTOP_DIR / f"void_{app_name}.desktop"
+        with locks.shared_lock("desktop"):
+            if desktop_file.exists():
+                desktop_file.unlink()
+        installer.remove_app_files(app_name)
+        templates.discard(app_name)
+
+        records = evicted()
+        records[app_name] = record
+        USAGE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(USAGE_DIR / EVICTED_NAME, "w") as f:
+            json.dump(records, f, indent=2, sort_keys=True)
+
+    print(f"Evicted {app_name} ({freed / (1024 * 1024):.0f} MB). Data kept; 'void install {app_name}' brings it back.")
+    return freed
+
+
+def free_bytes():
+    path = installer.APPS_DIR if installer.APPS_DIR.exists() else installer.VOID_ROOT
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def ensure_free_space(min_free_bytes=None, exclude=(), min_idle_days=None, dry_run=False):
+    """
+    Evict least recently used apps while free space is below min_free_bytes
+    (after shrinking the download cache). Returns the evicted (or, with dry_run, would-be evicted) app names.
+    """
+    current = settings()
+    if min_free_bytes is None:
+        min_free_bytes = int(current["min_free_gb"] * 1024 ** 3)
+    if min_idle_days is None:
+        min_idle_days = current["min_idle_days"]
+
+    free = free_bytes()
+    if free is None or free >= min_free_bytes:
+        return []
+
+    if not dry_run:
+        # Cached downloads are cheaper to lose than installed apps
+        freed = cache.free_space(min_free_bytes - free)
+        if freed:
+            free = free_bytes() or free + freed
+            if free >= min_free_bytes:
+                return []
+
+    chosen = []
+    for app_name in lru_candidates(exclude, min_idle_days):
+        if free >= min_free_bytes:
+            break
+        if dry_run:
+            free += _dir_size(os.path.realpath(installer.APPS_DIR / app_name))
+            chosen.append(app_name)
+            continue
+        try:
+            # Never wait here: the app may be the one another process is installing
+            freed = evict(app_name, wait=False)
+        except locks.LockBusy:
+            continue
+        if freed is not None:
+            chosen.append(app_name)
+            # Eviction is for space now: don't leave it to the background reaper
+            trash.empty()
+            free = free_bytes() or free + freed
+    return chosen
+
+
+def auto_evict(exclude=()):
+    """Run the eviction policy if the user turned it on (called before downloads)."""
+    current = settings()
+    if not (current["enabled"] and current["auto_evict"]):
+        return []
+    return ensure_free_space(exclude=exclude)
@@ -0,0 +1,96 @@
+"""
+Shared fixtures for tests that install apps into a throwaway goinfre.
+
+VoidTestCase points installer (and the settings files of the optional
+features) at a fresh temp dir laid out like a real post, and puts
+everything back afterwards, together with any apps added via add_app.
+"""
+import io
+import shutil
+import sys
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import apps, cache, installer, lazy, prefetch, templates, usage
+
+RUN_SCRIPT = b"#!/bin/sh\necho hi\n"
+
+
+def make_tarball(path, script=RUN_SCRIPT, files=(), links=(), bin_path="App/bin/run"):
+    """
+    Write a .tar.gz app to path: an executable bin_path with the given
+    script, plus extra (name, data, mode) files and (name, target) symlinks.
+    Returns path.
+    """
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data, mode in ((bin_path, script, 0o755), *files):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = mode
+            tar.addfile(info, io.BytesIO(data))
+        for name, target in links:
+            link = tarfile.TarInfo(name)
+            link.type = tarfile.SYMTYPE
+            link.linkname = target
+            tar.addfile(link)
+    return path
+
+
+def serve(tar_path, **meta):
+    """A download_file stand-in that copies tar_path and returns meta."""
+    def download(url, target):
+        shutil.copy(tar_path, target)
+        return dict(meta)
+    return download
+
+
+class VoidTestCase(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.test_dir)
+        self.home = self.test_dir / "home"
+        self.home.mkdir()
+        config = self.home / ".config" / "void"
+
+        goinfre = self.test_dir / "goinfre_void"
+        self.override(installer,
+                      VOID_ROOT=goinfre,
+                      APPS_DIR=goinfre / "void" / "apps",
+                      DATA_DIR=goinfre / "void" / "data",
+                      BIN_DIR=self.home / "bin",
+                      DESKTOP_DIR=self.home / ".local" / "share" / "applications",
+                      # Whatever a test swaps in for these is undone too
+                      download_file=installer.download_file,
+                      fetch_url_metadata=installer.fetch_url_metadata,
+                      extract_app=installer.extract_app)
+        self.override(usage, USAGE_DIR=config / "usage")
+        for module in (cache, lazy, prefetch, templates):
+            self.override(module, SETTINGS_FILE=config / module.SETTINGS_FILE.name)
+
+        home_patch = patch("pathlib.Path.home", return_value=self.home)
+        home_patch.start()
+        self.addCleanup(home_patch.stop)
+
+    def override(self, module, **values):
+        """Set module attributes for the duration of the test."""
+        for name, value in values.items():
+            self.addCleanup(setattr, module, name, getattr(module, name))
+            setattr(module, name, value)
+
+    def add_app(self, app_name, **fields):
+        """Add a catalog entry for the duration of the test; fields override the defaults."""
+        apps.SUPPORTED_APPS[app_name] = dict({
+            "name": app_name,
+            "url": f"https://example.invalid/{app_name}.tar.gz",
+            "type": "tar.gz",
+            "bin_path": "App/bin/run",
+            "link_name": app_name,
+        }, **fields)
+        self.addCleanup(apps.SUPPORTED_APPS.pop, app_name, None)
+        return apps.SUPPORTED_APPS[app_name]
@@ -0,0 +1,224 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import archive
+
+
+def make_tar_bytes(files):
+    """Build an uncompressed tarball from {path: bytes}."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def zstd_compress(data):
+    return subprocess.run(["zstd", "-q", "-c"], input=data,
+                          stdout=subprocess.PIPE, check=True).stdout
+
+
+def make_ar(path, members):
+    """Write an ar archive (the .deb container) from [(name, bytes)]."""
+    with open(path, "wb") as f:
+        f.write(b"!<arch>\n")
+        for name, data in members:
+            header = (f"{name:<16}" f"{0:<12}" f"{0:<6}" f"{0:<6}"
+                      f"{100644:<8}" f"{len(data):<10}").encode() + b"`\n"
+            f.write(header)
+            f.write(data)
+            if len(data) % 2:
+                f.write(b"\n")
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_tar_type_from_name(self):
+        self.assertEqual(archive.tar_type_from_name("app.tar.zst"), "tar.zst")
+        self.assertEqual(archive.tar_type_from_name("kitty.txz"), "tar.xz")
+        self.assertEqual(archive.tar_type_from_name("btop.tbz"), "tar.bz2")
+        self.assertEqual(archive.tar_type_from_name("download"), "tar.gz")
+
+    def test_sniff_format(self):
+        tar_bytes = make_tar_bytes({"a": b"x"})
+        self.assertEqual(archive.sniff_format(gzip.compress(tar_bytes)), "tar.gz")
+        self.assertEqual(archive.sniff_format(lzma.compress(tar_bytes)), "tar.xz")
+        self.assertEqual(archive.sniff_format(bz2.compress(tar_bytes)), "tar.bz2")
+        self.assertEqual(archive.sniff_format(tar_bytes), "tar")
+        self.assertEqual(archive.sniff_format(b"PK\x03\x04rest"), "zip")
+        self.assertEqual(archive.sniff_format(b"!<arch>\ndebian-binary"), "deb")
+        self.assertEqual(archive.sniff_format(b"\x7fELF\x02\x01\x01\x00AI\x02"), "appimage")
+        self.assertEqual(archive.sniff_format(b"\x7fELF\x02\x01\x01\x00\x00\x00\x00"), "binary")
+        self.assertEqual(archive.sniff_format(b"#!/bin/sh\n"), "binary")
+        self.assertIsNone(archive.sniff_format(b"<html>"))
+
+    def test_resolve_type(self):
+        # Content wins over a wrong catalog type
+        self.assertEqual(archive.resolve_type("tar.gz", "tar.xz"), "tar.xz")
+        self.assertEqual(archive.resolve_type("appimage", "binary"), "binary")
+        # Unknown content keeps the catalog type
+        self.assertEqual(archive.resolve_type("tar.gz", None), "tar.gz")
+        # Explicit binaries are never extracted
+        self.assertEqual(archive.resolve_type("binary", "appimage"), "binary")
+
+    def test_extract_members_fast_path(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            for name, data, mode in [("App/bin/app", b"#!/bin/sh\n", 0o755),
+                                     ("App/share/readme", b"hello", 0o600)]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mode = mode
+                tar.addfile(info, io.BytesIO(data))
+            link = tarfile.TarInfo("App/app")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "bin/app"
+            tar.addfile(link)
+            hard = tarfile.TarInfo("App/share/readme2")
+            hard.type = tarfile.LNKTYPE
+            hard.linkname = "App/share/readme"
+            tar.addfile(hard)
+            outside = tarfile.TarInfo("App/escape")
+            outside.type = tarfile.SYMTYPE
+            outside.linkname = "/etc/passwd"
+            tar.addfile(outside)
+        buf.seek(0)
+
+        out = self.test_dir / "out"
+        with tarfile.open(fileobj=buf, mode="r|") as tar:
+            archive.extract_members(tar, out)
+
+        self.assertTrue(os.access(out / "App/bin/app", os.X_OK))
+        self.assertFalse(os.access(out / "App/share/readme", os.X_OK))
+        self.assertEqual((out / "App/app").read_bytes(), b"#!/bin/sh\n")
+        self.assertEqual((out / "App/share/readme2").stat().st_ino,
+                         (out / "App/share/readme").stat().st_ino)
+        # Links leaving the destination are skipped, not created
+        self.assertFalse(os.path.lexists(out / "App/escape"))
+
+    def test_duplicate_members_end_with_the_last_one(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            for name, data in [("App/f", b"file"), ("App/g", b"first"), ("App/g", b"second")]:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+            link = tarfile.TarInfo("App/f")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "g"
+            tar.addfile(link)
+        tar_path = self.test_dir / "dup.tar"
+        tar_path.write_bytes(buf.getvalue())
+
+        # The queued write of the first "App/f" must never land after the link
+        for i in range(20):
+            out = self.test_dir / f"out{i}"
+            with tarfile.open(tar_path) as tar:
+                archive.extract_members(tar, out, workers=4)
+            self.assertEqual(os.readlink(out / "App/f"), "g")
+            self.assertEqual((out / "App/g").read_bytes(), b"second")
+
+    def test_extract_members_rejects_traversal(self):
+        tar_path = self.test_dir / "evil.tar"
+        tar_path.write_bytes(make_tar_bytes({"../evil": b"x"}))
+
+        with tarfile.open(tar_path) as tar:
+            with self.assertRaises(tarfile.TarError):
+                archive.extract_members(tar, self.test_dir / "out")
+        self.assertFalse((self.test_dir / "evil").exists())
+
+    def test_extract_zip_keeps_exec_bit_and_links(self):
+        zip_path = self.test_dir / "app.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            exe = zipfile.ZipInfo("tool/bin/tool")
+            exe.external_attr = (stat.S_IFREG | 0o755) << 16
+            zf.writestr(exe, b"#!/bin/sh\n")
+            zf.writestr("tool/README", b"docs")
+            link = zipfile.ZipInfo("tool/tool")
+            link.external_attr = (stat.S_IFLNK | 0o777) << 16
+            zf.writestr(link, b"bin/tool")
+            zf.writestr("../escape", b"x")
+
+        out = self.test_dir / "out"
+        archive.extract_zip(zip_path, out, workers=4)
+
+        self.assertTrue(os.access(out / "tool/bin/tool", os.X_OK))
+        self.assertFalse(os.access(out / "tool/README", os.X_OK))
+        self.assertTrue((out / "tool/tool").is_symlink())
+        # '..' is stripped like zipfile.extract does
+        self.assertEqual((out / "escape").read_bytes(), b"x")
+        self.assertFalse((self.test_dir / "escape").exists())
+
+    @unittest.skipUnless(shutil.which("zstd"), "zstd binary not available")
+    def test_extract_tar_zst(self):
+        tar_path = self.test_dir / "app.tar.zst"
+        tar_path.write_bytes(zstd_compress(make_tar_bytes({"App/bin/app": b"#!/bin/sh\n"})))
+
+        out = self.test_dir / "out"
+        archive.extract_tar(tar_path, out, "tar.zst")
+        self.assertEqual((out / "App/bin/app").read_bytes(), b"#!/bin/sh\n")
+
+    @unittest.skipUnless(shutil.which("zstd"), "zstd binary not available")
+    def test_extract_deb_with_zstd_payload(self):
+        deb_path = self.test_dir / "app.deb"
+        make_ar(deb_path, [
+            ("debian-binary", b"2.0\n"),
+            ("control.tar.zst", zstd_compress(make_tar_bytes({"./control": b"Package: app\n"}))),
+            ("data.tar.zst", zstd_compress(make_tar_bytes({"./usr/bin/app": b"binary"}))),
+        ])
+
+        out = self.test_dir / "out"
+        archive.extract_deb(deb_path, out)
+        self.assertEqual((out / "usr/bin/app").read_bytes(), b"binary")
+        # Temporary payload copy is cleaned up
+        self.assertEqual(sorted(p.name for p in self.test_dir.iterdir()), ["app.deb", "out"])
+
+    def test_extract_deb_streams_payload_and_rebases_absolute_links(self):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+            data = b"binary"
+            info = tarfile.TarInfo("./usr/share/app/app")
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+            link = tarfile.TarInfo("./usr/bin/app")
+            link.type = tarfile.SYMTYPE
+            link.linkname = "/usr/share/app/app"
+            tar.addfile(link)
+        deb_path = self.test_dir / "app.deb"
+        make_ar(deb_path, [("debian-binary", b"2.0\n"), ("data.tar.gz", buf.getvalue())])
+
+        out = self.test_dir / "out"
+        with patch("shutil.which", return_value=None):  # no dpkg needed
+            archive.extract_deb(deb_path, out)
+        self.assertEqual(os.readlink(out / "usr/bin/app"), "../share/app/app")
+        self.assertEqual((out / "usr/bin/app").read_bytes(), b"binary")
+        self.assertEqual(sorted(p.name for p in self.test_dir.iterdir()), ["app.deb", "out"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import background
+
+VOID_SCRIPT = Path(__file__).parent.parent / "void.py"
+
+
+class TestBackgroundInstall(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.home = self.test_dir / "home"
+        self.void_root = self.test_dir / "goinfre_void"
+        config = self.home / ".config" / "void"
+        config.mkdir(parents=True)
+
+        tar_path = self.test_dir / "app.tar.gz"
+        with tarfile.open(tar_path, "w:gz") as tar:
+            data = b"#!/bin/sh\necho bg\n"
+            info = tarfile.TarInfo("App/bin/run")
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+        (config / "custom_apps.json").write_text(json.dumps({"bgapp": {
+            "name": "Background App",
+            "url": tar_path.as_uri(),
+            "type": "tar.gz",
+            "bin_path": "App/bin/run",
+            "link_name": "bgapp",
+        }}))
+        (config / "apps.json").write_text(json.dumps({"apps": ["bgapp"]}))
+        self.env = dict(os.environ, HOME=str(self.home), VOID_ROOT=str(self.void_root))
+        self.env.pop("DISPLAY", None)
+        self.env.pop("WAYLAND_DISPLAY", None)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def void(self, *args):
+        return subprocess.run([sys.executable, str(VOID_SCRIPT), *args],
+                              capture_output=True, text=True, env=self.env, timeout=60)
+
+    def test_install_all_detaches_and_reports_status(self):
+        proc = self.void("install-all", "--background")
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertIn("in the background", proc.stdout)
+
+        status_path = self.void_root / "void" / "install.status.json"
+        deadline = time.monotonic() + 30
+        status = None
+        while time.monotonic() < deadline:
+            status = background.read_status(status_path)
+            if status and status["state"] != "running":
+                break
+            time.sleep(0.1)
+        self.assertEqual(status["state"], "finished")
+        self.assertEqual(status["done"], {"bgapp": "installed"})
+        self.assertTrue((self.home / "bin" / "bgapp").is_symlink())
+
+        log = (self.void_root / "void" / "install.log").read_text()
+        self.assertIn(f"nice +{background.BACKGROUND_NICE}", log)
+        self.assertIn("1/1 apps", self.void("install-all", "--status").stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, batch
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestBatchInstall(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tar_path = make_tarball(self.test_dir / "app.tar.gz")
+        self.app_names = ["batchapp1", "batchapp2", "batchbroken"]
+        for name in self.app_names:
+            self.add_app(name)
+
+    def test_stage_limits(self):
+        limits = batch.stage_limits(4)
+        self.assertEqual(limits["download"], 4)
+        self.assertGreaterEqual(limits["extract"], 1)
+        self.assertLessEqual(limits["extract"], 4)
+        self.assertEqual(limits["finish"], 1)
+
+    def test_parallel_install_isolates_failures(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def download(url, target):
+            with lock:
+                active.append(url)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(url)
+            if "broken" in url:
+                raise Exception("HTTP Error 404")
+            shutil.copy(self.tar_path, target)
+            return {}
+
+        installer.download_file = download
+        results = batch.install_many(self.app_names + ["nosuchapp"], jobs=3)
+
+        status = {r["app"]: r["status"] for r in results}
+        self.assertEqual(status, {"batchapp1": "installed", "batchapp2": "installed",
+                                  "batchbroken": "failed", "nosuchapp": "unknown"})
+        self.assertIn("404", results[2]["error"])
+        # Downloads overlapped
+        self.assertGreater(max(peak), 1)
+        for name in ("batchapp1", "batchapp2"):
+            self.assertTrue((installer.BIN_DIR / name).is_symlink())
+
+        # Second run relinks existing installs without downloading
+        installer.download_file = None
+        results = batch.install_many(["batchapp1", "batchapp2"], jobs=2)
+        self.assertEqual([r["status"] for r in results], ["ready", "ready"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps, cache, inspector
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestArtifactCache(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.save_settings(enabled=True)
+        self.etag = "v1"
+        self.downloads = 0
+        installer.download_file = self.fake_download
+        installer.fetch_url_metadata = lambda url: {"url": url, "resolved_url": url, "etag": self.etag}
+        self.add_app("cacheapp", name="Cache App")
+
+    def fake_download(self, url, target):
+        self.downloads += 1
+        make_tarball(target, f"#!/bin/sh\necho {self.etag}\n".encode())
+        return {"url": url, "resolved_url": url, "etag": self.etag}
+
+    def test_reinstall_uses_cached_archive_while_fresh(self):
+        installer.install_app("cacheapp")
+        self.assertEqual(cache.stats()["artifacts"], 1)
+        self.assertEqual(list(installer.APPS_DIR.glob("cacheapp_temp_*")), [])
+
+        installer.uninstall_app("cacheapp")
+        installer.install_app("cacheapp")
+        self.assertEqual(self.downloads, 1)
+        self.assertIn("echo v1", (installer.BIN_DIR / "cacheapp").read_text())
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(installer._read_app_meta("cacheapp")["etag"], "v1")
+
+        # The server has a new build: the cached one is not used for the update
+        self.etag = "v2"
+        installer.update_app("cacheapp")
+        self.assertEqual(self.downloads, 2)
+        self.assertIn("echo v2", (installer.BIN_DIR / "cacheapp").read_text())
+        self.assertEqual(cache.stats()["artifacts"], 2)
+
+    def test_install_adopts_inspected_archive_and_tree(self):
+        url = apps.SUPPORTED_APPS["cacheapp"]["url"]
+        result = inspector.inspect_archive(url)
+        inspector.cleanup_temp(result["temp_dir"])
+        self.assertEqual(result["archive_type"], "tar.gz")
+        self.assertTrue(Path(result["kept_tree"], "App", "bin", "run").exists())
+
+        with patch.object(installer, "extract_tar", side_effect=AssertionError("extracted again")):
+            installer.install_app("cacheapp")
+        self.assertEqual(self.downloads, 1)
+        self.assertIn("echo v1", (installer.BIN_DIR / "cacheapp").read_text())
+        self.assertFalse(Path(result["kept_tree"]).exists())
+        # The archive stays cached for later reinstalls; the tree was used up
+        self.assertEqual(cache.stats()["artifacts"], 1)
+        self.assertNotIn("tree", list(cache.stats()["entries"].values())[0])
+
+    def test_off_by_default(self):
+        cache.SETTINGS_FILE.unlink()
+        installer.install_app("cacheapp")
+        self.assertFalse(cache.enabled())
+        self.assertEqual(cache.stats()["artifacts"], 0)
+        self.assertEqual(list(installer.APPS_DIR.glob("cacheapp_temp_*")), [])
+
+        # Nothing kept by the inspector either (void inspect says so)
+        result = inspector.inspect_archive(apps.SUPPORTED_APPS["cacheapp"]["url"])
+        inspector.cleanup_temp(result["temp_dir"])
+        self.assertIsNone(result["kept_tree"])
+        self.assertEqual(cache.stats()["artifacts"], 0)
+
+    def test_prune_drops_least_recently_used(self):
+        for i, size in enumerate((300, 200, 100)):
+            path = self.test_dir / f"a{i}"
+            path.write_bytes(bytes([i]) * size)
+            cache.store(path, f"https://example.invalid/a{i}", {"etag": str(i)})
+            self.assertFalse(path.exists())
+            time.sleep(0.01)
+
+        self.assertEqual(cache.total_size(), 600)
+        self.assertEqual(cache.prune(250), (2, 500))
+        remaining = cache.stats()["entries"]
+        self.assertEqual([e["urls"] for e in remaining.values()], [["https://example.invalid/a2"]])
+        self.assertEqual(cache.prune(0), (1, 100))
+        self.assertFalse(any(p.is_file() for p in (cache.cache_dir() / "objects").rglob("*")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps, planner, hibernate
+from tests.helpers import VoidTestCase, make_tarball, serve
+
+
+class TestHibernate(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        tar_path = make_tarball(self.test_dir / "app.tar.gz", b"#!/bin/sh\necho cold \"$@\"\n",
+                                links=[("App/run-link", "bin/run")])
+        installer.download_file = serve(tar_path)
+        self.add_app("coldapp", name="Cold App")
+        installer.install_app("coldapp")
+
+    def no_download(self, url, target):
+        raise AssertionError("hibernated app was downloaded again")
+
+    def test_hibernate_then_reinstall_thaws(self):
+        self.assertIsNotNone(hibernate.hibernate("coldapp"))
+        self.assertFalse((installer.APPS_DIR / "coldapp").exists())
+        self.assertTrue(hibernate.is_hibernated("coldapp"))
+        self.assertEqual(planner.plan_app("coldapp")[0]["reason"], "hibernated")
+
+        installer.download_file = self.no_download
+        installer.install_app("coldapp")
+        self.assertFalse(hibernate.is_hibernated("coldapp"))
+        self.assertTrue((installer.APPS_DIR / "coldapp" / "App" / "run-link").is_symlink())
+        self.assertTrue((installer.BIN_DIR / "coldapp").is_symlink())
+        self.assertEqual(planner.plan_app("coldapp"), [])
+
+    def test_thaw_restores_links_and_modes_as_packed(self):
+        app_dir = installer.APPS_DIR / "coldapp"
+        # e.g. a deb payload linking to a system path, and a private file
+        os.symlink("/usr/share/doc", app_dir / "App" / "doc")
+        secret = app_dir / "App" / "secret.conf"
+        secret.write_text("token\n")
+        secret.chmod(0o600)
+        (app_dir / "App" / "bin").chmod(0o750)
+
+        hibernate.hibernate("coldapp")
+        hibernate.thaw("coldapp")
+        self.assertEqual(os.readlink(app_dir / "App" / "doc"), "/usr/share/doc")
+        self.assertEqual(secret.stat().st_mode & 0o777, 0o600)
+        self.assertEqual((app_dir / "App" / "bin").stat().st_mode & 0o777, 0o750)
+        self.assertEqual((app_dir / "App" / "bin" / "run").stat().st_mode & 0o777, 0o755)
+
+    def test_launch_through_shim_thaws(self):
+        hibernate.hibernate("coldapp")
+        # The shim runs void.py in a new process, which only knows custom apps from config
+        config = self.home / ".config" / "void"
+        config.mkdir(parents=True, exist_ok=True)
+        (config / "custom_apps.json").write_text(json.dumps({"coldapp": apps.SUPPORTED_APPS["coldapp"]}))
+        env = dict(os.environ, HOME=str(self.home), VOID_ROOT=str(installer.VOID_ROOT))
+        proc = subprocess.run([str(installer.BIN_DIR / "coldapp"), "x"],
+                              capture_output=True, text=True, env=env)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout, "cold x\n")
+        self.assertIn("Thawed coldapp", proc.stderr)
+        self.assertTrue((installer.BIN_DIR / "coldapp").is_symlink())
+        self.assertFalse(hibernate.is_hibernated("coldapp"))
+
+    def test_uninstall_removes_archive(self):
+        hibernate.hibernate("coldapp")
+        installer.uninstall_app("coldapp")
+        self.assertEqual(hibernate.hibernated_apps(), [])
+        self.assertFalse(os.path.lexists(installer.BIN_DIR / "coldapp"))
+
+
+if __name__ == "__main__":
+    unittest.main()
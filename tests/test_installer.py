@@ -68,10 +68,17 @@ class TestInstaller(unittest.TestCase):
         with tarfile.open(path, "w:gz") as tar:
             tar.add(structure_dir, arcname=".")
             
+    def fake_download(self, source):
+        # Stand-in for installer.download_file: copy a local file, no metadata
+        def download(url, target):
+            shutil.copy(source, target)
+            return {}
+        return download
+
     def test_install_tar_flow(self):
         # Mock download
         original_download = installer.download_file
-        installer.download_file = lambda url, target: shutil.copy(self.tar_path, target)
+        installer.download_file = self.fake_download(self.tar_path)
         
         try:
             installer.install_app("testapp")
@@ -91,7 +98,7 @@ class TestInstaller(unittest.TestCase):
     def test_install_appimage_flow(self):
         # Mock download
         original_download = installer.download_file
-        installer.download_file = lambda url, target: shutil.copy(self.appimage_path, target)
+        installer.download_file = self.fake_download(self.appimage_path)
         
         try:
             installer.install_app("testimage")
@@ -112,5 +119,21 @@ class TestInstaller(unittest.TestCase):
         finally:
             installer.download_file = original_download
 
+    def test_install_mistyped_archive(self):
+        # Catalog says zip, the download is really a gzip tarball
+        apps.SUPPORTED_APPS["testapp"]["type"] = "zip"
+        original_download = installer.download_file
+        installer.download_file = self.fake_download(self.tar_path)
+
+        try:
+            installer.install_app("testapp")
+
+            installed_bin = installer.APPS_DIR / "testapp" / "TestApp/bin/run"
+            self.assertTrue(installed_bin.exists())
+            self.assertEqual(installer.get_binary_path("testapp"), installed_bin)
+            self.assertEqual(installer._read_app_meta("testapp")["archive_type"], "tar.gz")
+        finally:
+            installer.download_file = original_download
+
 if __name__ == '__main__':
     unittest.main()
@@ -46,6 +46,9 @@ class TestAppImageInstaller(unittest.TestCase):
             # When looking for app dir
             mock_apps_dir.__truediv__.side_effect = lambda x: mock_install_dir if x == test_app else mock_temp_download
 
+            # The download streams bytes (hashed as they are written)
+            mock_urlopen.return_value.__enter__.return_value.read.return_value = b""
+
             # Scenario: App NOT installed
             mock_install_dir.exists.return_value = False
 
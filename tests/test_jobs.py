@@ -0,0 +1,110 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps, jobs
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestJobQueue(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tar_path = make_tarball(self.test_dir / "app.tar.gz")
+        for name in ("jobapp", "jobslow"):
+            self.add_app(name)
+
+        self.release = threading.Event()
+        # Same stdout routing as the TUI loop
+        self.output = jobs.JobOutput(io.StringIO())
+        self.old_stdout = sys.stdout
+        sys.stdout = self.output
+        self.queue = jobs.JobQueue(workers=1, output=self.output)
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.cancel_all()
+        self.queue.shutdown(timeout=5)
+        sys.stdout = self.old_stdout
+
+    def fake_download(self, url, target):
+        print(f"fetching {url}")
+        Path(target).write_bytes(b"partial")
+        if "slow" in url:
+            # Report progress until released, like a long transfer would
+            while not self.release.wait(0.01):
+                installer.report_progress("downloading", 0.5)
+        shutil.copy(self.tar_path, target)
+        return {}
+
+    def test_install_and_uninstall(self):
+        installer.download_file = self.fake_download
+        job = self.queue.submit("jobapp", "install")
+        self.assertTrue(self.queue.wait(timeout=10))
+        self.assertEqual(job.state, "done", job.error)
+        self.assertTrue((installer.BIN_DIR / "jobapp").is_symlink())
+        # Output of the worker thread lands in the job log
+        self.assertIn("fetching https://example.invalid/jobapp.tar.gz", job.log)
+
+        job = self.queue.submit("jobapp", "uninstall")
+        self.assertTrue(self.queue.wait(timeout=10))
+        self.assertEqual(job.state, "done")
+        self.assertFalse((installer.APPS_DIR / "jobapp").exists())
+
+    def test_cancel_running_and_queued_jobs(self):
+        installer.download_file = self.fake_download
+        slow = self.queue.submit("jobslow", "install")
+        queued = self.queue.submit("jobapp", "install")
+        # Resubmitting an active app returns the same job
+        self.assertIs(self.queue.submit("jobslow", "install"), slow)
+
+        self.assertTrue(self.queue.cancel("jobapp"))
+        self.assertEqual(queued.state, "cancelled")
+
+        for _ in range(500):
+            if slow.progress == 0.5:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(slow.describe(), "downloading 50%")
+
+        self.queue.cancel("jobslow")
+        self.assertTrue(self.queue.wait(timeout=10))
+        self.assertEqual(slow.state, "cancelled")
+        # Partial download and app dir are cleaned up
+        self.assertEqual(list(installer.APPS_DIR.glob("jobslow*")), [])
+        self.assertFalse((installer.BIN_DIR / "jobapp").exists())
+
+    def test_cancel_during_post_install_removes_links(self):
+        installer.download_file = self.fake_download
+        apps.SUPPORTED_APPS["jobapp"]["post_install"] = ["true"]
+        link = installer.BIN_DIR / "jobapp"
+        desktop = installer.DESKTOP_DIR / "void_jobapp.desktop"
+        real_link_app = installer.link_app
+        linked = []
+
+        def link_then_cancel(*args, **kwargs):
+            binary_path = real_link_app(*args, **kwargs)
+            linked.append(link.is_symlink() and desktop.exists())
+            self.queue.cancel("jobapp")
+            return binary_path
+        installer.link_app = link_then_cancel
+        try:
+            job = self.queue.submit("jobapp", "install")
+            self.assertTrue(self.queue.wait(timeout=10))
+        finally:
+            installer.link_app = real_link_app
+        self.assertEqual(linked, [True])
+        self.assertEqual(job.state, "cancelled")
+        self.assertFalse(os.path.lexists(link))
+        self.assertFalse(desktop.exists())
+        self.assertFalse((installer.APPS_DIR / "jobapp").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
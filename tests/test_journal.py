@@ -0,0 +1,74 @@
+import unittest
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps, batch, journal
+from tests.helpers import VoidTestCase, make_tarball, serve
+
+
+class TestJournalResume(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tar_path = make_tarball(self.test_dir / "app.tar.gz")
+        self.app_names = ["journal1", "journal2"]
+        for name in self.app_names:
+            self.add_app(name)
+        # journal2 points at a binary that is not in the archive
+        apps.SUPPORTED_APPS["journal2"]["bin_path"] = "App/bin/missing"
+
+    def test_resume_continues_from_last_phase(self):
+        downloads = []
+
+        def download(url, target):
+            downloads.append(url)
+            shutil.copy(self.tar_path, target)
+            return {"etag": "abc"}
+
+        installer.download_file = download
+        op = journal.Journal.start("install-all", self.app_names, {"jobs": 2})
+        results = batch.install_many(self.app_names, jobs=2, journal=op)
+        self.assertEqual([r["status"] for r in results], ["installed", "failed"])
+
+        # State is rebuilt from the file
+        last = journal.Journal.load_last()
+        self.assertEqual(last.op_id, op.op_id)
+        self.assertTrue(last.is_done("journal1"))
+        self.assertTrue(last.has("journal2", "extracted"))
+        self.assertFalse(last.has("journal2", "linked"))
+        self.assertIn("journal2", last.failures)
+        self.assertEqual(last.pending_apps(), ["journal2"])
+
+        # Fix the catalog; resuming must neither download nor extract again
+        apps.SUPPORTED_APPS["journal2"]["bin_path"] = "App/bin/run"
+        installer.download_file = None
+        installer.extract_app = None
+        shutil.rmtree(installer.APPS_DIR / "journal1")  # finished apps are not even checked
+
+        results = batch.install_many(last.apps, jobs=2, journal=last)
+        self.assertEqual([r["status"] for r in results], ["skipped", "installed"])
+        self.assertEqual(len(downloads), 2)
+        self.assertTrue((installer.BIN_DIR / "journal2").is_symlink())
+        self.assertEqual(journal.Journal.load_last().pending_apps(), [])
+
+    def test_resume_redownloads_missing_artifacts(self):
+        op = journal.Journal.start("import", ["journal1"])
+        op.record("journal1", "downloaded", path=str(self.test_dir / "gone.tar.gz"), dl_meta={})
+
+        installer.download_file = serve(self.tar_path)
+        last = journal.Journal.load_last()
+        results = batch.install_many(["journal1"], journal=last)
+        self.assertEqual(results[0]["status"], "installed")
+
+    def test_torn_line_is_ignored(self):
+        op = journal.Journal.start("import", ["journal1"])
+        with open(journal.journal_path(), "a") as f:
+            f.write('{"event": "phase", "op": "')
+        self.assertEqual(journal.Journal.load_last().op_id, op.op_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps, planner, lazy, usage
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestLazyInstall(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        tar_path = make_tarball(self.test_dir / "app.tar.gz", b"#!/bin/sh\necho lazy \"$@\"\n")
+        # Real downloads (file://), so the shim's own process can install too
+        self.add_app("lazyapp", name="Lazy App", url=tar_path.as_uri())
+
+    def test_placeholder_installs_on_first_launch(self):
+        self.assertTrue(lazy.place("lazyapp"))
+        link = installer.BIN_DIR / "lazyapp"
+        self.assertEqual(usage.read_shim(link), ("lazy", "lazyapp", str(link)))
+        self.assertEqual(planner.plan_app("lazyapp")[0]["reason"], "installs on first launch")
+        self.assertFalse(installer.APPS_DIR.exists())
+
+        # The shim runs void.py in a new process, which only knows custom apps from config
+        config = self.home / ".config" / "void"
+        config.mkdir(parents=True, exist_ok=True)
+        (config / "custom_apps.json").write_text(json.dumps({"lazyapp": apps.SUPPORTED_APPS["lazyapp"]}))
+        env = dict(os.environ, HOME=str(self.home), VOID_ROOT=str(installer.VOID_ROOT))
+        proc = subprocess.run([str(link), "a b", "c"], capture_output=True, text=True, env=env)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout, "lazy a b c\n")
+        self.assertIn("installing it now", proc.stderr)
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(planner.plan_app("lazyapp"), [])
+
+        # Already installed: nothing to place
+        self.assertFalse(lazy.place("lazyapp"))
+
+    def test_keeps_foreign_commands_and_removes_placeholders(self):
+        installer.BIN_DIR.mkdir(parents=True)
+        own = installer.BIN_DIR / "lazyapp"
+        own.write_text("#!/bin/sh\necho mine\n")
+        self.assertFalse(lazy.place("lazyapp"))
+        self.assertEqual(own.read_text(), "#!/bin/sh\necho mine\n")
+
+        own.unlink()
+        self.assertTrue(lazy.place("lazyapp"))
+        self.assertEqual(lazy.placeholders(), ["lazyapp"])
+        self.assertTrue(lazy.remove("lazyapp"))
+        self.assertFalse(os.path.lexists(own))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import hashlib
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps, batch, lockfile
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestLockfile(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        # Served over file:// so the real download_file (and its hashing) runs
+        self.artifact = make_tarball(self.test_dir / "lockapp-1.tar.gz", b"#!/bin/sh\necho 1\n")
+        self.sha256 = hashlib.sha256(self.artifact.read_bytes()).hexdigest()
+        self.add_app("lockapp", name="Lock App", url=self.artifact.as_uri())
+
+    def export_and_uninstall(self):
+        installer.install_app("lockapp")
+        lock, unverified = lockfile.build(["lockapp"])
+        installer.uninstall_app("lockapp")
+        # The catalog moves on; the lockfile must not
+        apps.SUPPORTED_APPS["lockapp"]["url"] = "https://example.invalid/lockapp-2.tar.gz"
+        return lock, unverified
+
+    def test_export_records_hash_and_import_fetches_locked_artifact(self):
+        lock, unverified = self.export_and_uninstall()
+        entry = lock["artifacts"]["lockapp"]
+        self.assertEqual(unverified, [])
+        self.assertEqual(entry["sha256"], self.sha256)
+        self.assertEqual(entry["size"], self.artifact.stat().st_size)
+        self.assertEqual(entry["url"], self.artifact.as_uri())
+
+        results = batch.install_many(lock["apps"], app_infos=lockfile.app_infos(lock))
+        self.assertEqual(results[0]["status"], "installed", results[0]["error"])
+        meta = installer._read_app_meta("lockapp")
+        self.assertEqual(meta["sha256"], self.sha256)
+        self.assertTrue(meta["locked"])
+        self.assertTrue(lockfile.matches_install("lockapp", lockfile.app_infos(lock)["lockapp"]))
+
+        # Already the locked artifact: nothing is downloaded again
+        results = batch.install_many(lock["apps"], app_infos=lockfile.app_infos(lock))
+        self.assertEqual(results[0]["status"], "ready")
+
+    def test_hash_mismatch_fails_without_leftovers(self):
+        lock, _ = self.export_and_uninstall()
+        lock["artifacts"]["lockapp"]["sha256"] = "0" * 64
+
+        results = batch.install_many(lock["apps"], app_infos=lockfile.app_infos(lock))
+        self.assertEqual(results[0]["status"], "failed")
+        self.assertIn("Checksum mismatch", results[0]["error"])
+        self.assertFalse((installer.APPS_DIR / "lockapp").exists())
+        self.assertEqual(list(installer.APPS_DIR.glob("lockapp_temp_*")), [])
+
+    def test_expired_resolved_url_falls_back_to_source_url(self):
+        lock, _ = self.export_and_uninstall()
+        entry = lock["artifacts"]["lockapp"]
+        self.assertEqual(entry["source_url"], self.artifact.as_uri())
+        # e.g. a signed GitHub release-asset URL that has expired
+        entry["url"] = (self.test_dir / "expired-asset").as_uri()
+
+        results = batch.install_many(lock["apps"], app_infos=lockfile.app_infos(lock))
+        self.assertEqual(results[0]["status"], "installed", results[0]["error"])
+        meta = installer._read_app_meta("lockapp")
+        self.assertEqual(meta["sha256"], self.sha256)
+        self.assertEqual(meta["source_url"], self.artifact.as_uri())
+
+    def test_matching_local_artifact_is_reused(self):
+        lock, _ = self.export_and_uninstall()
+        shutil.copy(self.artifact, installer.APPS_DIR / f"lockapp_temp_{self.artifact.name}")
+
+        def no_download(url, target, sha256=None):
+            raise AssertionError("locked artifact was downloaded again")
+        installer.download_file = no_download
+
+        results = batch.install_many(lock["apps"], app_infos=lockfile.app_infos(lock))
+        self.assertEqual(results[0]["status"], "installed", results[0]["error"])
+        self.assertEqual(installer._read_app_meta("lockapp")["sha256"], self.sha256)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, locks
+
+ROOT = Path(__file__).parent.parent
+
+# Holds the app lock in a separate process until stdin is closed
+HOLDER = """
+import sys
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from modules import installer, locks
+installer.VOID_ROOT = Path({void_root!r})
+with locks.app_lock("lockapp"):
+    print("held", flush=True)
+    sys.stdin.read()
+"""
+
+
+class TestLocks(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.saved_root = installer.VOID_ROOT
+        installer.VOID_ROOT = self.test_dir / "goinfre_void"
+
+    def tearDown(self):
+        installer.VOID_ROOT = self.saved_root
+        shutil.rmtree(self.test_dir)
+
+    def hold_in_other_process(self):
+        proc = subprocess.Popen(
+            [sys.executable, "-c", HOLDER.format(root=str(ROOT), void_root=str(installer.VOID_ROOT))],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        self.assertEqual(proc.stdout.readline().strip(), "held")
+        return proc
+
+    def test_reentrant_in_same_thread(self):
+        with locks.app_lock("lockapp"):
+            with locks.app_lock("lockapp", wait=False):
+                pass
+            # Still held after the inner block
+            self.assertIsNotNone(locks._get("app-lockapp").fd)
+        self.assertIsNone(locks._get("app-lockapp").fd)
+
+    def test_busy_app_fails_fast_without_wait(self):
+        proc = self.hold_in_other_process()
+        try:
+            with self.assertRaises(locks.LockBusy) as ctx:
+                with locks.app_lock("lockapp", wait=False):
+                    pass
+            self.assertIn(str(proc.pid), str(ctx.exception))
+
+            # Other apps are not blocked
+            with locks.app_lock("otherapp", wait=False):
+                pass
+        finally:
+            proc.stdin.close()
+            proc.wait()
+
+        # Released when the holder exits
+        with locks.app_lock("lockapp", wait=False):
+            pass
+
+    def test_waiting_thread_gets_lock_after_release(self):
+        order = []
+        started = threading.Event()
+
+        def worker():
+            started.wait()
+            with locks.app_lock("lockapp", timeout=5):
+                order.append("worker")
+
+        t = threading.Thread(target=worker)
+        with locks.app_lock("lockapp"):
+            t.start()
+            started.set()
+            t.join(0.2)
+            order.append("main")
+        t.join(5)
+        self.assertEqual(order, ["main", "worker"])
+
+    def test_threads_queue_even_without_wait(self):
+        # --no-wait only concerns other processes: parallel jobs must not fail
+        errors = []
+
+        def worker():
+            try:
+                with locks.shared_lock("bin", wait=False, timeout=1):
+                    pass
+            except Exception as e:
+                errors.append(e)
+
+        with locks.shared_lock("bin", wait=False):
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join(0.2)
+            self.assertTrue(t.is_alive())
+        t.join(5)
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
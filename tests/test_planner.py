@@ -0,0 +1,61 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, planner
+from tests.helpers import VoidTestCase, make_tarball, serve
+
+
+class TestPlanner(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        installer.download_file = serve(make_tarball(self.test_dir / "app.tar.gz"))
+        self.add_app("planapp", name="Plan App", data_paths=[".planapp"])
+
+    def test_plan_reports_only_the_delta(self):
+        self.assertEqual([a["action"] for a in planner.plan_app("planapp")], ["install"])
+
+        installer.install_app("planapp")
+        self.assertEqual(planner.plan_app("planapp"), [])
+
+        (installer.BIN_DIR / "planapp").unlink()
+        (installer.DESKTOP_DIR / "void_planapp.desktop").unlink()
+        (self.home / ".planapp").unlink()
+        (self.home / ".planapp").symlink_to("/old/post/path")
+
+        actions = planner.plan_app("planapp")
+        self.assertEqual([a["action"] for a in actions], ["link-bin", "desktop", "link-data"])
+        self.assertEqual(planner.apply_fixups(actions), [])
+        self.assertEqual(planner.plan_app("planapp"), [])
+
+    def test_provisioned_app_is_not_rewritten(self):
+        installer.install_app("planapp")
+        desktop = installer.DESKTOP_DIR / "void_planapp.desktop"
+        before = desktop.stat().st_mtime_ns
+
+        with patch('modules.installer.find_icon') as find_icon, \
+             patch('modules.installer.create_symlink') as create_symlink:
+            installer.install_app("planapp")
+            find_icon.assert_not_called()
+            create_symlink.assert_not_called()
+        self.assertEqual(desktop.stat().st_mtime_ns, before)
+
+    def test_data_link_through_another_path_is_accepted(self):
+        installer.install_app("planapp")
+        # Same target spelled differently (e.g. goinfre reached via a symlink)
+        alias = self.test_dir / "alias"
+        alias.symlink_to(installer.VOID_ROOT)
+        target = installer.data_link_target("planapp", ".planapp")
+        (self.home / ".planapp").unlink()
+        (self.home / ".planapp").symlink_to(alias / target.relative_to(installer.VOID_ROOT))
+
+        # link_data_dirs would leave it alone, so the plan must not flag it
+        self.assertEqual(planner.plan_app("planapp"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,91 +2,159 @@
 """
 Test post-install script functionality
 """
+import io
+import shutil
+import tempfile
+import time
 import unittest
-from unittest.mock import patch, MagicMock
+from contextlib import redirect_stdout
+from unittest.mock import patch
 from pathlib import Path
 import sys
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from modules import installer, postinstall
 from modules.installer import run_post_install_scripts
 
 
+def run_quiet(func, *args):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        result = func(*args)
+    return result, out.getvalue()
+
+
 class TestPostInstallScripts(unittest.TestCase):
-    
-    @patch('modules.installer.subprocess.run')
+
+    def setUp(self):
+        # Step results are cached under DATA_DIR
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.original_data_dir = installer.DATA_DIR
+        installer.DATA_DIR = self.test_dir / "data"
+
+    def tearDown(self):
+        installer.DATA_DIR = self.original_data_dir
+        shutil.rmtree(self.test_dir)
+
     @patch('modules.installer.apps.SUPPORTED_APPS', {
         'test-app': {
             'link_name': 'testapp'
         }
     })
-    def test_placeholder_replacement(self, mock_run):
+    def test_placeholder_replacement(self):
         """Test that placeholders are correctly replaced"""
-        mock_run.return_value = MagicMock(returncode=0, stdout='', stderr='')
-        
         binary_path = Path('/goinfre/user/void/apps/test-app/bin/app')
         scripts = [
-            "{bin} --version",
-            "{link} --help"
+            "echo {bin} --version",
+            "echo {link} --help"
         ]
-        
-        run_post_install_scripts('test-app', scripts, binary_path)
-        
-        # Check that subprocess.run was called with replaced placeholders
-        calls = mock_run.call_args_list
-        self.assertEqual(len(calls), 2)
-        
-        # First call should have {bin} replaced
-        self.assertIn('/goinfre/user/void/apps/test-app/bin/app --version', 
-                     calls[0][0][0])
-        
-        # Second call should have {link} replaced
-        self.assertIn('testapp --help', calls[1][0][0])
-    
-    @patch('modules.installer.subprocess.run')
+
+        results, output = run_quiet(run_post_install_scripts, 'test-app', scripts, binary_path)
+
+        self.assertEqual([r["status"] for r in results], ["ok", "ok"])
+        # Output is streamed with the step id
+        self.assertIn('[step1] /goinfre/user/void/apps/test-app/bin/app --version', output)
+        self.assertIn('testapp --help', results[1]["run"])
+
     @patch('modules.installer.apps.SUPPORTED_APPS', {
         'test-app': {
             'link_name': 'testapp'
         }
     })
-    def test_script_execution_success(self, mock_run):
-        """Test successful script execution"""
-        mock_run.return_value = MagicMock(
-            returncode=0, 
-            stdout='Success output', 
-            stderr=''
-        )
-        
-        binary_path = Path('/test/path')
-        scripts = ["echo 'test'"]
-        
-        # Should not raise any exceptions
-        run_post_install_scripts('test-app', scripts, binary_path)
-        
-        mock_run.assert_called_once()
-    
-    @patch('modules.installer.subprocess.run')
+    def test_script_execution_failure(self):
+        """Test that script failures are handled gracefully"""
+        # Legacy string steps run in order, but a failure does not stop the next one
+        results, output = run_quiet(run_post_install_scripts, 'test-app', ["false", "echo later"], Path('/test/path'))
+
+        self.assertEqual([r["status"] for r in results], ["failed", "ok"])
+        self.assertIn("[step2] later", output)
+        self.assertEqual(results[0]["returncode"], 1)
+        self.assertIn("Failed (exit code 1", output)
+
     @patch('modules.installer.apps.SUPPORTED_APPS', {
         'test-app': {
             'link_name': 'testapp'
         }
     })
-    def test_script_execution_failure(self, mock_run):
-        """Test that script failures are handled gracefully"""
-        mock_run.return_value = MagicMock(
-            returncode=1, 
-            stdout='', 
-            stderr='Error message'
-        )
-        
-        binary_path = Path('/test/path')
-        scripts = ["false"]
-        
-        # Should not raise exceptions, just print error
-        run_post_install_scripts('test-app', scripts, binary_path)
-        
-        mock_run.assert_called_once()
+    def test_successful_steps_are_cached(self):
+        """Unchanged steps are skipped on the next run, failed ones retried"""
+        binary_path = self.test_dir / "app"
+        binary_path.write_text("v1")
+        counter = self.test_dir / "count"
+        scripts = [
+            {"id": "a", "run": f"echo x >> {counter}"},
+            {"id": "b", "run": "false"},
+        ]
+
+        run_quiet(run_post_install_scripts, 'test-app', scripts, binary_path)
+        results, _ = run_quiet(run_post_install_scripts, 'test-app', scripts, binary_path)
+        self.assertEqual([r["status"] for r in results], ["cached", "failed"])
+        self.assertEqual(counter.read_text(), "x\n")
+
+        # A different binary invalidates the fingerprint
+        binary_path.write_text("version 2")
+        results, _ = run_quiet(run_post_install_scripts, 'test-app', scripts, binary_path)
+        self.assertEqual(results[0]["status"], "ok")
+
+        # rerun forces execution
+        results, _ = run_quiet(run_post_install_scripts, 'test-app', scripts, binary_path, True)
+        self.assertEqual(results[0]["status"], "ok")
+        self.assertEqual(counter.read_text(), "x\nx\nx\n")
+
+    def test_failure_only_skips_dependents(self):
+        steps = postinstall.normalize_steps([
+            {"id": "a", "run": "exit 3"},
+            {"id": "b", "run": "true", "after": "a"},
+            {"id": "c", "run": "true"},
+        ])
+        results, _ = run_quiet(postinstall.run_steps, steps, {})
+        self.assertEqual([r["status"] for r in results], ["failed", "skipped", "ok"])
+
+    def test_follows_waits_for_a_step_even_if_it_fails(self):
+        steps = postinstall.normalize_steps([
+            {"id": "a", "run": "sleep 0.2; exit 1"},
+            {"id": "b", "run": "true", "follows": "a"},
+        ])
+        results, output = run_quiet(postinstall.run_steps, steps, {})
+        self.assertEqual([r["status"] for r in results], ["failed", "ok"])
+        self.assertLess(output.index("[a] ✗"), output.index("[b] Executing"))
+
+    def test_independent_steps_run_in_parallel(self):
+        steps = postinstall.normalize_steps([
+            {"id": "a", "run": "sleep 0.4"},
+            {"id": "b", "run": "sleep 0.4"},
+        ])
+        start = time.monotonic()
+        run_quiet(postinstall.run_steps, steps, {})
+        self.assertLess(time.monotonic() - start, 0.75)
+
+    def test_group_serializes_steps(self):
+        steps = postinstall.normalize_steps([
+            {"id": "a", "run": "sleep 0.3", "group": "cli"},
+            {"id": "b", "run": "sleep 0.3", "group": "cli"},
+        ])
+        start = time.monotonic()
+        results, _ = run_quiet(postinstall.run_steps, steps, {})
+        self.assertGreaterEqual(time.monotonic() - start, 0.6)
+        self.assertTrue(all(r["duration"] >= 0.3 for r in results))
+
+    def test_step_timeout(self):
+        steps = postinstall.normalize_steps([{"id": "slow", "run": "sleep 5", "timeout": 0.2}])
+        start = time.monotonic()
+        results, _ = run_quiet(postinstall.run_steps, steps, {})
+        self.assertEqual(results[0]["status"], "timeout")
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_invalid_dependencies(self):
+        with self.assertRaises(Exception):
+            postinstall.normalize_steps([{"id": "a", "run": "true", "after": "missing"}])
+        with self.assertRaises(Exception):
+            postinstall.normalize_steps([
+                {"id": "a", "run": "true", "after": "b"},
+                {"id": "b", "run": "true", "after": "a"},
+            ])
 
 
 if __name__ == '__main__':
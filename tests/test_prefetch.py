@@ -0,0 +1,88 @@
+import unittest
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, prefetch, usage
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestPrefetch(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        installer.fetch_url_metadata = lambda url: {"url": url, "content_length": "1024"}
+        space_patch = patch.object(usage, "free_bytes", return_value=100 * 1024 ** 3)
+        space_patch.start()
+        self.addCleanup(space_patch.stop)
+        for name in ("fetchapp", "otherapp"):
+            self.add_app(name)
+
+    def tearDown(self):
+        prefetch.cancel_all()
+
+    def fake_download(self, url, target):
+        make_tarball(target, b"#!/bin/sh\necho prefetched\n")
+        return {"resolved_url": url, "etag": "v1"}
+
+    def blocking_download(self, started, release):
+        def download(url, target):
+            Path(target).write_bytes(b"partial")
+            started.set()
+            while not release.wait(0.01):
+                installer.report_progress("downloading", 0.5)
+            return self.fake_download(url, target)
+        return download
+
+    def no_download(self, url, target):
+        raise AssertionError("prefetched app was downloaded again")
+
+    def test_install_uses_prefetched_artifact(self):
+        installer.download_file = self.fake_download
+        entry = prefetch.start("fetchapp")
+        self.assertTrue(entry.done.wait(10))
+        self.assertEqual(entry.state, "ready")
+        self.assertTrue(entry.path.exists())
+
+        installer.download_file = self.no_download
+        installer.install_app("fetchapp")
+        self.assertIn("prefetched", (installer.BIN_DIR / "fetchapp").read_text())
+        self.assertEqual(installer._read_app_meta("fetchapp")["etag"], "v1")
+        self.assertFalse(entry.path.exists())
+        self.assertIsNone(prefetch.get("fetchapp"))
+
+    def test_cancel_and_concurrency_cap(self):
+        prefetch.save_settings(max_concurrent=1)
+        started, release = threading.Event(), threading.Event()
+        installer.download_file = self.blocking_download(started, release)
+
+        first = prefetch.start("fetchapp")
+        self.assertTrue(started.wait(10))
+        second = prefetch.start("otherapp")
+        self.assertFalse(second.done.wait(0.3))
+        self.assertEqual(second.state, "waiting")
+
+        # Deselecting stops the download and frees the slot
+        self.assertTrue(prefetch.cancel("fetchapp"))
+        self.assertTrue(first.done.wait(10))
+        self.assertEqual(first.state, "cancelled")
+        self.assertFalse(first.path.exists())
+        release.set()
+        self.assertTrue(second.done.wait(10))
+        self.assertEqual(second.state, "ready")
+
+    def test_skips_artifact_that_would_not_fit(self):
+        installer.download_file = self.no_download
+        installer.fetch_url_metadata = lambda url: {"url": url, "content_length": str(4 * 1024 ** 3)}
+        with patch.object(usage, "free_bytes", return_value=8 * 1024 ** 3):
+            entry = prefetch.start("fetchapp")
+            self.assertTrue(entry.done.wait(10))
+        self.assertEqual(entry.state, "skipped")
+        self.assertFalse(prefetch.staging_dir().exists() and any(prefetch.staging_dir().iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, restore, background
+from tests.helpers import VoidTestCase
+
+
+class TestRestore(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        installer.BIN_DIR.mkdir()
+        for name in ("restore_a", "restore_b", "restore_c"):
+            self.add_app(name, bin_path="bin/run", link_name=f"{name}-cli")
+
+    def test_wanted_apps_include_dangling_links(self):
+        # Link left over from a previous post
+        (installer.BIN_DIR / "restore_c-cli").symlink_to("/goinfre/old/void/apps/restore_c/bin/run")
+        self.assertTrue(restore.goinfre_wiped())
+        wanted = restore.wanted_apps(["restore_a", "not-an-app", "restore_c"])
+        self.assertEqual(wanted, ["restore_a", "restore_c"])
+
+    def test_prioritize_by_history_then_size(self):
+        (self.home / ".zsh_history").write_text(
+            ": 1700000000:0;restore_b-cli --version\n"
+            ": 1700000001:0;cd src && restore_a-cli .\n"
+            ": 1700000002:0;ls\n"
+        )
+        sizes = {"restore_a": 500, "restore_b": 10, "restore_c": 20}
+        order = restore.prioritize(["restore_c", "restore_b", "restore_a"], sizes=sizes)
+        # Most recently used first, unused last
+        self.assertEqual(order, ["restore_a", "restore_b", "restore_c"])
+
+        # Without history, the smallest download comes first
+        (self.home / ".zsh_history").unlink()
+        order = restore.prioritize(["restore_a", "restore_b", "restore_c"], sizes=sizes)
+        self.assertEqual(order, ["restore_b", "restore_c", "restore_a"])
+
+    def test_status_file_round_trip(self):
+        path = restore.status_path()
+        background.write_status(path, {"state": "running", "done": {"restore_a": "installed"}})
+        self.assertEqual(background.read_status(path)["done"], {"restore_a": "installed"})
+        self.assertEqual([p.name for p in path.parent.iterdir()], [path.name])
+
+
+if __name__ == "__main__":
+    unittest.main()
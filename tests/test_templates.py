@@ -0,0 +1,63 @@
+import unittest
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, templates
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestTemplates(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        tar_path = make_tarball(self.test_dir / "app.tar.gz", b"#!/bin/sh\necho tpl\n",
+                                files=[("App/settings.conf", b"theme=dark\n", 0o644)])
+        installer.download_file = lambda url, target: shutil.copy(tar_path, target) and {
+            "resolved_url": url, "etag": "v1"}
+        self.add_app("tplapp", name="Template App")
+        templates.set_enabled(True)
+        installer.install_app("tplapp")
+        installer.download_file = self.no_download
+
+    def no_download(self, url, target):
+        raise AssertionError("app was downloaded again instead of cloned from its template")
+
+    def test_install_keeps_read_only_template(self):
+        found = templates.list_templates("tplapp")
+        self.assertEqual(len(found), 1)
+        template = found[0][1]
+        self.assertEqual((template / "App" / "settings.conf").stat().st_mode & 0o222, 0)
+        # Captured by copy: the live install keeps its own, writable files
+        live = installer.APPS_DIR / "tplapp" / "App" / "bin" / "run"
+        self.assertTrue(os.access(live, os.W_OK))
+        self.assertNotEqual(live.stat().st_ino, (template / "App" / "bin" / "run").stat().st_ino)
+        self.assertEqual(templates.find_template("tplapp"), template)
+
+    def test_broken_install_is_restored_from_template(self):
+        app_dir = installer.APPS_DIR / "tplapp"
+        (app_dir / "App" / "bin" / "run").unlink()
+        (app_dir / "App" / "settings.conf").write_text("corrupted")
+
+        installer.install_app("tplapp")
+        self.assertEqual((app_dir / "App" / "settings.conf").read_text(), "theme=dark\n")
+        self.assertTrue(os.access(app_dir / "App" / "bin" / "run", os.X_OK))
+        # The working tree is writable again; the template is not touched by edits
+        (app_dir / "App" / "settings.conf").write_text("theme=light\n")
+        template = templates.find_template("tplapp")
+        self.assertEqual((template / "App" / "settings.conf").read_text(), "theme=dark\n")
+        self.assertEqual(installer._read_app_meta("tplapp")["restored_from_template"], template.name)
+
+    def test_force_reinstall_and_uninstall(self):
+        installer.install_app("tplapp", force=True)
+        self.assertTrue(installer.check_app_health("tplapp")["ok"])
+
+        installer.uninstall_app("tplapp")
+        self.assertFalse(templates.templates_dir("tplapp").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
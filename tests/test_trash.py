@@ -0,0 +1,74 @@
+import unittest
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, trash
+from tests.helpers import VoidTestCase, make_tarball, serve
+
+
+class TestTrash(VoidTestCase):
+    def make_tree(self, root, dirs=6, files=20):
+        for d in range(dirs):
+            sub = root / f"d{d}" / "nested"
+            sub.mkdir(parents=True)
+            for f in range(files):
+                (sub / f"f{f}").write_text("x")
+            (root / f"d{d}" / "link").symlink_to("nested")
+        return root
+
+    def test_discard_renames_then_empty_deletes_in_parallel(self):
+        tree = self.make_tree(installer.APPS_DIR / "bigapp")
+        trash.discard(tree)
+        self.assertFalse(tree.exists())
+        self.assertEqual(len(trash.entries()), 1)
+        self.assertGreater(trash.size(), 0)
+
+        self.assertEqual(trash.empty(workers=4), 1)
+        self.assertEqual(trash.entries(), [])
+        self.assertTrue(trash.trash_dir().exists())
+
+    def test_undeletable_entry_does_not_stall_empty_or_reap(self):
+        trash.discard(self.make_tree(installer.APPS_DIR / "stuckapp", dirs=2, files=2))
+        trash.discard(self.make_tree(installer.APPS_DIR / "okapp", dirs=1, files=1))
+        stuck = next(e for e in trash.entries() if e.name.startswith("stuckapp"))
+        real_delete, real_units = trash._delete, trash._work_units
+
+        # e.g. EBUSY or a directory without write permission (root ignores modes)
+        def delete(path):
+            if not path.startswith(str(stuck)):
+                real_delete(path)
+
+        def work_units(path, want):
+            return ([path], []) if path == str(stuck) else real_units(path, want)
+        with patch.object(trash, "_delete", side_effect=delete), \
+                patch.object(trash, "_work_units", side_effect=work_units), \
+                redirect_stdout(io.StringIO()) as out:
+            self.assertEqual(trash.empty(workers=2), 1)
+            trash.reap(str(trash.trash_dir()))
+        self.assertEqual(trash.entries(), [stuck])
+        self.assertIn("could not delete 1 trash item", out.getvalue())
+
+    def test_uninstall_leaves_tree_to_detached_reaper(self):
+        installer.download_file = serve(make_tarball(self.test_dir / "app.tar.gz",
+                                                     b"#!/bin/sh\necho trash\n"))
+        self.add_app("trashapp", name="Trash App")
+        installer.install_app("trashapp")
+        installer.uninstall_app("trashapp")
+        self.assertFalse((installer.APPS_DIR / "trashapp").exists())
+        self.assertEqual(len(trash.entries()), 1)
+
+        with patch.dict(os.environ, HOME=str(self.home)):
+            reaper = trash.spawn_reaper()
+        self.assertEqual(reaper.wait(timeout=30), 0)
+        self.assertEqual(trash.entries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, planner, usage
+from tests.helpers import VoidTestCase, make_tarball, serve
+
+
+class TestUsage(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        installer.download_file = serve(make_tarball(self.test_dir / "app.tar.gz",
+                                                     b"#!/bin/sh\necho ran \"$@\"\n"))
+        for name in ("useapp", "idleapp"):
+            self.add_app(name, data_paths=[f".{name}"])
+
+    def test_shim_counts_launches_and_keeps_plan_clean(self):
+        usage.save_settings(enabled=True)
+        installer.install_app("useapp")
+        link = installer.BIN_DIR / "useapp"
+        self.assertTrue(usage.is_shim(link))
+        self.assertEqual(planner.plan_app("useapp"), [])
+        self.assertTrue(installer.check_app_health("useapp")["symlink_ok"])
+
+        for _ in range(2):
+            out = subprocess.run([str(link), "a b"], capture_output=True, text=True).stdout
+            self.assertEqual(out, "ran a b\n")
+        self.assertEqual(usage.stats(["useapp"])["useapp"]["launches"], 2)
+
+        # Turning tracking off asks for a plain symlink again
+        usage.save_settings(enabled=False)
+        self.assertEqual([a["action"] for a in planner.plan_app("useapp")], ["link-bin"])
+        planner.apply_fixups(planner.plan_app("useapp"))
+        self.assertTrue(link.is_symlink())
+
+    def test_evict_least_recently_used_keeps_data(self):
+        usage.save_settings(enabled=True)
+        installer.install_app("useapp")
+        installer.install_app("idleapp")
+        usage.USAGE_DIR.mkdir(parents=True, exist_ok=True)
+        usage.usage_file("useapp").write_text(".")
+        usage.usage_file("idleapp").write_text(".")
+        os.utime(usage.usage_file("idleapp"), (1, 1))
+
+        self.assertEqual(usage.lru_candidates(), ["idleapp", "useapp"])
+        # Cannot reach this much free space, but apps used recently are spared
+        self.assertEqual(usage.ensure_free_space(1 << 60, dry_run=True), ["idleapp"])
+
+        self.assertIsNotNone(usage.evict("idleapp"))
+        self.assertFalse((installer.APPS_DIR / "idleapp").exists())
+        self.assertFalse(os.path.lexists(installer.BIN_DIR / "idleapp"))
+        self.assertTrue((installer.DATA_DIR / "idleapp").exists())
+        self.assertEqual(usage.evicted()["idleapp"]["launches"], 1)
+
+        installer.install_app("idleapp")
+        self.assertEqual(usage.evicted(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import unittest
+import os
+import sys
+from pathlib import Path
+
+# Add parent dir to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import installer, apps
+from tests.helpers import VoidTestCase, make_tarball
+
+
+class TestVersionedUpdates(VoidTestCase):
+    def setUp(self):
+        super().setUp()
+        installer.fetch_url_metadata = lambda url: {"url": url, "resolved_url": url}
+        self.release = "1"
+        installer.download_file = self.fake_download
+        self.add_app("verapp", name="Version App")
+
+    def fake_download(self, url, target):
+        make_tarball(target, f"#!/bin/sh\necho {self.release}\n".encode())
+        return {"resolved_url": url, "etag": f"release-{self.release}"}
+
+    def link_output(self):
+        return (installer.BIN_DIR / "verapp").read_text()
+
+    def test_update_switches_version_and_rolls_back(self):
+        installer.install_app("verapp")
+        self.assertFalse((installer.APPS_DIR / "verapp").is_symlink())
+
+        self.release = "2"
+        installer.update_app("verapp")
+        self.assertTrue((installer.APPS_DIR / "verapp").is_symlink())
+        self.assertIn("echo 2", self.link_output())
+        versions = installer.list_versions("verapp")
+        self.assertEqual([v["active"] for v in versions], [False, True])
+        self.assertEqual(installer._read_app_meta("verapp")["etag"], "release-2")
+
+        installer.rollback_app("verapp")
+        self.assertIn("echo 1", self.link_output())
+        self.assertEqual(installer._read_app_meta("verapp")["etag"], "release-1")
+
+        # Nothing older than the first version
+        with self.assertRaises(Exception):
+            installer.rollback_app("verapp")
+
+    def test_failed_update_leaves_active_version(self):
+        installer.install_app("verapp")
+
+        def broken_download(url, target):
+            Path(target).write_bytes(b"not an archive")
+            return {}
+        installer.download_file = broken_download
+
+        with self.assertRaises(Exception):
+            installer.update_app("verapp")
+        self.assertIn("echo 1", self.link_output())
+        self.assertEqual(installer.list_versions("verapp"), [])
+        self.assertEqual(list(installer.APPS_DIR.glob("verapp_temp_*")), [])
+
+    def test_retention_and_uninstall(self):
+        installer.install_app("verapp")
+        for release in ("2", "3", "4"):
+            self.release = release
+            installer.update_app("verapp")
+        versions = installer.list_versions("verapp")
+        self.assertEqual(len(versions), installer.KEEP_VERSIONS)
+        self.assertTrue(versions[-1]["active"])
+        self.assertIn("echo 4", self.link_output())
+
+        installer.uninstall_app("verapp")
+        self.assertFalse(os.path.lexists(installer.APPS_DIR / "verapp"))
+        self.assertFalse((installer.APPS_DIR / installer.VERSIONS_DIRNAME / "verapp").exists())
+
+    def test_update_writes_only_changed_files(self):
+        runtime = os.urandom(3 * 1024 * 1024)
+        releases = {
+            "1": {"App/bin/run": b"#!/bin/sh\necho 1\n", "App/lib/runtime.bin": runtime,
+                  "App/data.txt": b"a" * 5000, "App/old.txt": b"gone soon",
+                  "App/settings.conf": b"theme=dark\n"},
+            "2": {"App/bin/run": b"#!/bin/sh\necho 2\n", "App/lib/runtime.bin": runtime,
+                  "App/data.txt": b"a" * 4000 + b"b" * 1000, "App/new.txt": b"hello",
+                  "App/settings.conf": b"theme=dark\n"},
+        }
+
+        def download(url, target):
+            release = releases[self.release]
+            make_tarball(target, release["App/bin/run"],
+                         files=[(name, data, 0o644) for name, data in release.items()
+                                if name != "App/bin/run"])
+            return {"resolved_url": url, "etag": f"release-{self.release}"}
+        installer.download_file = download
+
+        installer.install_app("verapp")
+        self.release = "2"
+        installer.update_app("verapp")
+
+        old, new = (Path(v["path"]) for v in installer.list_versions("verapp"))
+        stats = installer._read_app_meta("verapp")["update_stats"]
+        self.assertEqual(stats["reused_files"], 1)
+        self.assertEqual(stats["reused_bytes"], len(runtime))
+        self.assertEqual(stats["written_files"], 4)
+        self.assertEqual(stats["removed_files"], 1)
+        # Same size, different content: written out, the old version untouched
+        self.assertEqual((new / "App" / "data.txt").read_bytes(), releases["2"]["App/data.txt"])
+        self.assertEqual((old / "App" / "data.txt").read_bytes(), releases["1"]["App/data.txt"])
+        self.assertEqual((new / "App" / "lib" / "runtime.bin").stat().st_ino,
+                         (old / "App" / "lib" / "runtime.bin").stat().st_ino)
+        # Shared, but the active version's file is left writable as it was
+        self.assertTrue((new / "App" / "lib" / "runtime.bin").stat().st_mode & 0o200)
+        # Unchanged but writable in place: never shared with the rollback copy
+        self.assertNotEqual((new / "App" / "settings.conf").stat().st_ino,
+                            (old / "App" / "settings.conf").stat().st_ino)
+        self.assertFalse((new / "App" / "old.txt").exists())
+        self.assertIn("echo 2", self.link_output())
+
+    def test_use_installs_once_then_switches_without_download(self):
+        apps.SUPPORTED_APPS["verapp"].update({
+            "version": "1",
+            "url": "https://example.invalid/verapp-{version}.tar.gz",
+            "bin_path": "App-{version}/bin/run",
+        })
+        apps.expand_versions()
+        self.assertEqual(apps.SUPPORTED_APPS["verapp"]["bin_path"], "App-1/bin/run")
+
+        def versioned_download(url, target):
+            self.release = url.rsplit("-", 1)[1].split(".")[0]
+            make_tarball(target, f"#!/bin/sh\necho {self.release}\n".encode(),
+                         bin_path=f"App-{self.release}/bin/run")
+            return {"resolved_url": url}
+        installer.download_file = versioned_download
+
+        installer.install_app("verapp")
+        installer.use_version("verapp", "2")
+        self.assertIn("echo 2", self.link_output())
+        self.assertTrue(installer.get_binary_path("verapp").exists())
+
+        def no_download(url, target):
+            raise AssertionError("kept version was downloaded again")
+        installer.download_file = no_download
+
+        installer.use_version("verapp", "1")
+        self.assertIn("echo 1", self.link_output())
+        installer.use_version("verapp", "2")
+        self.assertIn("echo 2", self.link_output())
+        self.assertEqual(sorted(v["version"] for v in installer.list_versions("verapp")), ["1", "2"])
+
+        # Versions picked with `use` survive retention
+        self.assertEqual(installer.prune_versions("verapp", keep=1), [])
+        with self.assertRaises(Exception):
+            installer.use_version("verapp", "../escape")
+
+
+if __name__ == "__main__":
+    unittest.main()
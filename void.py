@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
-from modules import installer, apps, tui, cleanup, inspector
+from modules import installer, apps, tui, cleanup, inspector, batch, postinstall, journal, planner, restore, background, locks, usage, hibernate, lockfile, templates, trash, prefetch, lazy, cache
 import argparse
 import sys
 import os
 import json
+import time
 from pathlib import Path
 
 # Add current directory to path so we can import modules
@@ -58,7 +59,11 @@ def load_custom_apps():
                     else:
                         # Override existing? Let's say yes, custom overrides default
                         apps.SUPPORTED_APPS[key].update(data)
+                        # Overridden fields no longer follow the catalog's {version} templates
+                        for field in data:
+                            apps.SUPPORTED_APPS[key].get("templates", {}).pop(field, None)
                         count += 1
+                apps.expand_versions()
                 # Silent success or debug?
                 # print(f"Loaded {count} custom app definitions.")
         except Exception as e:
@@ -93,8 +98,11 @@ def cmd_init(args):
 def cmd_list(args):
     """List supported and configured apps."""
     print("Supported applications:")
-    for app_name in apps.SUPPORTED_APPS:
-        print(f" - {app_name}")
+    for app_name, app_info in apps.SUPPORTED_APPS.items():
+        if app_info.get("version"):
+            print(f" - {app_name} ({app_info['version']})")
+        else:
+            print(f" - {app_name}")
 
     if CONFIG_FILE.exists():
         print("\nConfigured applications (in apps.json):")
@@ -105,13 +113,28 @@ def cmd_list(args):
 
 def cmd_install(args):
     """Install a specific application."""
-    app_name = args.app_name
+    app_name, version = apps.parse_app_spec(args.app_name)
     if app_name not in apps.SUPPORTED_APPS:
         print(f"Error: Application '{app_name}' is not supported.")
         print("Use 'void list' to see available apps.")
         sys.exit(1)
 
     dry_run = getattr(args, 'dry_run', False)
+
+    if getattr(args, 'background', False) and not dry_run:
+        args.background = False
+
+        def run(on_result):
+            cmd_install(args)
+            on_result({"app": app_name, "status": "installed"})
+        _install_in_background(f"install {args.app_name}", [app_name], run)
+        return
+
+    if version and not dry_run:
+        # Same as `void use`: installs next to other versions and activates it
+        args.spec = args.app_name
+        cmd_use(args)
+        return
     
     if dry_run:
         print(f"\n{'='*60}")
@@ -119,7 +142,10 @@ def cmd_install(args):
         print(f"{'='*60}\n")
         
         app_info = apps.SUPPORTED_APPS[app_name]
-        app_install_dir = Path(f"/goinfre/{os.environ.get('USER', 'unknown')}/void/apps/{app_name}")
+        app_install_dir = installer.APPS_DIR / app_name
+        if version and apps.is_versioned(app_info):
+            app_info = apps.pin_version(app_info, version)
+            app_install_dir = installer.APPS_DIR / installer.VERSIONS_DIRNAME / app_name / version
         
         print(f"App: {app_info['name']}")
         print(f"Type: {app_info['type']}")
@@ -127,10 +153,7 @@ def cmd_install(args):
         print(f"  1. Download from: {app_info['url']}")
         print(f"  2. Extract to: {app_install_dir}")
         
-        if app_info['type'] == 'appimage':
-            binary_path = app_install_dir / "AppRun"
-        else:
-            binary_path = app_install_dir / app_info['bin_path']
+        binary_path = installer.get_binary_path(app_name, app_info, app_info['type'])
         
         print(f"  3. Binary location: {binary_path}")
         print(f"  4. Create symlink: ~/bin/{app_info['link_name']} -> {binary_path}")
@@ -142,14 +165,56 @@ def cmd_install(args):
         
         if 'post_install' in app_info:
             print(f"  6. Run post-install scripts:")
-            for idx, script in enumerate(app_info['post_install'], 1):
-                print(f"     [{idx}] {script}")
+            try:
+                steps = postinstall.normalize_steps(app_info['post_install'])
+            except Exception as e:
+                print(f"     Error: {e}")
+                steps = []
+            for step in steps:
+                extra = f" (after: {', '.join(step['after'])})" if step['after'] else ""
+                if step['follows']:
+                    extra += f" (after: {', '.join(step['follows'])}, even if it fails)"
+                if step['group']:
+                    extra += f" (group: {step['group']})"
+                print(f"     [{step['id']}] {step['run']}{extra}")
         
         print(f"\n✓ Dry run complete. No changes made.")
         print(f"Run without --dry-run to actually install.\n")
         return
-    
-    installer.install_app(app_name)
+
+    installer.install_app(app_name, rerun_post_install=args.rerun_post_install)
+
+
+def cmd_use(args):
+    """Switch the active version of an app (installing it side by side if needed)."""
+    app_name, version = apps.parse_app_spec(args.spec)
+    if app_name not in apps.SUPPORTED_APPS:
+        print(f"Error: Application '{app_name}' is not supported.")
+        sys.exit(1)
+    app_info = apps.SUPPORTED_APPS[app_name]
+
+    if not version:
+        kept = {v["release"] or v["version"]: v for v in installer.list_versions(app_name)}
+        known = list(app_info.get("versions") or ([app_info["version"]] if app_info.get("version") else []))
+        known += [k for k in kept if k not in known]
+        if not known:
+            print(f"{app_name} is not versioned.")
+            return
+        print(f"Versions of {app_name} (use: void use {app_name}@<version>):")
+        for release in known:
+            v = kept.get(release)
+            state = "active" if v and v["active"] else ("installed" if v else "")
+            default = " (default)" if release == app_info.get("version") else ""
+            print(f"  {'*' if state == 'active' else ' '} {release}{default}  {state}")
+        if apps.is_versioned(app_info):
+            print("Other versions can be installed by name as well.")
+        return
+
+    try:
+        installer.use_version(app_name, version)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
 
 def cmd_uninstall(args):
@@ -162,8 +227,12 @@ def cmd_uninstall(args):
     installer.uninstall_app(app_name)
 
 
-def cmd_install_all(args):
+def cmd_install_all(args, on_result=None):
     """Install all applications listed in config."""
+    if args.status:
+        _print_install_status()
+        return
+
     config = load_config()
     target_apps = config.get("apps", [])
 
@@ -171,13 +240,161 @@ def cmd_install_all(args):
         print("No apps configured in apps.json.")
         return
 
-    print(f"Installing {len(target_apps)} applications...")
     for app in target_apps:
-        if app in apps.SUPPORTED_APPS:
-            installer.install_app(app)
-        else:
+        if app not in apps.SUPPORTED_APPS:
             print(
                 f"Warning: Configured app '{app}' is not supported. Skipping.")
+    target_apps = [app for app in target_apps if app in apps.SUPPORTED_APPS]
+
+    # Work out the delta between config and disk first
+    actions = planner.plan(target_apps)
+    if args.plan:
+        print(planner.format_plan(actions))
+        return
+
+    if args.background:
+        args.background = False
+        _install_in_background("install-all", target_apps, lambda on_result: cmd_install_all(args, on_result))
+        return
+
+    if not args.rerun_post_install:
+        if not actions:
+            print(f"All {len(target_apps)} apps are installed and linked. Nothing to do.")
+            return
+
+        fixups = [a for a in actions if a["action"] != "install"]
+        if fixups:
+            print(f"Fixing {len(fixups)} item(s) on installed apps...")
+            print(planner.format_plan(fixups))
+            for action, error in planner.apply_fixups(fixups):
+                print(f"Warning: {action['app']}: {action['action']} failed: {error}")
+
+        target_apps = [app for app in target_apps
+                       if any(a["app"] == app and a["action"] == "install" for a in actions)]
+        if not target_apps:
+            print("Done.")
+            return
+
+    print(f"Installing {len(target_apps)} applications (jobs: {args.jobs})...")
+    op = journal.Journal.start("install-all", target_apps,
+                               {"jobs": args.jobs, "rerun_post_install": args.rerun_post_install})
+    results = batch.install_many(target_apps, jobs=args.jobs,
+                                 rerun_post_install=args.rerun_post_install, journal=op,
+                                 on_result=on_result)
+    batch.print_summary(results)
+    _print_resume_hint(results)
+
+
+def _install_status_path():
+    return installer.VOID_ROOT / "void" / "install.status.json"
+
+
+def _install_log_path():
+    return installer.VOID_ROOT / "void" / "install.log"
+
+
+def _install_in_background(label, app_names, run):
+    """
+    Detach from the terminal and call run(on_result) at low CPU and I/O
+    priority. Output goes to install.log; progress to install.status.json,
+    and a desktop notification says when it is over. Returns right away in
+    the terminal; the detached process exits when done.
+    """
+    log_path = _install_log_path()
+    status_file = _install_status_path()
+    if not background.detach(log_path):
+        print(f"Running '{label}' in the background at low priority (log: {log_path}).")
+        print("Check progress with: ./void.py install-all --status")
+        return
+
+    applied = background.lower_priority()
+    print(f"\n[{installer._now_iso()}] {label} (pid {os.getpid()}, {', '.join(applied) or 'normal priority'})")
+    status = {
+        "pid": os.getpid(),
+        "command": label,
+        "state": "running",
+        "started_at": installer._now_iso(),
+        "apps": list(app_names),
+        "done": {},
+        "log": str(log_path),
+    }
+    background.write_status(status_file, status)
+
+    def on_result(result):
+        status["done"][result["app"]] = result["status"]
+        background.write_status(status_file, status)
+
+    ok = True
+    try:
+        run(on_result)
+    except SystemExit as e:
+        ok = not e.code
+    except Exception as e:
+        print(f"Error: {e}")
+        ok = False
+    for app_name in app_names:
+        status["done"].setdefault(app_name, "installed" if ok else "failed")
+    failed = [a for a, state in status["done"].items() if state in ("failed", "unknown")]
+    status["state"] = "failed" if failed else "finished"
+    status["finished_at"] = installer._now_iso()
+    background.write_status(status_file, status)
+
+    if failed:
+        background.notify(f"void: {label} failed", f"Failed: {', '.join(failed)}\nLog: {log_path}",
+                          urgency="critical")
+    else:
+        background.notify(f"void: {label} finished", f"{len(app_names)} app(s) ready")
+    sys.exit(1 if failed else 0)
+
+
+def _print_install_status():
+    status = background.read_status(_install_status_path())
+    if not status:
+        print("No background install has run on this post.")
+        return
+    state = status.get("state")
+    if state == "running" and not background.pid_alive(status.get("pid")):
+        state = "interrupted (run './void.py resume')"
+    done = status.get("done", {})
+    print(f"Background {status.get('command')} {state}: {len(done)}/{len(status.get('apps', []))} apps "
+          f"(started {status.get('started_at')})")
+    for app_name in status.get("apps", []):
+        print(f"  {done.get(app_name, 'pending'):<10} {app_name}")
+    print(f"Log: {status.get('log')}")
+
+
+def _print_resume_hint(results):
+    if any(r["status"] == "failed" for r in results):
+        print("Fix the problem and run './void.py resume' to continue where this stopped.\n")
+
+
+def cmd_resume(args):
+    """Resume the last interrupted install-all/import from the journal."""
+    op = journal.Journal.load_last()
+    if op is None:
+        print("Nothing to resume: no batch install recorded.")
+        return
+
+    pending = op.pending_apps()
+    if not pending:
+        print(f"Nothing to resume: last {op.command} ({len(op.apps)} apps) completed.")
+        return
+
+    jobs = args.jobs or op.options.get("jobs", 1)
+    print(f"Resuming {op.command}: {len(op.apps) - len(pending)}/{len(op.apps)} apps already done.")
+    for app_name in pending:
+        done = [p for p in journal.PHASES if op.has(app_name, p)]
+        state = f"done: {', '.join(done)}" if done else "not started"
+        if app_name in op.failures:
+            state += f" (failed: {op.failures[app_name]})"
+        print(f"  • {app_name:<20} {state}")
+
+    lock = op.options.get("lock")
+    results = batch.install_many(op.apps, jobs=jobs,
+                                 rerun_post_install=op.options.get("rerun_post_install", False),
+                                 journal=op, app_infos=lockfile.app_infos(lock) if lock else None)
+    batch.print_summary(results, title="Resume complete")
+    _print_resume_hint(results)
 
 
 def cmd_entry(args):
@@ -477,6 +694,14 @@ def cmd_inspect(args):
         print(f'        "link_name": "myapp"')
         print(f'    }}')
         print()
+        if result.get('kept_tree'):
+            print("The download and its extracted files are kept: installing an app with this")
+            print("url and type moves them into place instead of downloading again.")
+            print()
+        elif result['archive_type'] != "binary" and not cache.enabled():
+            print("The download cache is off, so these files were not kept: installing this app")
+            print("will download it again. Run './void.py cache --enable' to keep them next time.")
+            print()
         
     except KeyboardInterrupt:
         print("\n\nInspection cancelled by user.")
@@ -608,7 +833,7 @@ def cmd_update(args):
         print("\nNo updates to apply.")
         return
 
-    print("\nApplying updates (reinstalling)...")
+    print("\nApplying updates (previous versions are kept for 'void rollback')...")
     for r in updates:
         name = r["app"]
         print(f"\n--- Updating {name} ---")
@@ -618,6 +843,274 @@ def cmd_update(args):
             print(f"Failed to update {name}: {e}")
 
 
+def _format_age(timestamp):
+    if not timestamp:
+        return "never"
+    days = (time.time() - timestamp) / 86400
+    if days < 1:
+        return "today"
+    return f"{days:.0f}d ago"
+
+
+def cmd_usage(args):
+    """Show usage stats, or turn tracking / automatic eviction on or off."""
+    if args.enable or args.disable or args.auto_evict is not None or args.min_free or args.min_idle_days is not None:
+        before = usage.enabled()
+        current = usage.save_settings(
+            enabled=True if args.enable else (False if args.disable else None),
+            auto_evict=args.auto_evict,
+            min_free_gb=args.min_free,
+            min_idle_days=args.min_idle_days,
+        )
+        if current["enabled"] != before:
+            # Swap ~/bin symlinks for shims (or back) on installed apps
+            actions = [a for a in planner.plan(installer.get_installed_app_names()) if a["action"] == "link-bin"]
+            for action, error in planner.apply_fixups(actions):
+                print(f"Warning: {action['app']}: {error}")
+            print(f"Usage tracking {'enabled' if current['enabled'] else 'disabled'} ({len(actions)} command(s) relinked).")
+
+    current = usage.settings()
+    print(f"Tracking: {'on' if current['enabled'] else 'off'}   "
+          f"Auto-evict: {'on' if current['auto_evict'] else 'off'} "
+          f"(below {current['min_free_gb']} GB free, apps idle {current['min_idle_days']}+ days)")
+    free = usage.free_bytes()
+    if free is not None:
+        print(f"Free in goinfre: {free / 1024 ** 3:.1f} GB")
+
+    stats = usage.stats()
+    if stats:
+        print(f"\n{'App':<24} {'Launches':>8}  Last used")
+        for app_name in sorted(stats, key=lambda a: usage.last_activity(a, stats[a]), reverse=True):
+            print(f"{app_name:<24} {stats[app_name]['launches']:>8}  {_format_age(stats[app_name]['last_used'])}")
+
+    gone = usage.evicted()
+    if gone:
+        print("\nEvicted (data kept, 'void install <app>' to bring back):")
+        for app_name, record in sorted(gone.items()):
+            print(f"  {app_name:<22} evicted {record['evicted_at'][:10]}, last used {_format_age(record.get('last_used'))}")
+
+
+def cmd_evict(args):
+    """Evict apps from goinfre (named ones, or least recently used ones by policy)."""
+    if args.apps:
+        for app_name in args.apps:
+            if app_name not in apps.SUPPORTED_APPS:
+                print(f"Error: Unknown app '{app_name}'")
+                continue
+            if not (installer.APPS_DIR / app_name).exists():
+                print(f"{app_name} is not installed.")
+            elif args.dry_run:
+                print(f"Would evict {app_name}")
+            else:
+                usage.evict(app_name)
+        return
+
+    current = usage.settings()
+    min_free = int((args.min_free or current["min_free_gb"]) * 1024 ** 3)
+    if not current["enabled"]:
+        print("Note: usage tracking is off, so apps are ranked by install time. Enable it with 'void usage --enable'.")
+    chosen = usage.ensure_free_space(min_free, dry_run=args.dry_run)
+    if not chosen:
+        print("Enough free space (or no idle apps to evict).")
+    elif args.dry_run:
+        print("Would evict (least recently used first): " + ", ".join(chosen))
+
+
+def cmd_hibernate(args):
+    """Compress idle apps into goinfre archives that thaw on next launch."""
+    if args.list:
+        names = hibernate.hibernated_apps()
+        if not names:
+            print("No hibernated apps.")
+        for app_name in names:
+            record = hibernate.read_record(app_name)
+            print(f"  {app_name:<22} {record['bytes_before'] / 1024 ** 2:>7.0f} MB -> "
+                  f"{record['bytes_after'] / 1024 ** 2:>6.0f} MB  since {record['hibernated_at'][:10]}")
+        return
+
+    targets = args.apps
+    if not targets:
+        idle_days = args.idle_days if args.idle_days is not None else usage.settings()["min_idle_days"]
+        targets = usage.lru_candidates(min_idle_days=idle_days)
+        if not targets:
+            print(f"No apps idle for {idle_days}+ days.")
+            return
+        print(f"Idle for {idle_days}+ days: {', '.join(targets)}")
+
+    for app_name in targets:
+        if app_name not in apps.SUPPORTED_APPS:
+            print(f"Error: Unknown app '{app_name}'")
+        elif args.dry_run:
+            print(f"Would hibernate {app_name}")
+        else:
+            try:
+                hibernate.hibernate(app_name)
+            except Exception as e:
+                print(f"Failed to hibernate {app_name}: {e}")
+
+
+def cmd_thaw(args):
+    """Unpack a hibernated app (also run by its ~/bin shim on launch)."""
+    if args.app_name not in apps.SUPPORTED_APPS:
+        print(f"Error: Unknown app '{args.app_name}'")
+        sys.exit(1)
+    try:
+        if not hibernate.thaw(args.app_name):
+            print(f"{args.app_name} is not hibernated.")
+    except Exception as e:
+        print(f"Error: failed to thaw {args.app_name}: {e}")
+        sys.exit(1)
+
+
+def cmd_templates(args):
+    """Show kept install templates, or turn templates on or off."""
+    if args.enable:
+        templates.set_enabled(True)
+        print("Templates enabled: new installs keep a pristine copy for instant reinstalls.")
+    elif args.disable:
+        templates.set_enabled(False)
+        for app_name in installer.get_installed_app_names():
+            templates.discard(app_name)
+        print("Templates disabled and removed.")
+
+    for app_name in args.capture or []:
+        if app_name not in apps.SUPPORTED_APPS:
+            print(f"Error: Unknown app '{app_name}'")
+        elif not (installer.APPS_DIR / app_name).exists():
+            print(f"{app_name} is not installed.")
+        elif not templates.enabled():
+            print("Templates are off; run 'void templates --enable' first.")
+            break
+        else:
+            with locks.app_lock(app_name):
+                templates.capture(app_name)
+
+    print(f"Templates: {'on' if templates.enabled() else 'off'}")
+    root = templates.templates_dir()
+    names = sorted(p.name for p in root.iterdir() if p.is_dir()) if root.is_dir() else []
+    if not names:
+        return
+    print(f"\n{'App':<24} {'Template':<18} {'Size':>8}  Created")
+    for app_name in names:
+        for key, path, meta in templates.list_templates(app_name):
+            size = templates.total_size(app_name) / 1024 ** 2
+            print(f"{app_name:<24} {key:<18} {size:>5.0f} MB  {_format_age(path.stat().st_mtime)}")
+    print(f"\nTotal: {templates.total_size() / 1024 ** 2:.0f} MB (shared blocks and hardlinks counted once)")
+
+
+def cmd_lazy(args):
+    """Turn on-demand installs on or off, or install an app from its placeholder."""
+    if args.launch:
+        if args.launch not in apps.SUPPORTED_APPS:
+            print(f"Error: Unknown app '{args.launch}'")
+            sys.exit(1)
+        try:
+            lazy.launch(args.launch)
+        except Exception as e:
+            print(f"Error: failed to install {args.launch}: {e}")
+            sys.exit(1)
+        return
+
+    if args.enable:
+        lazy.set_enabled(True)
+        configured = load_config().get("apps", []) if CONFIG_FILE.exists() else []
+        placed = [app for app in configured if app in apps.SUPPORTED_APPS and lazy.place(app)]
+        print(f"Lazy installs enabled: {len(placed)} placeholder(s) added to {installer.BIN_DIR}.")
+    elif args.disable:
+        lazy.set_enabled(False)
+        removed = [app for app in apps.SUPPORTED_APPS if lazy.remove(app)]
+        print(f"Lazy installs disabled: {len(removed)} placeholder(s) removed.")
+
+    print(f"Lazy installs: {'on' if lazy.enabled() else 'off'}")
+    pending = lazy.placeholders()
+    if pending:
+        print("Install on first launch: " + ", ".join(pending))
+
+
+def cmd_cache(args):
+    """Show or shrink the cache of downloaded archives."""
+    if args.enable or args.disable or args.max_size is not None:
+        cache.save_settings(enabled=True if args.enable else (False if args.disable else None),
+                            max_gb=args.max_size)
+        if args.max_size is not None and args.action != "prune":
+            cache.prune()
+
+    if args.action == "prune":
+        removed, freed = cache.prune(0 if args.all else None)
+        print(f"Removed {removed} cached download(s), freed {freed / 1024 ** 2:.1f} MB.")
+        return
+
+    current = cache.stats()
+    print(f"Cache: {'on' if current['enabled'] else 'off'}   {cache.cache_dir()}")
+    print(f"Size: {current['size'] / 1024 ** 2:.1f} MB of {current['max_bytes'] / 1024 ** 3:g} GB "
+          f"({current['artifacts']} download(s))")
+    lookups = current["hits"] + current["misses"]
+    if lookups:
+        print(f"Hits: {current['hits']}/{lookups}, {current['bytes_saved'] / 1024 ** 2:.1f} MB not downloaded again")
+    if current["entries"]:
+        print(f"\n{'Size':>9}  {'Last used':<16} URL")
+        for sha256, entry in sorted(current["entries"].items(), key=lambda item: -item[1]["last_used"]):
+            url = entry["urls"][-1] if entry["urls"] else f"(sha256 {sha256[:12]})"
+            print(f"{entry['size'] / 1024 ** 2:>6.1f} MB  {_format_age(entry['last_used']):<16} {url}")
+
+
+def cmd_prefetch(args):
+    """Show or configure background downloads of apps selected in the TUI."""
+    if args.enable or args.disable or args.jobs is not None:
+        if args.jobs is not None and args.jobs < 1:
+            print("Error: --jobs must be at least 1")
+            return
+        prefetch.save_settings(
+            enabled=True if args.enable else (False if args.disable else None),
+            max_concurrent=args.jobs,
+        )
+    current = prefetch.settings()
+    print(f"Prefetch: {'on' if current['enabled'] else 'off'} "
+          f"(up to {current['max_concurrent']} at a time, keeping {usage.settings()['min_free_gb']} GB free)")
+
+
+def cmd_trash(args):
+    """Show or empty the trash of removed app trees (also runs the background reaper)."""
+    if args.reap:
+        trash.reap(args.reap)
+        return
+    if args.empty:
+        started = time.monotonic()
+        count = trash.empty()
+        print(f"Deleted {count} item(s) in {time.monotonic() - started:.1f}s.")
+        return
+    items = trash.entries()
+    if not items:
+        print("Trash is empty.")
+        return
+    print(f"Trash: {len(items)} item(s), {trash.size() / 1024 ** 2:.0f} MB waiting to be deleted "
+          f"('void trash --empty' to delete them now).")
+
+
+def cmd_rollback(args):
+    """Switch an app back to a kept version."""
+    app_name = args.app_name
+    if app_name not in apps.SUPPORTED_APPS:
+        print(f"Error: Unknown app '{app_name}'")
+        sys.exit(1)
+
+    versions = installer.list_versions(app_name)
+    if args.list or not versions:
+        if not versions:
+            print(f"No kept versions of {app_name}. Versions are kept from the first 'void update' on.")
+            return
+        for v in reversed(versions):
+            marker = "*" if v["active"] else " "
+            print(f" {marker} {v['version']}  (installed {v['installed_at'][:19].replace('T', ' ')})")
+        return
+
+    try:
+        installer.rollback_app(app_name, args.version)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
 def cmd_check_updates(args):
     """Check for updates for installed apps."""
     print("\n" + "="*60)
@@ -705,6 +1198,10 @@ def cmd_info(args):
     
     print(f"Type: {info['type']}")
     print(f"Source URL: {info['source_url']}")
+
+    versions = installer.list_versions(app_name)
+    if versions:
+        print(f"Versions kept: {', '.join(v['version'] + (' (active)' if v['active'] else '') for v in reversed(versions))}")
     
     if info['data_paths']:
         print(f"\nData Paths:")
@@ -738,7 +1235,12 @@ def cmd_reinstall(args):
     print(f"{'='*60}\n")
     
     # Check if installed
-    app_dir = Path(f"/goinfre/{os.environ.get('USER', 'unknown')}/void/apps/{app_name}")
+    app_dir = installer.APPS_DIR / app_name
+    
+    if app_dir.exists() and templates.find_template(app_name) is not None:
+        # Fresh working tree cloned from the pristine template, no download
+        installer.install_app(app_name, force=True, rerun_post_install=args.rerun_post_install)
+        return
     
     if app_dir.exists():
         print(f"Uninstalling {app_name}...")
@@ -747,7 +1249,7 @@ def cmd_reinstall(args):
         print(f"{app_name} not currently installed")
     
     print(f"\nInstalling {app_name}...")
-    installer.install_app(app_name)
+    installer.install_app(app_name, rerun_post_install=args.rerun_post_install)
 
 
 def cmd_export(args):
@@ -758,11 +1260,18 @@ def cmd_export(args):
         print("No installed apps found.")
         return
     
-    export_data = {
-        'version': '1.0',
-        'exported_at': installer._now_iso(),
-        'apps': [app['app_name'] for app in installed]
-    }
+    if args.lock:
+        export_data, unverified = lockfile.build([app['app_name'] for app in installed])
+        if unverified:
+            # stderr, so the JSON on stdout stays clean for redirection
+            print(f"Warning: no sha256 recorded for {', '.join(unverified)} (installed before hashes "
+                  f"were kept); reinstall them to lock their hashes.", file=sys.stderr)
+    else:
+        export_data = {
+            'version': '1.0',
+            'exported_at': installer._now_iso(),
+            'apps': [app['app_name'] for app in installed]
+        }
     
     import json
     print(json.dumps(export_data, indent=2))
@@ -789,13 +1298,24 @@ def cmd_import(args):
         return
     
     apps_to_install = data['apps']
+    app_infos = None
+    if args.locked:
+        if 'artifacts' not in data:
+            print("Error: Not a lockfile (missing 'artifacts'); create one with 'void export --lock'")
+            return
+        app_infos = lockfile.app_infos(data)
     
     print(f"\n{'='*60}")
-    print(f" Importing {len(apps_to_install)} apps")
+    print(f" Importing {len(apps_to_install)} apps" + (" (locked)" if args.locked else ""))
     print(f"{'='*60}\n")
     
     for app_name in apps_to_install:
-        print(f"  • {app_name}")
+        if app_infos is not None and app_name in app_infos:
+            info = app_infos[app_name]
+            sha = info.get("sha256")
+            print(f"  • {app_name:<20} {'sha256 ' + sha[:12] if sha else 'unverified (no sha256)'}")
+        else:
+            print(f"  • {app_name}")
     
     print()
     
@@ -805,34 +1325,100 @@ def cmd_import(args):
             print("Import cancelled.")
             return
     
-    print()
-    success = 0
-    failed = []
-    
-    for app_name in apps_to_install:
-        if app_name not in apps.SUPPORTED_APPS:
-            print(f"✗ {app_name}: Unknown app")
-            failed.append(app_name)
-            continue
-        
-        try:
-            print(f"\nInstalling {app_name}...")
-            installer.install_app(app_name)
-            success += 1
-        except Exception as e:
-            print(f"✗ Failed: {e}")
-            failed.append(app_name)
-    
-    print(f"\n{'='*60}")
-    print(f"Import complete: {success} installed, {len(failed)} failed")
-    if failed:
-        print(f"Failed: {', '.join(failed)}")
-    print(f"{'='*60}\n")
+    options = {"jobs": args.jobs, "rerun_post_install": args.rerun_post_install}
+    if args.locked:
+        options["lock"] = data
+    op = journal.Journal.start("import", apps_to_install, options)
+    results = batch.install_many(apps_to_install, jobs=args.jobs,
+                                 rerun_post_install=args.rerun_post_install, journal=op,
+                                 app_infos=app_infos)
+    batch.print_summary(results, title="Import complete")
+    _print_resume_hint(results)
+
+
+def cmd_restore(args):
+    """Rebuild apps after a goinfre wipe, most needed first."""
+    status_file = restore.status_path()
+
+    if args.status:
+        status = background.read_status(status_file)
+        if not status:
+            print("No restore has run on this post.")
+            return
+        done = status.get("done", {})
+        state = status.get("state")
+        if state == "running" and not background.pid_alive(status.get("pid")):
+            state = "interrupted (run './void.py resume')"
+        print(f"Restore {state}: {len(done)}/{len(status.get('apps', []))} apps "
+              f"(started {status.get('started_at')})")
+        for app_name in status.get("apps", []):
+            print(f"  {done.get(app_name, 'pending'):<10} {app_name}")
+        return
+
+    configured = load_config().get("apps", []) if CONFIG_FILE.exists() else []
+    targets = restore.wanted_apps(configured)
+    actions = planner.plan(targets)
+    to_install = [app for app in targets
+                  if any(a["app"] == app and a["action"] == "install" for a in actions)]
+    fixups = [a for a in actions if a["action"] not in ("install", "unknown")]
+
+    if lazy.enabled() and not args.now:
+        # Lazy mode: a placeholder per app, installed on its first launch
+        placed = [app for app in to_install if lazy.place(app)]
+        if placed:
+            print(f"{len(placed)} app(s) will install on first launch: {', '.join(placed)}")
+        to_install = [app for app in to_install if not lazy.is_placeholder(app)]
+
+    if not to_install and not fixups:
+        if not args.quiet:
+            print("Nothing to restore: every app is installed and linked.")
+        return
+
+    if restore.goinfre_wiped():
+        print(f"goinfre was wiped: restoring {len(to_install)} app(s).")
+
+    if args.background:
+        if not background.detach(restore.log_path()):
+            print(f"Restoring in the background (log: {restore.log_path()}).")
+            print("Check progress with: ./void.py restore --status")
+            return
+        background.lower_priority()
+
+    order = restore.prioritize(to_install)
+    status = {
+        "pid": os.getpid(),
+        "state": "running",
+        "started_at": installer._now_iso(),
+        "apps": order,
+        "done": {},
+    }
+    background.write_status(status_file, status)
+
+    if fixups:
+        print(planner.format_plan(fixups))
+        for action, error in planner.apply_fixups(fixups):
+            print(f"Warning: {action['app']}: {action['action']} failed: {error}")
+
+    print("Restore order: " + ", ".join(order))
+
+    def on_result(result):
+        status["done"][result["app"]] = result["status"]
+        background.write_status(status_file, status)
+
+    op = journal.Journal.start("restore", order, {"jobs": args.jobs})
+    results = batch.install_many(order, jobs=args.jobs, journal=op, on_result=on_result)
+
+    status["state"] = "finished"
+    status["finished_at"] = installer._now_iso()
+    background.write_status(status_file, status)
+    batch.print_summary(results, title="Restore complete")
+    _print_resume_hint(results)
 
 
 def cmd_logout(args):
     """Clean all apps from goinfre and logout."""
-    installed = installer.get_installed_app_names()
+    # Hibernated apps have no directory but still leave a thaw shim and an archive
+    installed = sorted(set(installer.get_installed_app_names()) | set(hibernate.hibernated_apps()))
     
     if not installed:
         print("No apps installed. Logging out...")
@@ -841,14 +1427,30 @@ def cmd_logout(args):
         print(f" Cleaning {len(installed)} app(s) from goinfre")
         print(f"{'='*60}\n")
         
+        # Only the links in home are torn down here; the app trees are moved
+        # to the trash (one rename each) and deleted by a detached reaper, so
+        # logging out does not wait for tens of thousands of unlinks.
         for app_name in installed:
             try:
-                installer.uninstall_app(app_name)
+                app_info = apps.SUPPORTED_APPS[app_name]
+                link_path = installer.BIN_DIR / app_info["link_name"]
+                with locks.app_lock(app_name):
+                    if usage.link_target(link_path) is not None:
+                        link_path.unlink()
+                    desktop_file = installer.DESKTOP_DIR / f"void_{app_name}.desktop"
+                    if desktop_file.exists():
+                        desktop_file.unlink()
+                    installer.remove_app_files(app_name)
+                    templates.discard(app_name)
+                print(f"✓ {app_name}")
             except Exception as e:
-                print(f"✗ Failed to uninstall {app_name}: {e}")
+                print(f"✗ Failed to remove {app_name}: {e}")
+        with locks.shared_lock("cache"):
+            trash.discard(cache.cache_dir())
+        trash.spawn_reaper()
         
         print(f"\n{'='*60}")
-        print(" Cleanup Complete")
+        print(" Cleanup Complete (files are being deleted in the background)")
         print(f"{'='*60}\n")
     
     print("Logging out...")
@@ -858,6 +1460,9 @@ def cmd_logout(args):
 def main():
     parser = argparse.ArgumentParser(
         description="Void - 1337 School Storage Manager made by ['abdessel']")
+    parser.add_argument(
+        "--no-wait", action="store_true",
+        help="Fail right away if another void process is working on the same app")
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
     # Init
@@ -870,9 +1475,19 @@ def main():
     parser_install = subparsers.add_parser(
         "install", help="Install a specific application")
     parser_install.add_argument(
-        "app_name", help="Name of the application to install")
+        "app_name", help="Name of the application to install (app@version for a specific version)")
     parser_install.add_argument(
         "--dry-run", action="store_true", help="Show what would be done without actually doing it")
+    parser_install.add_argument(
+        "--rerun-post-install", action="store_true", help="Run post-install steps even if they already succeeded")
+    parser_install.add_argument(
+        "--background", action="store_true", help="Detach and install at low CPU/disk priority")
+
+    # Use (switch versions)
+    parser_use = subparsers.add_parser(
+        "use", help="Switch the active version of an app, e.g. 'void use go@1.22.5'")
+    parser_use.add_argument(
+        "spec", help="app@version to activate, or just app to list its versions")
 
     # Uninstall
     parser_uninstall = subparsers.add_parser(
@@ -881,7 +1496,38 @@ def main():
         "app_name", help="Name of the application to uninstall")
 
     # Install All
-    subparsers.add_parser("install-all", help="Install all apps from config")
+    parser_install_all = subparsers.add_parser(
+        "install-all", help="Install all apps from config")
+    parser_install_all.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of apps to install in parallel (default: 1)")
+    parser_install_all.add_argument(
+        "--plan", action="store_true", help="Show what would change without doing it")
+    parser_install_all.add_argument(
+        "--rerun-post-install", action="store_true", help="Run post-install steps even if they already succeeded")
+    parser_install_all.add_argument(
+        "--background", action="store_true", help="Detach and install at low CPU/disk priority")
+    parser_install_all.add_argument(
+        "--status", action="store_true", help="Show progress of the current/last background install")
+
+    # Restore
+    parser_restore = subparsers.add_parser(
+        "restore", help="Rebuild apps after goinfre was wiped (most used first)")
+    parser_restore.add_argument(
+        "-j", "--jobs", type=int, default=4, help="Number of apps to install in parallel (default: 4)")
+    parser_restore.add_argument(
+        "--background", action="store_true", help="Detach and restore in the background (for login hooks)")
+    parser_restore.add_argument(
+        "--status", action="store_true", help="Show progress of the current/last restore")
+    parser_restore.add_argument(
+        "-q", "--quiet", action="store_true", help="Print nothing when there is nothing to restore")
+    parser_restore.add_argument(
+        "--now", action="store_true", help="Install every app now, even in lazy mode")
+
+    # Resume
+    parser_resume = subparsers.add_parser(
+        "resume", help="Continue the last interrupted install-all/import")
+    parser_resume.add_argument(
+        "-j", "--jobs", type=int, help="Number of apps to install in parallel (default: as before)")
 
     # Manual Entry
     parser_entry = subparsers.add_parser(
@@ -915,7 +1561,7 @@ def main():
         "url", help="URL of the archive to inspect")
     parser_inspect.add_argument(
         "-t", "--type", help="Archive type (auto-detected if not specified)",
-        choices=["tar.gz", "tar.xz", "tar.bz2", "zip", "deb", "appimage"])
+        choices=["tar.gz", "tar.xz", "tar.bz2", "tar.zst", "zip", "deb", "appimage", "binary"])
     parser_inspect.add_argument(
         "-v", "--verbose", action="store_true", help="Show detailed error messages")
 
@@ -937,7 +1583,85 @@ def main():
     parser_update.add_argument(
         "app_name", nargs="?", help="Check/update a specific app (default: all installed)")
     parser_update.add_argument(
-        "--apply", action="store_true", help="Reinstall apps that have updates available")
+        "--apply", action="store_true", help="Install available updates next to the current versions")
+
+    # Usage tracking
+    parser_usage = subparsers.add_parser(
+        "usage", help="Show app usage, or configure tracking and automatic eviction")
+    parser_usage.add_argument("--enable", action="store_true", help="Record launches through ~/bin shims")
+    parser_usage.add_argument("--disable", action="store_true", help="Stop recording (plain symlinks again)")
+    parser_usage.add_argument("--auto-evict", dest="auto_evict", action="store_true", default=None,
+                              help="Evict idle apps automatically before downloads when space is low")
+    parser_usage.add_argument("--no-auto-evict", dest="auto_evict", action="store_false")
+    parser_usage.add_argument("--min-free", type=float, metavar="GB", help="Free space to keep in goinfre")
+    parser_usage.add_argument("--min-idle-days", type=int, metavar="N",
+                              help="Only auto-evict apps unused for N days")
+
+    # Evict
+    parser_evict = subparsers.add_parser(
+        "evict", help="Remove apps from goinfre, keeping their data (least recently used first)")
+    parser_evict.add_argument("apps", nargs="*", help="Apps to evict (default: by policy until enough space is free)")
+    parser_evict.add_argument("--min-free", type=float, metavar="GB", help="Free space to reach")
+    parser_evict.add_argument("--dry-run", action="store_true", help="Only show what would be evicted")
+
+    # Hibernate / thaw
+    parser_hibernate = subparsers.add_parser(
+        "hibernate", help="Compress idle apps in goinfre; they thaw on next launch")
+    parser_hibernate.add_argument("apps", nargs="*", help="Apps to hibernate (default: idle apps)")
+    parser_hibernate.add_argument("--idle-days", type=int, metavar="N",
+                                  help="Without app names: hibernate apps unused for N days")
+    parser_hibernate.add_argument("--list", action="store_true", help="List hibernated apps")
+    parser_hibernate.add_argument("--dry-run", action="store_true", help="Only show what would be hibernated")
+    parser_thaw = subparsers.add_parser("thaw", help="Unpack a hibernated app")
+    parser_thaw.add_argument("app_name", help="Application to thaw")
+
+    # Templates
+    parser_templates = subparsers.add_parser(
+        "templates", help="Keep pristine install copies for instant reinstalls")
+    parser_templates.add_argument("--enable", action="store_true", help="Keep a template of every new install")
+    parser_templates.add_argument("--disable", action="store_true", help="Stop keeping templates and remove them")
+    parser_templates.add_argument("--capture", nargs="+", metavar="APP",
+                                  help="Make a template of an installed app as it is now")
+
+    # Download cache
+    parser_cache = subparsers.add_parser(
+        "cache", help="Show or prune the cache of downloaded archives")
+    parser_cache.add_argument("action", nargs="?", choices=["stats", "prune"], default="stats",
+                              help="stats (default), or prune down to the size cap")
+    parser_cache.add_argument("--max-size", type=float, metavar="GB", help="Size cap of the cache")
+    parser_cache.add_argument("--all", action="store_true", help="With prune: remove everything")
+    parser_cache.add_argument("--enable", action="store_true", help="Keep downloaded archives")
+    parser_cache.add_argument("--disable", action="store_true", help="Delete archives after installing (default)")
+
+    # Lazy installs
+    parser_lazy = subparsers.add_parser(
+        "lazy", help="Install configured apps on their first launch instead of up front")
+    parser_lazy.add_argument("--enable", action="store_true",
+                             help="Put placeholders in ~/bin for configured apps that are missing")
+    parser_lazy.add_argument("--disable", action="store_true", help="Remove the placeholders")
+    parser_lazy.add_argument("--launch", metavar="APP", help=argparse.SUPPRESS)
+
+    # Prefetch
+    parser_prefetch = subparsers.add_parser(
+        "prefetch", help="Configure downloading apps as soon as they are selected in the TUI")
+    parser_prefetch.add_argument("--enable", action="store_true", help="Start downloads on selection")
+    parser_prefetch.add_argument("--disable", action="store_true", help="Download only when queued")
+    parser_prefetch.add_argument("--jobs", type=int, metavar="N", help="Prefetches running at once")
+
+    # Trash
+    parser_trash = subparsers.add_parser(
+        "trash", help="Show or empty removed app files waiting to be deleted")
+    parser_trash.add_argument("--empty", action="store_true", help="Delete them now")
+    parser_trash.add_argument("--reap", metavar="DIR", help=argparse.SUPPRESS)
+
+    # Rollback
+    parser_rollback = subparsers.add_parser(
+        "rollback", help="Switch an app back to its previous version")
+    parser_rollback.add_argument("app_name", help="Application to roll back")
+    parser_rollback.add_argument(
+        "version", nargs="?", help="Kept version to switch to (default: the previous one)")
+    parser_rollback.add_argument(
+        "--list", action="store_true", help="List kept versions and exit")
     
     # Check updates (simpler version)
     subparsers.add_parser(
@@ -954,10 +1678,15 @@ def main():
         "reinstall", help="Reinstall an application (uninstall + install)")
     parser_reinstall.add_argument(
         "app_name", help="Name of the application to reinstall")
+    parser_reinstall.add_argument(
+        "--rerun-post-install", action="store_true", help="Run post-install steps even if they already succeeded")
     
     # Export
-    subparsers.add_parser(
+    parser_export = subparsers.add_parser(
         "export", help="Export list of installed apps to JSON")
+    parser_export.add_argument(
+        "--lock", action="store_true",
+        help="Also record each app's exact artifact (resolved URL, ETag, size, sha256)")
     
     # Import
     parser_import = subparsers.add_parser(
@@ -966,6 +1695,13 @@ def main():
         "file", help="Path to exported JSON file")
     parser_import.add_argument(
         "-y", "--yes", action="store_true", help="Skip confirmation prompt")
+    parser_import.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Number of apps to install in parallel (default: 1)")
+    parser_import.add_argument(
+        "--rerun-post-install", action="store_true", help="Run post-install steps even if they already succeeded")
+    parser_import.add_argument(
+        "--locked", action="store_true",
+        help="Install exactly the artifacts recorded by 'export --lock', verifying their hashes")
     
     # Logout
     subparsers.add_parser(
@@ -976,65 +1712,98 @@ def main():
 
     args = parser.parse_args()
 
-    if args.command == "init":
-        cmd_init(args)
-    elif args.command == "list":
-        cmd_list(args)
-    elif args.command == "install":
-        cmd_install(args)
-    elif args.command == "uninstall":
-        cmd_uninstall(args)
-    elif args.command == "install-all":
-        cmd_install_all(args)
-    elif args.command == "entry":
-        cmd_entry(args)
-    elif args.command == "refresh-icons":
-        cmd_refresh_icons(args)
-    elif args.command == "tui":
-        tui.run()
-    elif args.command == "cleanup":
-        if args.execute:
-            cmd_cleanup_execute(args)
-        else:
-            cmd_cleanup_analyze(args)
-    elif args.command == "inspect":
-        cmd_inspect(args)
-    elif args.command == "health":
-        cmd_health(args)
-    elif args.command == "repair":
-        cmd_repair(args)
-    elif args.command == "update":
-        cmd_update(args)
-    elif args.command == "check-updates":
-        cmd_check_updates(args)
-    elif args.command == "info":
-        cmd_info(args)
-    elif args.command == "reinstall":
-        cmd_reinstall(args)
-    elif args.command == "export":
-        cmd_export(args)
-    elif args.command == "import":
-        cmd_import(args)
-    elif args.command == "logout":
-        cmd_logout(args)
-    elif args.command == "health":
-        cmd_health(args)
-    elif args.command == "repair":
-        cmd_repair(args)
-    elif args.command == "update":
-        cmd_update(args)
-    else:
-        # Default to TUI if no args, or help?
-        # User requested tool to be a TUI tool. Defaulting to TUI is nice.
-        # But let's check if sys.stdout is a tty.
-        if sys.stdout.isatty():
-            # Check PATH before launching TUI
-            check_path_warning()  # CLI warning (might be overwritten by TUI init)
-            # Pass path status to TUI?
-            tui.run(missing_path=str(BIN_DIR)
-                    not in os.environ.get("PATH", ""))
+    if args.no_wait:
+        locks.WAIT = False
+
+    try:
+        if args.command == "init":
+            cmd_init(args)
+        elif args.command == "list":
+            cmd_list(args)
+        elif args.command == "install":
+            cmd_install(args)
+        elif args.command == "use":
+            cmd_use(args)
+        elif args.command == "uninstall":
+            cmd_uninstall(args)
+        elif args.command == "install-all":
+            cmd_install_all(args)
+        elif args.command == "resume":
+            cmd_resume(args)
+        elif args.command == "restore":
+            cmd_restore(args)
+        elif args.command == "entry":
+            cmd_entry(args)
+        elif args.command == "refresh-icons":
+            cmd_refresh_icons(args)
+        elif args.command == "tui":
+            tui.run()
+        elif args.command == "cleanup":
+            if args.execute:
+                cmd_cleanup_execute(args)
+            else:
+                cmd_cleanup_analyze(args)
+        elif args.command == "inspect":
+            cmd_inspect(args)
+        elif args.command == "health":
+            cmd_health(args)
+        elif args.command == "repair":
+            cmd_repair(args)
+        elif args.command == "update":
+            cmd_update(args)
+        elif args.command == "rollback":
+            cmd_rollback(args)
+        elif args.command == "usage":
+            cmd_usage(args)
+        elif args.command == "evict":
+            cmd_evict(args)
+        elif args.command == "hibernate":
+            cmd_hibernate(args)
+        elif args.command == "thaw":
+            cmd_thaw(args)
+        elif args.command == "templates":
+            cmd_templates(args)
+        elif args.command == "cache":
+            cmd_cache(args)
+        elif args.command == "lazy":
+            cmd_lazy(args)
+        elif args.command == "prefetch":
+            cmd_prefetch(args)
+        elif args.command == "trash":
+            cmd_trash(args)
+        elif args.command == "check-updates":
+            cmd_check_updates(args)
+        elif args.command == "info":
+            cmd_info(args)
+        elif args.command == "reinstall":
+            cmd_reinstall(args)
+        elif args.command == "export":
+            cmd_export(args)
+        elif args.command == "import":
+            cmd_import(args)
+        elif args.command == "logout":
+            cmd_logout(args)
+        elif args.command == "health":
+            cmd_health(args)
+        elif args.command == "repair":
+            cmd_repair(args)
+        elif args.command == "update":
+            cmd_update(args)
         else:
-            parser.print_help()
+            # Default to TUI if no args, or help?
+            # User requested tool to be a TUI tool. Defaulting to TUI is nice.
+            # But let's check if sys.stdout is a tty.
+            if sys.stdout.isatty():
+                # Check PATH before launching TUI
+                check_path_warning()  # CLI warning (might be overwritten by TUI init)
+                # Pass path status to TUI?
+                tui.run(missing_path=str(BIN_DIR)
+                        not in os.environ.get("PATH", ""))
+            else:
+                parser.print_help()
+    except locks.LockBusy as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":